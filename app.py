@@ -3,7 +3,14 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
+import os
+from html import escape
+from src.features.embeddings import DEFAULT_EMBEDDINGS_PATH
+from src.models.executor import ExecutorSaturated, InferenceExecutor
 from src.models.inference import CallAnalyticsEngine
+from src.models.result_cache import DEFAULT_RESULT_CACHE_PATH, ResultCache
+from src.utils.artifacts import artifact_columns, read_artifact
+from src.utils.dashboard import load_dashboard_data
 
 # ─────────────────────────────────────────────────────────────
 # APP CONFIG
@@ -181,30 +188,126 @@ h3 {{ color: {TEAL};  font-weight: 600; }}
 # ─────────────────────────────────────────────────────────────
 # HELPERS
 # ─────────────────────────────────────────────────────────────
+@st.cache_resource
+def load_result_cache():
+    # Re-submitted transcripts reuse redaction + intent from the result cache (persisted across restarts)
+    return ResultCache(max_entries=512, disk_path=os.getenv('RESULT_CACHE_PATH', DEFAULT_RESULT_CACHE_PATH))
+
+def build_engine(warm_up_stages=("sanitizer", "classifier")):
+    # Models load lazily; warm-up pulls the Live Inference stages in the background.
+    # INFERENCE_RUNTIME=onnx serves NER + zero-shot from int8 ONNX Runtime (falls back to torch)
+    engine = CallAnalyticsEngine(device=-1, runtime=os.getenv('INFERENCE_RUNTIME', 'torch'),
+                                 result_cache=load_result_cache())
+    engine.warm_up(stages=warm_up_stages)
+    return engine
+
+def engine_stages():
+    # Similar-call search runs on the workers too, so warm its models when embeddings exist
+    stages = ["sanitizer", "classifier"]
+    if os.path.exists(DEFAULT_EMBEDDINGS_PATH):
+        stages += ["vector_engine", "similarity_index"]
+    return stages
+
 @st.cache_resource(show_spinner="Loading AI inference engine…")
 def load_engine():
-    return CallAnalyticsEngine(device=-1)
+    return build_engine(engine_stages())
+
+@st.cache_resource
+def load_executor():
+    # Every browser session shares this queue; workers own their engines, so no pipeline
+    # is ever called from two threads, and concurrent clicks are micro-batched together.
+    # Similar-call searches go through it as tasks (run_on_executor).
+    # Extra INFERENCE_WORKERS each load their own copy of the models.
+    return InferenceExecutor(load_engine(), workers=int(os.getenv('INFERENCE_WORKERS', '1')),
+                             engine_factory=lambda: build_engine(engine_stages()),
+                             max_queue=int(os.getenv('INFERENCE_MAX_QUEUE', '64')),
+                             max_batch_size=int(os.getenv('INFERENCE_MAX_BATCH', '16')),
+                             max_wait_ms=float(os.getenv('INFERENCE_MAX_WAIT_MS', '20')),
+                             timeout_s=float(os.getenv('INFERENCE_TIMEOUT_S', '120')))
 
 @st.cache_data(show_spinner="Loading project data…")
 def load_data():
-    df = pd.read_csv('data/processed/clustered_data.csv')
-    sc = pd.read_csv('data/processed/executive_friction_scorecard.csv')
-    if 'cluster_id' not in sc.columns:
-        sc = sc.reset_index().rename(columns={'index': 'cluster_id'})
-    sc['cluster_id'] = sc['cluster_id'].astype(int)
-    df['cluster_id']  = df['cluster_id'].astype(int)
-    mapping = dict(zip(sc['cluster_id'], sc['archetype_name']))
-    df['archetype_name'] = df['cluster_id'].map(mapping).fillna("Unclassified / Noise")
-    if 'avg_duration' not in sc.columns and 'duration_sec' in sc.columns:
-        sc['avg_duration'] = sc['duration_sec']
-    if 'escalation_rate' not in sc.columns and 'escalated' in sc.columns:
-        sc['escalation_rate'] = sc['escalated']
-    if 'resolution_rate' not in sc.columns and 'resolved' in df.columns:
-        resolution_map = df.groupby('archetype_name')['resolved'].mean().to_dict()
-        sc['resolution_rate'] = sc['archetype_name'].map(resolution_map)
-    if 'call_cost' not in sc.columns and 'avg_duration' in sc.columns:
-        sc['call_cost'] = (sc['avg_duration'] / 60 * 6.5).round(2)
-    return df, sc
+    return load_dashboard_data()
+
+@st.cache_data(show_spinner="Loading transcripts…")
+def load_transcripts():
+    """Redacted transcript text, row-aligned with load_data()'s frame."""
+    available = artifact_columns('clustered_data')
+    col = next((c for c in ['sanitized_text', 'clean_text'] if c in available), None)
+    if col is None:
+        return pd.Series(dtype=object)
+    return read_artifact('clustered_data', columns=[col])[col]
+
+def render_similar_calls(neighbours, df, transcripts):
+    """Cards for engine.similar_calls / similar_to_call results (row = clustered_data row)."""
+    # The index reloads when calls are added, so it can be ahead of the cached frame
+    shown = [n for n in neighbours if n['row'] in df.index]
+    for n in shown:
+        row = df.loc[n['row']]
+        txt = str(transcripts.get(n['row'], "")) if not transcripts.empty else ""
+        outcome = "Resolved" if row.get('resolved') else "Unresolved"
+        st.html(f"""
+        <div class='drilldown-card'>
+            <span style='font-weight:700; font-size:0.7rem; text-transform:uppercase;
+                         letter-spacing:0.08em; color:{TEAL_D};'>
+                {row['archetype_name']} · CSAT {row['csat_score']} · {outcome} · similarity {n['similarity']:.2f}
+            </span><br>
+            {txt[:300]}{"…" if len(txt) > 300 else ""}
+        </div>""")
+    if len(shown) < len(neighbours):
+        st.caption(f"{len(neighbours) - len(shown)} similar call(s) were added after the dashboard data was loaded and are not shown.")
+
+def highlight_redactions(text, redactions):
+    """The transcript as HTML with every redacted span marked and labelled (spans from analyze_call)."""
+    parts, cursor = [], 0
+    for span in sorted(redactions, key=lambda r: r['start']):
+        parts.append(escape(text[cursor:span['start']]))
+        parts.append(f"<mark title='{span['label']}' style='background:{TEAL_L}; color:{TEAL_D}; "
+                     f"padding:0 2px; border-radius:3px;'>{escape(text[span['start']:span['end']])}"
+                     f"<sup style='font-size:0.6rem; font-weight:700;'> {span['label']}</sup></mark>")
+        cursor = span['end']
+    parts.append(escape(text[cursor:]))
+    return "".join(parts)
+
+def run_on_executor(task, instrument=False):
+    """task(engine) on an executor worker (shared queue, backpressure, timeout); None with a notice if it can't run."""
+    try:
+        return load_executor().run(task, instrument=instrument)
+    except ExecutorSaturated:
+        st.warning("The inference service is busy right now. Please try again in a few seconds.")
+    except TimeoutError:
+        st.error("The request timed out. Please try again.")
+    return None
+
+def render_diagnostics(executor):
+    """Per-stage latency / batch / token table from every worker's engine.stats(), plus the request queue."""
+    worker_stats = executor.engine_stats()
+    stats = worker_stats[0]   # RSS is per process and the result cache is shared
+    st.html(f"<div class='section-header'>🩺 Pipeline Diagnostics</div>")
+    d1, d2, d3, d4 = st.columns(4)
+    d1.metric("Process RSS", f"{stats['rss_mb']:,.0f} MB")
+    d2.metric("Peak RSS", f"{stats['peak_rss_mb']:,.0f} MB")
+    d3.metric("Models Loaded", sum(sum(e.loaded_components().values()) for e in executor.engines),
+              help=f"across {len(executor.engines)} worker engine(s)")
+    if 'result_cache' in stats:
+        cache = stats['result_cache']
+        d4.metric("Result Cache Hit Rate", f"{cache['hit_rate']:.0%}",
+                  help=f"{cache['hits']} hits ({cache['disk_hits']} from disk) · {cache['misses']} misses")
+    queue_stats = executor.stats()
+    q1, q2, q3, q4 = st.columns(4)
+    q1.metric("Queue Depth", f"{queue_stats['queue_depth']} / {queue_stats['max_queue']}",
+              help=f"{queue_stats['workers']} worker(s)")
+    q2.metric("Mean Micro-batch", f"{queue_stats['mean_batch']:.1f}")
+    q3.metric("Request p95", f"{queue_stats['p95_ms']:,.0f} ms",
+              help=f"p50 {queue_stats['p50_ms']:,.0f} ms · queue wait p95 {queue_stats['queue_p95_ms']:,.0f} ms")
+    q4.metric("Rejected / Timed Out", f"{queue_stats['rejected']} / {queue_stats['timed_out']}")
+    tables = {i: pd.DataFrame.from_dict(s['stages'], orient='index') for i, s in enumerate(worker_stats) if s['stages']}
+    if not tables:
+        st.caption("No stages recorded yet — analyse a call with diagnostics enabled.")
+        return
+    table = pd.concat(tables, names=['worker', 'stage'])
+    table = table[['calls', 'mean_batch', 'tokens', 'p50_ms', 'p95_ms', 'p99_ms', 'total_ms']]
+    st.dataframe(table, use_container_width=True)
 
 def teal_bar(fig):
     """Apply consistent teal/red theme to a bar chart."""
@@ -262,6 +365,9 @@ with st.sidebar:
     </div>
     """)
 
+    show_diagnostics = st.toggle("🩺 Pipeline diagnostics", value=False,
+                                 help="Time each inference stage (redaction, NER, classification, risk)")
+
 # ─────────────────────────────────────────────────────────────
 # LOAD DATA
 # ─────────────────────────────────────────────────────────────
@@ -271,6 +377,8 @@ except FileNotFoundError:
     st.error("⚠️ Data files not found. Please run Notebooks 01 → 02 → 03 first.")
     st.stop()
 
+engine = load_engine()   # returns immediately; models warm up while the user browses
+
 page = menu.split("  ", 1)[-1]   # strip icon prefix
 
 # ─────────────────────────────────────────────────────────────
@@ -735,9 +843,9 @@ elif page == "Archetype Drilldown":
 
     # Sample transcripts
     st.html(f"<div class='section-header'>📝 Sample Redacted Transcripts</div>")
-    text_col = next((c for c in ['clean_text', 'sanitized_text', 'transcript'] if c in df.columns), None)
-    if text_col:
-        samples = sub[text_col].dropna().sample(min(4, len(sub)), random_state=42)
+    transcripts = load_transcripts()
+    if not transcripts.empty:
+        samples = transcripts.loc[sub.index].dropna().sample(min(4, len(sub)), random_state=42)
         for i, txt in enumerate(samples, 1):
             st.html(f"""
             <div class='drilldown-card'>
@@ -746,6 +854,17 @@ elif page == "Archetype Drilldown":
                 {str(txt)[:300]}{"…" if len(str(txt)) > 300 else ""}
             </div>""")
 
+    # Nearest historical calls by transcript embedding
+    st.html(f"<div class='section-header'>🧭 Similar Historical Calls</div>")
+    engine = load_engine()
+    if not os.path.exists(engine.embeddings_path):
+        st.info("Run notebook 02 to persist transcript embeddings and enable similar-call search.")
+    else:
+        call_row = st.selectbox("Reference call (row)", sub.index.tolist()[:500])
+        neighbours = run_on_executor(lambda e: e.similar_to_call(int(call_row), k=5), show_diagnostics)
+        if neighbours is not None:
+            render_similar_calls(neighbours, df, transcripts)
+
 # ─────────────────────────────────────────────────────────────
 # PAGE 5 — LIVE INFERENCE
 # ─────────────────────────────────────────────────────────────
@@ -775,11 +894,19 @@ elif page == "Live Inference":
     with col_out:
         st.html(f"<div class='section-header'>📋 Call Report Card</div>")
 
+        res = None
         if run_btn and raw_input.strip():
+            # Requests from every session share the executor's queue and micro-batches
             with st.spinner("Running NLP pipeline…"):
-                engine = load_engine()
-                res    = engine.analyze_call(raw_input, talk_ratio=t_ratio, duration=int(duration))
-
+                try:
+                    res = load_executor().analyze_call(raw_input, talk_ratio=t_ratio, duration=int(duration),
+                                                       instrument=show_diagnostics)
+                except ExecutorSaturated:
+                    st.warning("The inference service is busy right now. Please try again in a few seconds.")
+                except TimeoutError:
+                    st.error("The analysis timed out. Please try again.")
+
+        if res is not None:
             risk = res['risk_level']
             badge_cls = {"HIGH": "badge-high", "MEDIUM": "badge-medium", "LOW": "badge-low"}[risk]
             risk_color = {"HIGH": RED, "MEDIUM": "#D97706", "LOW": "#059669"}[risk]
@@ -847,13 +974,27 @@ elif page == "Live Inference":
                 <div style='font-size:0.88rem; color:{GRAY}; margin-top:4px;'>{action}</div>
             </div>""")
 
-            # Redacted transcript
+            # Redacted transcript, and what was removed from the original
             with st.expander("🛡️ View Redacted Transcript (PII Removed)"):
-                st.html(f"<div style='font-size:0.85rem; line-height:1.75; color:{SLATE};'>{res['clean_text']}</div>")
-
-        elif run_btn:
+                st.html(f"<div style='font-size:0.85rem; line-height:1.75; color:{SLATE};'>{escape(res['clean_text'])}</div>")
+                redactions = res.get('redactions', [])
+                if redactions:
+                    st.html(f"<div class='label' style='margin-top:0.6rem;'>Removed from the original "
+                            f"({len(redactions)} span{'s' if len(redactions) != 1 else ''})</div>"
+                            f"<div style='font-size:0.85rem; line-height:1.75; color:{SLATE}; white-space:pre-wrap;'>"
+                            f"{highlight_redactions(raw_input, redactions)}</div>")
+
+            # Closest historical calls
+            if os.path.exists(engine.embeddings_path):
+                with st.expander("🧭 Closest Historical Calls", expanded=True):
+                    neighbours = run_on_executor(
+                        lambda e: e.similar_calls(res['clean_text'], k=5, sanitized=True), show_diagnostics)
+                    if neighbours is not None:
+                        render_similar_calls(neighbours, df, load_transcripts())
+
+        elif run_btn and not raw_input.strip():
             st.warning("Please paste a transcript before running the analysis.")
-        else:
+        elif not run_btn:
             st.html(f"""
             <div style='height:220px; display:flex; flex-direction:column;
                         align-items:center; justify-content:center;
@@ -863,3 +1004,9 @@ elif page == "Live Inference":
                 <div>Paste a transcript and click <b>Analyse Call</b></div>
                 <div style='font-size:0.8rem; color:{SLATE_L};'>PII will be automatically redacted before analysis</div>
             </div>""")
+
+# ─────────────────────────────────────────────────────────────
+# DIAGNOSTICS (sidebar toggle)
+# ─────────────────────────────────────────────────────────────
+if show_diagnostics:
+    render_diagnostics(load_executor())
@@ -0,0 +1,62 @@
+# benchmarks/bench_artifacts.py
+"""
+Load time and memory of the clustered_data artifact: CSV vs Parquet, full
+frame vs the dashboard's column projection (no transcript text).
+
+Usage: python -m benchmarks.bench_artifacts --scale 100
+"""
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from benchmarks.common import print_table, timer
+from src.utils.artifacts import PROCESSED_DIR, artifact_paths, read_artifact, write_artifact
+from src.utils.dashboard import DASHBOARD_COLUMNS
+from src.utils.helpers import get_rss_mb
+
+
+def measure(label, load, rows):
+    # RSS delta covers both Python and Arrow's native allocations
+    rss_before = get_rss_mb()
+    timings = {}
+    with timer(timings, label):
+        df = load()
+    rows.append({
+        "load": label,
+        "seconds": f"{timings[label]:.3f}",
+        "rss delta MB": f"{get_rss_mb() - rss_before:.1f}",
+        "frame MB": f"{df.memory_usage(deep=True).sum() / 2**20:.1f}",
+        "columns": df.shape[1],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=20, help="replicate clustered_data this many times")
+    args = parser.parse_args()
+
+    source = pd.read_csv(artifact_paths("clustered_data", PROCESSED_DIR)["csv"])
+    df = pd.concat([source] * args.scale, ignore_index=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_artifact(df, "clustered_data", processed_dir=tmp)
+        paths = artifact_paths("clustered_data", tmp)
+
+        rows = []
+        measure("csv (full)", lambda: pd.read_csv(paths["csv"]), rows)
+        measure("csv (projected)", lambda: pd.read_csv(paths["csv"], usecols=DASHBOARD_COLUMNS), rows)
+        measure("parquet (full)", lambda: read_artifact("clustered_data", processed_dir=tmp), rows)
+        measure("parquet (projected)",
+                lambda: read_artifact("clustered_data", columns=DASHBOARD_COLUMNS, processed_dir=tmp), rows)
+
+        sizes = {fmt: os.path.getsize(p) / 2**20 for fmt, p in paths.items()}
+
+    print_table(rows, f"clustered_data load ({len(df):,} rows)")
+    # Replicated rows compress unrealistically well; compare on-disk size at --scale 1
+    print(f"On disk: csv {sizes['csv']:.1f} MB, parquet {sizes['parquet']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
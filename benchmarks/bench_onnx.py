@@ -0,0 +1,76 @@
+# benchmarks/bench_onnx.py
+"""
+fp32 PyTorch vs int8 ONNX Runtime for the NER and zero-shot models on CPU.
+
+Parity: redaction agreement and name recall (NER), top-intent agreement and
+max score difference (zero-shot) on synthetic transcripts with injected names.
+Speed: per-call latency of the Live Inference path (analyze_call) and the
+resident size of each runtime's models.
+
+Usage: python -m benchmarks.bench_onnx --n 48
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_redaction import build_corpus, recall
+from benchmarks.common import print_table
+from src.models.inference import CallAnalyticsEngine
+from src.utils.helpers import get_rss_mb
+
+
+def load_engine(runtime: str, backend: str):
+    """Engine with both analyze_call stages resident, plus the RSS they added."""
+    rss_before = get_rss_mb()
+    engine = CallAnalyticsEngine(device=-1, runtime=runtime, classifier_backend=backend)
+    engine.warm_up(background=False)
+    engine.analyze_call("warm-up call, my name is John Smith")
+    return engine, get_rss_mb() - rss_before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=48, help="number of synthetic transcripts")
+    parser.add_argument("--backend", default="cached", choices=["pipeline", "cached"])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    texts, names = build_corpus(args.n, args.seed)
+    results, rows = {}, []
+    for runtime in ("torch", "onnx"):
+        engine, rss_mb = load_engine(runtime, args.backend)
+        latencies, outputs = [], []
+        for text in texts:
+            start = time.perf_counter()
+            outputs.append(engine.analyze_call(text))
+            latencies.append((time.perf_counter() - start) * 1000)
+        results[runtime] = outputs
+        report = engine.memory_report()["components"]
+        rows.append({
+            "runtime": f"{runtime} ({engine.sanitizer.runtime}/{report['classifier']['runtime']})",
+            "p50 ms": f"{np.percentile(latencies, 50):.1f}",
+            "p95 ms": f"{np.percentile(latencies, 95):.1f}",
+            "model MB": f"{report['sanitizer']['param_mb'] + report['classifier']['param_mb']:.0f}",
+            "RSS +MB": f"{rss_mb:.0f}",
+            "name recall": f"{recall([o['clean_text'] for o in outputs], names):.1%}",
+        })
+        del engine
+
+    base, fast = rows[0], rows[1]
+    fast["speedup"] = f"{float(base['p50 ms']) / float(fast['p50 ms']):.2f}x"
+    base["speedup"] = "1.00x"
+    print_table(rows, f"Live Inference path on CPU ({len(texts)} calls, {args.backend} zero-shot)")
+
+    torch_out, onnx_out = results["torch"], results["onnx"]
+    score_diff = max(abs(a["all_scores"][k] - b["all_scores"][k])
+                     for a, b in zip(torch_out, onnx_out) for k in a["all_scores"])
+    print_table([{
+        "redaction identical": f"{np.mean([a['clean_text'] == b['clean_text'] for a, b in zip(torch_out, onnx_out)]):.1%}",
+        "top-intent agreement": f"{np.mean([a['intent'] == b['intent'] for a, b in zip(torch_out, onnx_out)]):.1%}",
+        "max score diff": f"{score_diff:.4f}",
+    }], "Parity: onnx vs torch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_similarity.py
+"""
+Similar-calls search: exact brute force vs the IVF int8 index on a synthetic
+embedding set (mixture of topic centres plus noise, MPNet-sized vectors).
+Reports build time, per-query latency and recall@k against exact search.
+
+Usage: python -m benchmarks.bench_similarity --rows 200000 --queries 200
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from benchmarks.common import print_table, timer
+from src.features.similarity import ExactIndex, IVFIndex
+
+
+def synthetic_embeddings(path: str, rows: int, dim: int, topics: int, seed: int) -> np.ndarray:
+    """Writes a memmapped (rows, dim) float32 matrix in chunks and returns it read-only."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(topics, dim)).astype(np.float32)
+    out = open_memmap(path, mode="w+", dtype=np.float32, shape=(rows, dim))
+    for start in range(0, rows, 50_000):
+        n = min(50_000, rows - start)
+        out[start:start + n] = centres[rng.integers(0, topics, n)] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+    out.flush()
+    del out
+    return np.load(path, mmap_mode="r")
+
+
+def exact_neighbours(vectors, queries, k):
+    """Ground truth by a chunked brute-force scan (never holds the full matrix in RAM)."""
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+    best_scores = np.zeros((len(queries), 0), dtype=np.float32)
+    for start in range(0, len(vectors), 50_000):
+        chunk = np.asarray(vectors[start:start + 50_000], dtype=np.float32)
+        scores = queries @ (chunk / np.linalg.norm(chunk, axis=1, keepdims=True)).T
+        best_rows = np.hstack([best_rows, np.broadcast_to(np.arange(start, start + len(chunk)), scores.shape)])
+        best_scores = np.hstack([best_scores, scores])
+        keep = np.argsort(-best_scores, axis=1)[:, :k]
+        best_rows = np.take_along_axis(best_rows, keep, axis=1)
+        best_scores = np.take_along_axis(best_scores, keep, axis=1)
+    return best_rows
+
+
+def latency_row(name, index, queries, k, truth=None):
+    times, found = [], []
+    for q in queries:
+        start = time.perf_counter()
+        rows, _ = index.search(q, k)
+        times.append((time.perf_counter() - start) * 1000)
+        found.append(rows)
+    row = {"index": name, "p50 ms": f"{np.percentile(times, 50):.2f}", "p95 ms": f"{np.percentile(times, 95):.2f}"}
+    if truth is not None:
+        recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+        row[f"recall@{k}"] = f"{recall:.3f}"
+    return row, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--topics", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--exact-max-rows", type=int, default=500_000,
+                        help="Skip the in-memory exact index above this size (it holds a float32 copy)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vectors = synthetic_embeddings(os.path.join(tmp, "emb.npy"), args.rows, args.dim, args.topics, args.seed)
+        rng = np.random.default_rng(args.seed + 1)
+        queries = vectors[np.sort(rng.choice(args.rows, args.queries, replace=False))]
+        queries = queries + 0.3 * rng.normal(size=queries.shape).astype(np.float32)
+
+        truth = exact_neighbours(vectors, queries, args.k)
+        rows = []
+        times = {}
+        if args.rows <= args.exact_max_rows:
+            with timer(times, "exact"):
+                exact = ExactIndex(vectors)
+            exact_row, _ = latency_row("exact", exact, queries, args.k, truth)
+            exact_row["build s"] = f"{times['exact']:.1f}"
+            rows.append(exact_row)
+            del exact
+        with timer(times, "ivf"):
+            ivf = IVFIndex.build(vectors, nprobe=args.nprobe)
+        ivf_row, _ = latency_row(f"ivf (nlist={len(ivf.centroids)}, nprobe={args.nprobe})", ivf, queries, args.k, truth)
+        ivf_row["build s"] = f"{times['ivf']:.1f}"
+        rows.append(ivf_row)
+        print_table(rows, f"Similar-calls search over {args.rows:,} x {args.dim}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_simulator.py
+"""
+Scalar vs vectorized call simulator: wall time per call and agreement of the
+outcome marginals (resolution / escalation / churn rates, CSAT, duration,
+turns) so the NumPy version can be trusted as a drop-in data source.
+
+Usage: python -m benchmarks.bench_simulator --scalar-n 20000 --vector-n 1000000
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import print_table, synthetic_calls, timer
+from src.database.vectorized_simulator import VectorizedCallSimulator
+
+
+def scalar_marginals(calls):
+    return {
+        "resolved_rate": np.mean([c["resolved"] for c in calls]),
+        "escalated_rate": np.mean([c["escalated"] for c in calls]),
+        "churn_rate": np.mean([c["churned"] for c in calls]),
+        "mean_csat": np.mean([c["csat"] for c in calls]),
+        "mean_duration": np.mean([c["duration_sec"] for c in calls]),
+        "mean_turns": np.mean([len(c["transcript"]) for c in calls]),
+    }
+
+
+def vector_marginals(df):
+    return {
+        "resolved_rate": df["resolved"].mean(),
+        "escalated_rate": df["escalated"].mean(),
+        "churn_rate": df["churned"].mean(),
+        "mean_csat": df["csat_score"].mean(),
+        "mean_duration": df["duration_sec"].mean(),
+        "mean_turns": df["turns_count"].mean(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scalar-n", type=int, default=20_000)
+    parser.add_argument("--vector-n", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    times = {}
+    with timer(times, "scalar"):
+        calls = synthetic_calls(args.scalar_n, args.seed)
+    with timer(times, "vectorized"):
+        df = VectorizedCallSimulator(seed=args.seed).generate_batch(args.vector_n)
+
+    print_table([
+        {"simulator": "scalar", "calls": args.scalar_n, "seconds": f"{times['scalar']:.2f}",
+         "us/call": f"{times['scalar'] / args.scalar_n * 1e6:.1f}"},
+        {"simulator": "vectorized", "calls": args.vector_n, "seconds": f"{times['vectorized']:.2f}",
+         "us/call": f"{times['vectorized'] / args.vector_n * 1e6:.1f}"},
+    ], "Generation time")
+
+    scalar, vector = scalar_marginals(calls), vector_marginals(df)
+    print_table([
+        {"metric": k, "scalar": f"{scalar[k]:.4f}", "vectorized": f"{vector[k]:.4f}",
+         "abs diff": f"{abs(scalar[k] - vector[k]):.4f}"}
+        for k in scalar
+    ], "Marginals")
+
+    speedup = (times["scalar"] / args.scalar_n) / (times["vectorized"] / args.vector_n)
+    print(f"\nPer-call speedup: {speedup:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
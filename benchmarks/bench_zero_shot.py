@@ -0,0 +1,72 @@
+# benchmarks/bench_zero_shot.py
+"""
+Zero-shot intent classification throughput on CPU:
+pipeline("zero-shot-classification") per call (what analyze_call did),
+the same pipeline batched, CachedZeroShotClassifier, and the centroid backend
+(one MPNet embedding per call vs data/models/intent_centroids.npz, or label-text
+centroids if that file has not been built).
+
+Usage: python -m benchmarks.bench_zero_shot --n 64 --batch-size 8
+"""
+import argparse
+import os
+
+import torch
+from transformers import pipeline
+
+from benchmarks.common import print_table, synthetic_transcripts, timer
+from src.features.embeddings import VectorEngine
+from src.models.centroid import DEFAULT_CENTROID_PATH, CentroidIntentClassifier
+from src.models.inference import CANDIDATE_LABELS
+from src.models.zero_shot import CachedZeroShotClassifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=64, help="number of synthetic transcripts")
+    parser.add_argument("--batch-size", type=int, default=8, help="transcripts per forward pass")
+    parser.add_argument("--model", default="facebook/bart-large-mnli")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    texts = [t.lower() for t in synthetic_transcripts(args.n)]
+    labels = list(CANDIDATE_LABELS)
+    pair_batch = args.batch_size * len(labels)
+
+    zero_shot = pipeline("zero-shot-classification", model=args.model, device=-1)
+    cached = CachedZeroShotClassifier(model_name=args.model, device=-1)
+    if os.path.exists(DEFAULT_CENTROID_PATH):
+        centroid = CentroidIntentClassifier.load(VectorEngine(), DEFAULT_CENTROID_PATH)
+    else:
+        centroid = CentroidIntentClassifier.from_labels(VectorEngine(), labels)
+    zero_shot(texts[:2], labels)  # warm-up every path
+    cached(texts[:2], labels)
+    centroid(texts[:2], labels)
+
+    timings = {}
+    with timer(timings, "pipeline (per call)"):
+        baseline = [zero_shot(t, labels) for t in texts]
+    with timer(timings, "pipeline (batched)"):
+        zero_shot(texts, labels, batch_size=pair_batch)
+    with timer(timings, "cached hypotheses"):
+        fast = cached(texts, labels, batch_size=pair_batch)
+    with timer(timings, "centroid (MPNet)"):
+        nearest = centroid(texts, labels, batch_size=args.batch_size)
+
+    agreement = sum(a["labels"][0] == b["labels"][0] for a, b in zip(baseline, fast)) / len(texts)
+    centroid_agreement = sum(a["labels"][0] == b["labels"][0] for a, b in zip(baseline, nearest)) / len(texts)
+    rows = [
+        {"path": name, "seconds": f"{secs:.2f}", "calls/sec": f"{len(texts) / secs:.2f}",
+         "speedup": f"{timings['pipeline (per call)'] / secs:.2f}x"}
+        for name, secs in timings.items()
+    ]
+    print_table(rows, f"Zero-shot on CPU ({len(texts)} calls, {len(labels)} labels, threads={torch.get_num_threads()})")
+    print(f"Top-intent agreement cached vs pipeline: {agreement:.1%}")
+    print(f"Top-intent agreement centroid vs pipeline: {centroid_agreement:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# benchmarks/common.py
+import random
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+from src.database.data_generator import StochasticCallCenterSimulator
+
+
+def synthetic_calls(n: int, seed: int = 42) -> List[Dict]:
+    """Generates n calls with the stochastic simulator (reproducible via seed, global random state untouched)."""
+    simulator = StochasticCallCenterSimulator(rng=random.Random(seed))
+    return [simulator.generate_call() for _ in range(n)]
+
+
+def synthetic_transcripts(n: int, seed: int = 42) -> List[str]:
+    """Flattened raw transcripts, the same text notebook 01 stores as clean_text."""
+    simulator = StochasticCallCenterSimulator()
+    return [simulator.generate_clean_text(call["transcript"]) for call in synthetic_calls(n, seed)]
+
+
+@contextmanager
+def timer(results: Dict, key: str):
+    """Stores the elapsed wall-clock seconds of the block in results[key]."""
+    start = time.perf_counter()
+    yield
+    results[key] = time.perf_counter() - start
+
+
+def print_table(rows: List[Dict], title: str):
+    print(f"\n--- {title} ---")
+    if not rows:
+        return
+    headers = list(rows[0].keys())
+    widths = {h: max(len(h), *(len(f"{r[h]}") for r in rows)) for h in headers}
+    print("  ".join(h.ljust(widths[h]) for h in headers))
+    for r in rows:
+        print("  ".join(f"{r[h]}".ljust(widths[h]) for h in headers))
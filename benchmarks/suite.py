@@ -0,0 +1,397 @@
+# benchmarks/suite.py
+"""
+Benchmark suite for the call analytics hot paths.
+
+Drives each stage at several data sizes with StochasticCallCenterSimulator
+transcripts, appends throughput and memory per (case, size) to a JSON history
+file and exits non-zero when a case regresses against the recent baseline
+(median of the last passing runs on the same machine and runtime).
+
+Usage:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --cases regex_redact,clean_batch --sizes 1000,10000
+    python -m benchmarks.suite --skip-models --max-regression 0.15 --no-record
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import print_table
+from src.database.bulk_loader import CALL_LOG_COLUMNS
+from src.database.data_generator import StochasticCallCenterSimulator
+from src.utils.helpers import get_rss_mb
+
+DEFAULT_HISTORY = os.path.join("benchmarks", "results", "history.json")
+
+# Default sizes: cheap string / pandas paths vs model forward passes on CPU
+LIGHT_SIZES = (1_000, 10_000)
+MODEL_SIZES = (16, 64)
+
+
+class Workload:
+    """Simulator output shared by every case; generated once for the largest size, sliced per size."""
+
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+        self._records = None
+        self._models = {}
+
+    def shared(self, name: str, factory: Callable):
+        """Models are built once per suite run and reused across sizes."""
+        if name not in self._models:
+            self._models[name] = factory()
+        return self._models[name]
+
+    def _ensure(self, n: int):
+        if self._records is not None and len(self._records) >= n:
+            return
+        simulator = StochasticCallCenterSimulator(rng=random.Random(self.seed))
+        self._records = pd.DataFrame(list(simulator.iter_records(n)), columns=list(CALL_LOG_COLUMNS))
+
+    def call_logs(self, n: int) -> pd.DataFrame:
+        """call_logs rows as `SELECT * FROM call_logs` returns them (transcript_json as JSON text)."""
+        self._ensure(n)
+        return self._records.iloc[:n].copy()
+
+    def transcripts(self, n: int) -> List[str]:
+        """Flattened raw transcripts (clean_text before redaction)."""
+        self._ensure(n)
+        return self._records["clean_text"].iloc[:n].tolist()
+
+
+# ── Notebook 01's original row-wise feature extraction, kept as the baseline for extract_features ──
+def notebook01_features(df: pd.DataFrame) -> pd.DataFrame:
+    def process_transcript(row):
+        transcript = json.loads(row['transcript_json']) if isinstance(row['transcript_json'], str) else row['transcript_json']
+        full_text = " ".join([turn['text'] for turn in transcript])
+        agent_words = sum(len(t['text'].split()) for t in transcript if t['speaker'] == 'Agent')
+        customer_words = sum(len(t['text'].split()) for t in transcript if t['speaker'] == 'Customer')
+        ratio = agent_words / customer_words if customer_words > 0 else 0
+        return pd.Series({
+            'clean_text': full_text,
+            'agent_word_count': agent_words,
+            'customer_word_count': customer_words,
+            'talk_ratio': round(ratio, 2),
+            'turns_count': len(transcript)
+        })
+
+    df = pd.concat([df, df.apply(process_transcript, axis=1)], axis=1)
+
+    cols_to_keep = [
+        'agent_id', 'timestamp', 'duration_sec', 'csat_score',
+        'issue_category', 'customer_persona', 'clean_text',
+        'talk_ratio', 'turns_count', 'resolved', 'escalated', 'churned'
+    ]
+    new_df = df.loc[:, ~df.columns.duplicated()].copy()
+    new_df = new_df[cols_to_keep]
+    new_df['timestamp'] = pd.to_datetime(new_df['timestamp'])
+    new_df['hour_of_day'] = new_df['timestamp'].dt.hour
+    new_df['is_weekend'] = new_df['timestamp'].dt.dayofweek // 5
+    new_df['avg_word_per_turn'] = (new_df['duration_sec'] / new_df['turns_count']).round(2)
+    return new_df.drop(columns=['timestamp'])
+
+
+# ── Cases: setup(workload, size, args) -> zero-arg callable timed by the runner ──
+def setup_regex_redact(workload: Workload, n: int, args) -> Callable:
+    from src.preprocessing.cleaner import TextSanitizer
+
+    sanitizer = TextSanitizer(tier="regex")
+    texts = workload.transcripts(n)
+    return lambda: [sanitizer._regex_redact(t) for t in texts]
+
+
+def setup_batch_redact(workload: Workload, n: int, args) -> Callable:
+    from src.preprocessing.cleaner import TextSanitizer
+
+    sanitizer = workload.shared("sanitizer", lambda: TextSanitizer(tier=args.redaction_tier, runtime=args.runtime))
+    texts = workload.transcripts(n)
+    sanitizer.batch_redact(texts[:2])  # warm-up: model load is not part of the measurement
+    return lambda: sanitizer.batch_redact(texts, batch_size=args.batch_size)
+
+
+def setup_clean_batch(workload: Workload, n: int, args) -> Callable:
+    from src.preprocessing.cleaner import TextSanitizer
+
+    sanitizer = TextSanitizer(tier="regex")
+    texts = workload.transcripts(n)
+    return lambda: sanitizer.clean_batch(texts)
+
+
+def setup_generate_embeddings(workload: Workload, n: int, args) -> Callable:
+    from src.features.embeddings import VectorEngine
+
+    engine = workload.shared("vector_engine", VectorEngine)  # no cache: every text is encoded
+    texts = [t.lower() for t in workload.transcripts(n)]
+    engine.generate_embeddings(texts[:2], verbose=False)
+    return lambda: engine.generate_embeddings(texts, batch_size=args.batch_size, verbose=False)
+
+
+def setup_zero_shot(workload: Workload, n: int, args) -> Callable:
+    from src.models.inference import CallAnalyticsEngine
+
+    engine = workload.shared("engine", lambda: CallAnalyticsEngine(classifier_backend=args.zero_shot_backend,
+                                                                 runtime=args.runtime))
+    labels = engine.candidate_labels
+    texts = [t.lower() for t in workload.transcripts(n)]
+    pair_batch = args.batch_size * len(labels)
+    engine.classifier(texts[:2], labels, batch_size=pair_batch)
+    return lambda: engine.classifier(texts, labels, batch_size=pair_batch)
+
+
+def _pipeline_engine(workload: Workload, args):
+    from src.models.inference import CallAnalyticsEngine
+
+    # No result cache: every call goes through redaction and classification
+    return workload.shared("pipeline_engine", lambda: CallAnalyticsEngine(
+        classifier_backend=args.zero_shot_backend, redaction_tier=args.redaction_tier, runtime=args.runtime))
+
+
+def setup_analyze_call_loop(workload: Workload, n: int, args) -> Callable:
+    """Baseline for analyze_calls: one analyze_call (batch of 1 through every stage) per transcript."""
+    engine = _pipeline_engine(workload, args)
+    texts = workload.transcripts(n)
+    engine.analyze_call(texts[0])
+    return lambda: [engine.analyze_call(t) for t in texts]
+
+
+def setup_analyze_calls(workload: Workload, n: int, args) -> Callable:
+    engine = _pipeline_engine(workload, args)
+    texts = workload.transcripts(n)
+    list(engine.analyze_calls(texts[:2]))
+    return lambda: list(engine.analyze_calls(texts, batch_size=args.batch_size))
+
+
+def setup_notebook01_features(workload: Workload, n: int, args) -> Callable:
+    calls = workload.call_logs(n)
+    return lambda: notebook01_features(calls)
+
+
+def setup_extract_features(workload: Workload, n: int, args) -> Callable:
+    from src.features.extraction import build_feature_set
+
+    calls = workload.call_logs(n)
+    return lambda: build_feature_set(calls)
+
+
+def setup_load_data(workload: Workload, n: int, args) -> Callable:
+    from src.features.extraction import build_feature_set
+    from src.pipeline.scorecard import FrictionScorecard
+    from src.utils.artifacts import write_artifact
+    from src.utils.dashboard import load_dashboard_data
+
+    # A clustered_data artifact of n rows plus its scorecard, in a scratch processed dir
+    rng = np.random.default_rng(workload.seed)
+    clustered = build_feature_set(workload.call_logs(n))
+    clustered["cluster_id"] = rng.integers(-1, 6, size=n)
+    clustered["x_coord"] = rng.normal(size=n)
+    clustered["y_coord"] = rng.normal(size=n)
+    clustered["sanitized_text"] = clustered["clean_text"]
+    names = {i: f"Archetype {i}" for i in range(6)}
+
+    processed_dir = tempfile.mkdtemp(prefix="callsense_bench_")
+    atexit.register(shutil.rmtree, processed_dir, ignore_errors=True)
+    write_artifact(clustered, "clustered_data", processed_dir, csv=False)
+    FrictionScorecard().update(clustered, names).save(processed_dir)
+    return lambda: load_dashboard_data(processed_dir)
+
+
+# name -> (setup, default sizes, loads a transformer model)
+CASES = {
+    "regex_redact": (setup_regex_redact, LIGHT_SIZES, False),
+    "clean_batch": (setup_clean_batch, LIGHT_SIZES, False),
+    "notebook01_features": (setup_notebook01_features, LIGHT_SIZES, False),
+    "extract_features": (setup_extract_features, LIGHT_SIZES, False),
+    "load_data": (setup_load_data, LIGHT_SIZES, False),
+    "batch_redact": (setup_batch_redact, MODEL_SIZES, True),
+    "generate_embeddings": (setup_generate_embeddings, MODEL_SIZES, True),
+    "zero_shot": (setup_zero_shot, MODEL_SIZES, True),
+    "analyze_call_loop": (setup_analyze_call_loop, MODEL_SIZES, True),
+    "analyze_calls": (setup_analyze_calls, MODEL_SIZES, True),
+}
+
+
+def _reset_peak_rss() -> bool:
+    """Resets VmHWM so each case reports its own peak (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def measure(run: Callable, n: int, repeat: int) -> Dict:
+    """Best-of-repeat wall time plus RSS growth and peak RSS above the pre-run level."""
+    rss_before = get_rss_mb()
+    peak_tracked = _reset_peak_rss()
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = run()
+        seconds.append(time.perf_counter() - start)
+        del output
+    best = min(seconds)
+    return {
+        "seconds": round(best, 6),
+        "items_per_sec": round(n / best, 2) if best > 0 else float("inf"),
+        "rss_delta_mb": round(get_rss_mb() - rss_before, 1),
+        "peak_delta_mb": round(get_rss_mb("VmHWM") - rss_before, 1) if peak_tracked else None,
+    }
+
+
+def environment(args) -> Dict:
+    """Runs are only compared against runs with the same fingerprint."""
+    return {
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "runtime": args.runtime,
+        "redaction_tier": args.redaction_tier,
+        "zero_shot_backend": args.zero_shot_backend,
+        "batch_size": args.batch_size,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(history: List[Dict], path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp, path)
+
+
+def find_regressions(results: List[Dict], history: List[Dict], env: Dict, max_regression: float,
+                     max_memory_regression: float, baseline_runs: int = 5, memory_floor_mb: float = 10.0) -> List[Dict]:
+    """
+    Compares each result to the median of the last baseline_runs passing runs
+    with the same environment. Throughput may drop by at most max_regression;
+    peak memory may grow by at most max_memory_regression (growth under
+    memory_floor_mb is treated as noise).
+    """
+    previous = [run for run in history if run.get("environment") == env and run.get("passed", True)]
+    regressions = []
+    for result in results:
+        key = (result["case"], result["size"])
+        prior = [r for run in previous[-baseline_runs:] for r in run["results"] if (r["case"], r["size"]) == key]
+        if not prior:
+            continue
+
+        baseline = statistics.median(r["items_per_sec"] for r in prior)
+        if result["items_per_sec"] < baseline * (1 - max_regression):
+            regressions.append({"case": result["case"], "size": result["size"], "metric": "items_per_sec",
+                                "baseline": round(baseline, 2), "value": result["items_per_sec"],
+                                "change": round(result["items_per_sec"] / baseline - 1, 3)})
+
+        peaks = [r["peak_delta_mb"] for r in prior if r.get("peak_delta_mb") is not None]
+        if peaks and result.get("peak_delta_mb") is not None:
+            baseline_mb = max(statistics.median(peaks), 0.0)
+            growth = result["peak_delta_mb"] - baseline_mb
+            if growth > memory_floor_mb and growth > baseline_mb * max_memory_regression:
+                regressions.append({"case": result["case"], "size": result["size"], "metric": "peak_delta_mb",
+                                    "baseline": baseline_mb, "value": result["peak_delta_mb"],
+                                    "change": round(growth / baseline_mb, 3) if baseline_mb else None})
+    return regressions
+
+
+def run_suite(args) -> List[Dict]:
+    names = args.cases.split(",") if args.cases else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        raise SystemExit(f"Unknown case(s): {', '.join(unknown)}. Available: {', '.join(CASES)}")
+
+    sizes_override = [int(s) for s in args.sizes.split(",")] if args.sizes else None
+    workload = Workload(seed=args.seed)
+    results = []
+    for name in names:
+        setup, default_sizes, needs_models = CASES[name]
+        if needs_models and args.skip_models:
+            continue
+        for size in sizes_override or default_sizes:
+            print(f"Running {name} (n={size})...")
+            try:
+                run = setup(workload, size, args)
+            except Exception as e:  # e.g. model weights not available offline
+                print(f"  skipped: {e}")
+                break
+            results.append({"case": name, "size": size, **measure(run, size, args.repeat)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", default=None, help=f"comma-separated subset of: {', '.join(CASES)}")
+    parser.add_argument("--sizes", default=None,
+                        help=f"comma-separated sizes for every case (default {LIGHT_SIZES} / {MODEL_SIZES} for model cases)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case; the fastest is kept")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-models", action="store_true", help="only run cases that load no transformer")
+    parser.add_argument("--batch-size", type=int, default=16, help="texts per forward pass for model cases")
+    parser.add_argument("--redaction-tier", default="ner", choices=("regex", "gazetteer", "ner"))
+    parser.add_argument("--zero-shot-backend", default="cached", choices=("pipeline", "cached", "centroid"))
+    parser.add_argument("--runtime", default="torch", choices=("torch", "onnx"))
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON file the runs are appended to")
+    parser.add_argument("--no-record", action="store_true", help="compare against history without appending")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="allowed throughput drop vs baseline (0.25 = 25%%)")
+    parser.add_argument("--max-memory-regression", type=float, default=0.5,
+                        help="allowed peak-memory growth vs baseline (0.5 = 50%%)")
+    parser.add_argument("--baseline-runs", type=int, default=5, help="recent passing runs the baseline is taken from")
+    args = parser.parse_args()
+
+    env = environment(args)
+    results = run_suite(args)
+    print_table([{"case": r["case"], "size": r["size"], "seconds": f"{r['seconds']:.4f}",
+                  "items/sec": f"{r['items_per_sec']:,.1f}", "rss Δ MB": r["rss_delta_mb"],
+                  "peak Δ MB": r["peak_delta_mb"]} for r in results], "Benchmark suite")
+
+    history = load_history(args.history)
+    regressions = find_regressions(results, history, env, args.max_regression, args.max_memory_regression,
+                                   args.baseline_runs)
+    if not args.no_record:
+        history.append({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "environment": env,
+            "passed": not regressions,
+            "results": results,
+        })
+        save_history(history, args.history)
+        print(f"\nRecorded run #{len(history)} in {args.history}")
+
+    if regressions:
+        print_table(regressions, "Regressions")
+        sys.exit(1)
+    print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
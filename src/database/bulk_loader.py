@@ -0,0 +1,136 @@
+# src/database/bulk_loader.py
+import csv
+import io
+import time
+from itertools import islice
+from typing import Dict, Iterable, Optional, Sequence
+
+# Column order of the records produced by StochasticCallCenterSimulator.iter_records
+CALL_LOG_COLUMNS = (
+    "call_id", "agent_id", "customer_id", "timestamp", "duration_sec",
+    "transcript_json", "csat_score", "issue_category", "customer_persona",
+    "data_quality_score", "clean_text", "agent_word_count",
+    "customer_word_count", "talk_ratio", "turns_count", "resolved",
+    "escalated", "churned",
+)
+
+
+class _Null:
+    """
+    A None in a COPY row. csv.QUOTE_NONNUMERIC quotes every string (so "" stays
+    an empty string) but writes numbers bare; this looks numeric, so it is
+    written as a bare empty field, which FORMAT csv reads as NULL.
+    """
+
+    def __float__(self):
+        return 0.0
+
+    def __str__(self):
+        return ""
+
+
+_NULL = _Null()
+
+
+class CopyBulkLoader:
+    """
+    Streams rows into PostgreSQL with COPY FROM STDIN instead of executemany.
+
+    Rows are consumed lazily in chunks; each chunk is COPY'd into a session-local
+    staging table and merged into the target with one INSERT ... ON CONFLICT DO
+    UPDATE, then committed. Memory is bounded by chunk_size, not the row count.
+    When a key repeats, the row that came last wins, within a chunk and across chunks.
+    """
+
+    def __init__(self, conn, table: str = "call_logs", columns: Sequence[str] = CALL_LOG_COLUMNS,
+                 key: str = "call_id", chunk_size: int = 20_000, touch_column: Optional[str] = "updated_at"):
+        """
+        touch_column: set to NOW() when an existing row is updated, so incremental
+        ETL can find it; skipped if the table has no such column.
+        """
+        self.conn = conn
+        self.table = table
+        self.columns = list(columns)
+        self.key = key
+        self.chunk_size = chunk_size
+        self.touch_column = touch_column
+        self.staging = f"{table}_staging"
+        self.ordinal = "staging_ordinal"
+
+    def _create_staging(self, cursor):
+        # Temp tables are per-session; ON COMMIT DELETE ROWS empties it after every chunk.
+        # The ordinal numbers rows in COPY order (its sequence keeps counting across chunks).
+        cursor.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {self.staging}
+            (LIKE {self.table} INCLUDING DEFAULTS, {self.ordinal} BIGSERIAL)
+            ON COMMIT DELETE ROWS;
+        """)
+
+    def _has_column(self, cursor, column: str) -> bool:
+        cursor.execute("SELECT 1 FROM information_schema.columns WHERE table_name = %s AND column_name = %s;",
+                       (self.table, column))
+        return cursor.fetchone() is not None
+
+    def _merge_sql(self, touch: bool = False) -> str:
+        cols = ", ".join(self.columns)
+        assignments = [f"{c} = EXCLUDED.{c}" for c in self.columns if c != self.key]
+        if touch:
+            assignments.append(f"{self.touch_column} = NOW()")
+        updates = ",\n                ".join(assignments)
+        # DISTINCT ON: a chunk may repeat a key, and ON CONFLICT can't update a row twice;
+        # the highest ordinal is the key's last row in the chunk
+        return f"""
+            INSERT INTO {self.table} ({cols})
+            SELECT DISTINCT ON ({self.key}) {cols} FROM {self.staging}
+            ORDER BY {self.key}, {self.ordinal} DESC
+            ON CONFLICT ({self.key}) DO UPDATE SET
+                {updates};
+        """
+
+    def _to_csv(self, rows: Sequence[tuple]) -> io.StringIO:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for row in rows:
+            writer.writerow([_NULL if v is None else v for v in row])
+        buffer.seek(0)
+        return buffer
+
+    def load(self, rows: Iterable[tuple], verbose: bool = True) -> Dict:
+        """Copies and merges all rows; returns a rows/sec report."""
+        rows = iter(rows)
+        copy_sql = f"COPY {self.staging} ({', '.join(self.columns)}) FROM STDIN WITH (FORMAT csv)"
+
+        total, chunks = 0, 0
+        start = time.perf_counter()
+        cursor = self.conn.cursor()
+        try:
+            touch = bool(self.touch_column) and self._has_column(cursor, self.touch_column)
+            merge_sql = self._merge_sql(touch)
+            self._create_staging(cursor)
+            self.conn.commit()
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                cursor.copy_expert(copy_sql, self._to_csv(chunk))
+                cursor.execute(merge_sql)
+                self.conn.commit()
+
+                total += len(chunk)
+                chunks += 1
+                if verbose:
+                    elapsed = time.perf_counter() - start
+                    print(f"Loaded {total:,} rows ({total / elapsed:,.0f} rows/sec)...")
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        elapsed = time.perf_counter() - start
+        return {
+            "rows": total,
+            "chunks": chunks,
+            "seconds": round(elapsed, 2),
+            "rows_per_sec": round(total / elapsed, 1) if elapsed else 0.0,
+        }
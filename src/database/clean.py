@@ -1,24 +1,14 @@
 # clean_and_repopulate.py
-import psycopg2
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
+from src.database.db_connector import read_frame, transaction
 
 def clean_database():
     """Clean up old data and prepare for new simulation."""
-    conn_params = {
-        'host': os.getenv('DB_HOST', 'localhost'),
-        'database': os.getenv('DB_NAME', 'call_center_db'),
-        'user': os.getenv('DB_USER', 'postgres'),
-        'password': os.getenv('DB_PASSWORD', 'your_password_here'),
-        'port': os.getenv('DB_PORT', '5432')
-    }
-    
-    # Connect to the database
-    conn = psycopg2.connect(**conn_params)
-    cursor = conn.cursor()
+    with transaction() as cursor:
+        _reset_call_logs(cursor)
     
+    print("✅ Database cleaned and prepared for new data!")
+
+def _reset_call_logs(cursor):
     print("🔍 Checking current database state...")
     
     # Count existing records
@@ -51,6 +41,7 @@ def clean_database():
             customer_persona VARCHAR(50),
             data_quality_score DECIMAL(3,2) DEFAULT 1.00,
             created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
             clean_text TEXT,
             agent_word_count INTEGER,
             customer_word_count INTEGER,
@@ -61,35 +52,17 @@ def clean_database():
     
     # Create indexes
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_logs_timestamp ON call_logs(timestamp);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_logs_updated_at ON call_logs(updated_at);")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_logs_agent_id ON call_logs(agent_id);")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_logs_issue_category ON call_logs(issue_category);")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_logs_csat_score ON call_logs(csat_score);")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_transcript_gin ON call_logs USING GIN(transcript_json);")
-    
-    conn.commit()
-    cursor.close()
-    conn.close()
-    
-    print("✅ Database cleaned and prepared for new data!")
 
 def verify_clean_state():
     """Verify the database is clean."""
-    conn_params = {
-        'host': os.getenv('DB_HOST', 'localhost'),
-        'database': os.getenv('DB_NAME', 'call_center_db'),
-        'user': os.getenv('DB_USER', 'postgres'),
-        'password': os.getenv('DB_PASSWORD', 'your_password_here'),
-        'port': os.getenv('DB_PORT', '5432')
-    }
-    
-    conn = psycopg2.connect(**conn_params)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT COUNT(*) FROM call_logs;")
-    count = cursor.fetchone()[0]
-    
-    cursor.close()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM call_logs;")
+        count = cursor.fetchone()[0]
     
     print(f"✅ Verification: Database now has {count} records (should be 0)")
     return count == 0
@@ -113,18 +86,6 @@ if __name__ == "__main__":
         print("🎉 High-fidelity simulation data has been successfully added!")
         
         # Step 4: Verify new data
-        conn_params = {
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'database': os.getenv('DB_NAME', 'call_center_db'),
-            'user': os.getenv('DB_USER', 'postgres'),
-            'password': os.getenv('DB_PASSWORD', 'your_password_here'),
-            'port': os.getenv('DB_PORT', '5432')
-        }
-        
-        import pandas as pd
-        conn = psycopg2.connect(**conn_params)
-        
-        # Check new data
         query = """
         SELECT 
             call_id,
@@ -140,7 +101,7 @@ if __name__ == "__main__":
         LIMIT 10;
         """
         
-        df = pd.read_sql_query(query, conn)
+        df = read_frame(query)
         print(f"\n📋 Sample of new high-fidelity data ({len(df)} records shown):")
         print(df)
         
@@ -151,7 +112,6 @@ if __name__ == "__main__":
         print(f"   Duration - Mean: {df['duration_sec'].mean():.1f} seconds")
         print(f"   CSAT - Mean: {df['csat_score'].mean():.2f}")
         
-        conn.close()
         print("\n✅ Database repopulation complete with high-fidelity data!")
     else:
         print("❌ Database cleanup failed. Please check your connection and try again.")
\ No newline at end of file
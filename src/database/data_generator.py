@@ -1,17 +1,200 @@
 # src/database/stochastic_call_simulator.py
-import psycopg2
+import argparse
 import json
 import pandas as pd
 from datetime import datetime, timedelta
 import random
-import os
 from dotenv import load_dotenv
 import uuid
 
+from src.database.db_connector import connection_params, copy_upsert, ensure_database, insert_values, transaction
+
 load_dotenv()
 
 class StochasticCallCenterSimulator:
-    def __init__(self):
+    # ── Conversation templates (shared with the vectorized simulator) ──
+    AGENT_NAMES = ['Sarah', 'Mike', 'Jennifer', 'David', 'Alex', 'Taylor']
+
+    # Opening customer statement by issue and persona
+    PROBLEM_STATEMENTS = {
+        'billing': {
+            'angry': "My bill is completely wrong and I demand you fix it RIGHT NOW!",
+            'loyal': "I noticed some unusual charges on my bill and wanted to check them.",
+            'elderly': "I don't understand these charges on my bill, dear.",
+            'business': "There are unauthorized charges on my corporate account that need immediate attention.",
+            'tech_savvy': "I've identified billing discrepancies that require correction.",
+            'churn_risk': "This is exactly why I'm cancelling - your billing is a mess!",
+        },
+        'internet': {
+            'angry': "My internet has been down for HOURS! I pay for reliable service!",
+            'loyal': "My connection has been spotty lately. Any idea what's happening?",
+            'elderly': "The internet isn't working properly. I can't get my emails.",
+            'business': "Internet is down and it's affecting my business operations. Need immediate fix.",
+            'tech_savvy': "I'm seeing significant packet loss and high latency. Check your infrastructure.",
+            'churn_risk': "This is why I'm leaving - your service is unreliable!",
+        },
+        'device': {
+            'angry': "Your device doesn't work and your instructions are garbage!",
+            'loyal': "I'm having trouble setting up my new device. Can you help?",
+            'elderly': "I can't figure out how to use this new phone. It's too complicated.",
+            'business': "New device isn't working properly. Need it fixed for tomorrow's presentation.",
+            'tech_savvy': "I'm experiencing firmware configuration issues.",
+            'churn_risk': "Your equipment is junk. This is why I'm switching!",
+        },
+        'cancellation': {
+            'angry': "I'm cancelling IMMEDIATELY! Your service is absolutely terrible!",
+            'loyal': "I need to cancel my service. Circumstances have changed.",
+            'elderly': "I think I need to cancel some services. I don't use them all.",
+            'business': "I'm switching providers. Your service doesn't meet our business needs.",
+            'tech_savvy': "I'm cancelling due to consistent service quality issues.",
+            'churn_risk': "I'm cancelling. I already found a better provider!",
+        },
+        'upgrade': {
+            'angry': "I want to upgrade but your process is so frustrating!",
+            'loyal': "I'd like to upgrade my plan. What options do you have?",
+            'elderly': "I was told I could upgrade. Can you help me with that?",
+            'business': "I need to upgrade for business expansion. What's available?",
+            'tech_savvy': "I want to upgrade to the highest speed plan.",
+            'churn_risk': "I'll consider upgrading if you can fix these issues.",
+        },
+    }
+
+    HIGH_SKILL_RESPONSES = {
+        'billing': [
+            "I can see the issue with your bill. Let me correct those charges immediately.",
+            "I've located the error in your billing. I'll process a credit for you now.",
+            "I understand your concern. Let me review your account and fix this.",
+        ],
+        'internet': [
+            "I can see there's an outage in your area. We expect service to be restored soon.",
+            "I'm checking your connection status and seeing some network issues.",
+            "I can reset your connection remotely to resolve this issue.",
+        ],
+        'device': [
+            "Let me guide you through the proper setup steps for your device.",
+            "I see the configuration issue. Let me help you fix it.",
+            "I can send a technician if we can't resolve this remotely.",
+        ],
+        'cancellation': [
+            "Before you go, let me see what I can do to address your concerns.",
+            "I'd like to offer you a special promotion to retain your business.",
+            "Let me review your account to see if we can improve your service.",
+        ],
+        'upgrade': [
+            "I can process that upgrade for you right away.",
+            "I'll move you to our premium plan with enhanced features.",
+            "Let me upgrade your service with the latest options.",
+        ],
+    }
+
+    HIGH_SKILL_NO_PROGRESS_RESPONSES = [
+        "Let me transfer you to a specialist who can better assist.",
+        "I need to escalate this to our technical team for review.",
+        "I'm consulting with our experts to find the best solution.",
+    ]
+
+    MEDIUM_SKILL_RESPONSES = {
+        'billing': [
+            "I see the issue in your account. Let me look into this for you.",
+            "I can help with billing questions. Let me pull up your information.",
+            "I need to check your account details to address this.",
+        ],
+        'internet': [
+            "Let me check the status in your area regarding service.",
+            "I can see your connection history and recent issues.",
+            "I'm reviewing your service status to identify the problem.",
+        ],
+        'device': [
+            "Let me walk you through some troubleshooting steps.",
+            "I can help you with device setup. What model do you have?",
+            "Let me check if there are known issues with your device.",
+        ],
+        'cancellation': [
+            "I understand you're considering cancellation. Can you tell me more?",
+            "I'd like to understand your concerns before you make that decision.",
+            "Before you cancel, let me see what options we have.",
+        ],
+        'upgrade': [
+            "I can help you upgrade your service. What features are you looking for?",
+            "Let me check what upgrade options are available for you.",
+            "I can process an upgrade if that's what you're interested in.",
+        ],
+    }
+
+    MEDIUM_SKILL_NO_PROGRESS_RESPONSES = [
+        "I'm still looking into this for you.",
+        "Let me continue checking on this issue.",
+        "I need more time to resolve your concern.",
+    ]
+
+    LOW_SKILL_RESPONSES = [
+        "Let me pull up your account...",
+        "I'll need to check on that for you.",
+        "Can you repeat your account number?",
+        "Let me see what I can find here.",
+        "I have to look this up in our system.",
+    ]
+
+    # Customer replies by frustration level ('high' > 0.8, 'medium' > 0.5, else 'low')
+    # and persona; personas without their own list use 'default'
+    CUSTOMER_RESPONSES = {
+        'high': {
+            'angry': [
+                "This is taking forever! Fix it NOW!",
+                "I don't have time for this! Just solve the problem!",
+                "You people are incompetent! This is ridiculous!",
+            ],
+            'business': [
+                "I need this resolved immediately. This affects my business.",
+                "This is wasting my time. I have deadlines to meet.",
+                "I expect better service from a professional provider.",
+            ],
+            'default': [
+                "I'm getting frustrated with this process.",
+                "This is taking too long to resolve.",
+                "I'm not happy with how this is progressing.",
+            ],
+        },
+        'medium': {
+            'angry': [
+                "This is not acceptable!",
+                "Why is this so difficult?",
+                "I'm losing patience here!",
+            ],
+            'default': [
+                "This is taking longer than expected.",
+                "I hope this gets resolved soon.",
+                "I'm getting concerned about this.",
+            ],
+        },
+        'low': {
+            'loyal': [
+                "Thank you for your help. I appreciate it.",
+                "I understand these things happen sometimes.",
+                "I'm glad you're working on this for me.",
+            ],
+            'tech_savvy': [
+                "Can you provide more technical details about the fix?",
+                "What's the root cause of this issue?",
+                "Will this prevent future occurrences?",
+            ],
+            'default': [
+                "Okay, thank you for checking on that.",
+                "I appreciate you looking into this.",
+                "That's helpful information, thanks.",
+            ],
+        },
+    }
+
+    HANGUP_TEXT = "I'm done with this. Goodbye."
+
+    def __init__(self, rng=None):
+        """
+        rng: a random.Random for reproducible runs that leave the global random
+            state alone (default: the random module itself).
+        """
+        self.rng = rng or random
+
         # Business physics parameters
         self.persona_frustration_base = {
             'angry': 0.7,
@@ -41,10 +224,10 @@ class StochasticCallCenterSimulator:
 
     def generate_hidden_state(self):
         """Generate the hidden state first (MANDATORY)"""
-        customer_persona = random.choice(['angry', 'loyal', 'elderly', 'business', 'tech_savvy', 'churn_risk'])
-        issue_category = random.choice(['billing', 'internet', 'device', 'cancellation', 'upgrade'])
-        agent_skill = random.uniform(0.1, 1.0)  # 0.0-1.0 scale
-        initial_frustration = random.uniform(0.0, 1.0)
+        customer_persona = self.rng.choice(['angry', 'loyal', 'elderly', 'business', 'tech_savvy', 'churn_risk'])
+        issue_category = self.rng.choice(['billing', 'internet', 'device', 'cancellation', 'upgrade'])
+        agent_skill = self.rng.uniform(0.1, 1.0)  # 0.0-1.0 scale
+        initial_frustration = self.rng.uniform(0.0, 1.0)
         
         # Calculate resolution probability based on agent skill, issue, and persona
         base_resolution = self.issue_resolution_base[issue_category]
@@ -79,64 +262,20 @@ class StochasticCallCenterSimulator:
         resolved = False
         escalated = False
         turns = 0
-        max_turns = random.randint(3, 12)
+        max_turns = self.rng.randint(3, 12)
         
         # Initial problem statement
-        if issue == 'billing':
-            problem = {
-                'angry': "My bill is completely wrong and I demand you fix it RIGHT NOW!",
-                'loyal': "I noticed some unusual charges on my bill and wanted to check them.",
-                'elderly': "I don't understand these charges on my bill, dear.",
-                'business': "There are unauthorized charges on my corporate account that need immediate attention.",
-                'tech_savvy': "I've identified billing discrepancies that require correction.",
-                'churn_risk': "This is exactly why I'm cancelling - your billing is a mess!"
-            }[persona]
-        elif issue == 'internet':
-            problem = {
-                'angry': "My internet has been down for HOURS! I pay for reliable service!",
-                'loyal': "My connection has been spotty lately. Any idea what's happening?",
-                'elderly': "The internet isn't working properly. I can't get my emails.",
-                'business': "Internet is down and it's affecting my business operations. Need immediate fix.",
-                'tech_savvy': "I'm seeing significant packet loss and high latency. Check your infrastructure.",
-                'churn_risk': "This is why I'm leaving - your service is unreliable!"
-            }[persona]
-        elif issue == 'device':
-            problem = {
-                'angry': "Your device doesn't work and your instructions are garbage!",
-                'loyal': "I'm having trouble setting up my new device. Can you help?",
-                'elderly': "I can't figure out how to use this new phone. It's too complicated.",
-                'business': "New device isn't working properly. Need it fixed for tomorrow's presentation.",
-                'tech_savvy': "I'm experiencing firmware configuration issues.",
-                'churn_risk': "Your equipment is junk. This is why I'm switching!"
-            }[persona]
-        elif issue == 'cancellation':
-            problem = {
-                'angry': "I'm cancelling IMMEDIATELY! Your service is absolutely terrible!",
-                'loyal': "I need to cancel my service. Circumstances have changed.",
-                'elderly': "I think I need to cancel some services. I don't use them all.",
-                'business': "I'm switching providers. Your service doesn't meet our business needs.",
-                'tech_savvy': "I'm cancelling due to consistent service quality issues.",
-                'churn_risk': "I'm cancelling. I already found a better provider!"
-            }[persona]
-        else:  # upgrade
-            problem = {
-                'angry': "I want to upgrade but your process is so frustrating!",
-                'loyal': "I'd like to upgrade my plan. What options do you have?",
-                'elderly': "I was told I could upgrade. Can you help me with that?",
-                'business': "I need to upgrade for business expansion. What's available?",
-                'tech_savvy': "I want to upgrade to the highest speed plan.",
-                'churn_risk': "I'll consider upgrading if you can fix these issues."
-            }[persona]
+        problem = self.PROBLEM_STATEMENTS[issue][persona]
         
         transcript.append({"speaker": "Customer", "text": problem})
         
         # Agent greeting
-        agent_name = random.choice(['Sarah', 'Mike', 'Jennifer', 'David', 'Alex', 'Taylor'])
+        agent_name = self.rng.choice(self.AGENT_NAMES)
         agent_greeting = f"Thank you for calling. This is {agent_name}. How can I assist you today?"
         transcript.append({"speaker": "Agent", "text": agent_greeting})
         
         # Simulate conversation turns
-        resolution_achieved = random.random() < resolution_prob
+        resolution_achieved = self.rng.random() < resolution_prob
         resolution_progress = 0.0
         
         while turns < max_turns:
@@ -154,7 +293,7 @@ class StochasticCallCenterSimulator:
                 else:
                     agent_response = self.high_skill_no_progress_response(issue, agent_skill)
             elif agent_skill > 0.4:  # Medium skill
-                if resolution_progress < 0.6 and resolution_achieved and random.random() < 0.7:
+                if resolution_progress < 0.6 and resolution_achieved and self.rng.random() < 0.7:
                     agent_response = self.medium_skill_response(issue, agent_skill, resolution_progress)
                     resolution_progress += 0.1
                     frustration -= 0.08
@@ -173,7 +312,7 @@ class StochasticCallCenterSimulator:
             
             # Check for escalation based on frustration and persona
             if frustration > 0.85 and persona in ['angry', 'churn_risk', 'business']:
-                if random.random() < 0.4:  # High chance of escalation when very frustrated
+                if self.rng.random() < 0.4:  # High chance of escalation when very frustrated
                     escalated = True
                     break
             
@@ -183,147 +322,31 @@ class StochasticCallCenterSimulator:
                 break
             
             # Check for early termination (customer hangs up)
-            if frustration > 0.95 and random.random() < 0.3:
-                transcript.append({"speaker": "Customer", "text": "I'm done with this. Goodbye."})
+            if frustration > 0.95 and self.rng.random() < 0.3:
+                transcript.append({"speaker": "Customer", "text": self.HANGUP_TEXT})
                 break
         
         return transcript, resolved, escalated, resolution_progress
 
     def high_skill_response(self, issue, skill, progress):
-        responses = {
-            'billing': [
-                "I can see the issue with your bill. Let me correct those charges immediately.",
-                "I've located the error in your billing. I'll process a credit for you now.",
-                "I understand your concern. Let me review your account and fix this."
-            ],
-            'internet': [
-                "I can see there's an outage in your area. We expect service to be restored soon.",
-                "I'm checking your connection status and seeing some network issues.",
-                "I can reset your connection remotely to resolve this issue."
-            ],
-            'device': [
-                "Let me guide you through the proper setup steps for your device.",
-                "I see the configuration issue. Let me help you fix it.",
-                "I can send a technician if we can't resolve this remotely."
-            ],
-            'cancellation': [
-                "Before you go, let me see what I can do to address your concerns.",
-                "I'd like to offer you a special promotion to retain your business.",
-                "Let me review your account to see if we can improve your service."
-            ],
-            'upgrade': [
-                "I can process that upgrade for you right away.",
-                "I'll move you to our premium plan with enhanced features.",
-                "Let me upgrade your service with the latest options."
-            ]
-        }
-        return random.choice(responses[issue])
+        return self.rng.choice(self.HIGH_SKILL_RESPONSES[issue])
 
     def high_skill_no_progress_response(self, issue, skill):
-        return random.choice([
-            "Let me transfer you to a specialist who can better assist.",
-            "I need to escalate this to our technical team for review.",
-            "I'm consulting with our experts to find the best solution."
-        ])
+        return self.rng.choice(self.HIGH_SKILL_NO_PROGRESS_RESPONSES)
 
     def medium_skill_response(self, issue, skill, progress):
-        responses = {
-            'billing': [
-                "I see the issue in your account. Let me look into this for you.",
-                "I can help with billing questions. Let me pull up your information.",
-                "I need to check your account details to address this."
-            ],
-            'internet': [
-                "Let me check the status in your area regarding service.",
-                "I can see your connection history and recent issues.",
-                "I'm reviewing your service status to identify the problem."
-            ],
-            'device': [
-                "Let me walk you through some troubleshooting steps.",
-                "I can help you with device setup. What model do you have?",
-                "Let me check if there are known issues with your device."
-            ],
-            'cancellation': [
-                "I understand you're considering cancellation. Can you tell me more?",
-                "I'd like to understand your concerns before you make that decision.",
-                "Before you cancel, let me see what options we have."
-            ],
-            'upgrade': [
-                "I can help you upgrade your service. What features are you looking for?",
-                "Let me check what upgrade options are available for you.",
-                "I can process an upgrade if that's what you're interested in."
-            ]
-        }
-        return random.choice(responses[issue])
+        return self.rng.choice(self.MEDIUM_SKILL_RESPONSES[issue])
 
     def medium_skill_no_progress_response(self, issue, skill):
-        return random.choice([
-            "I'm still looking into this for you.",
-            "Let me continue checking on this issue.",
-            "I need more time to resolve your concern."
-        ])
+        return self.rng.choice(self.MEDIUM_SKILL_NO_PROGRESS_RESPONSES)
 
     def low_skill_response(self, issue, skill):
-        return random.choice([
-            "Let me pull up your account...",
-            "I'll need to check on that for you.",
-            "Can you repeat your account number?",
-            "Let me see what I can find here.",
-            "I have to look this up in our system."
-        ])
+        return self.rng.choice(self.LOW_SKILL_RESPONSES)
 
     def customer_response(self, persona, frustration, issue, progress, resolved):
-        if frustration > 0.8:
-            if persona == 'angry':
-                return random.choice([
-                    "This is taking forever! Fix it NOW!",
-                    "I don't have time for this! Just solve the problem!",
-                    "You people are incompetent! This is ridiculous!"
-                ])
-            elif persona == 'business':
-                return random.choice([
-                    "I need this resolved immediately. This affects my business.",
-                    "This is wasting my time. I have deadlines to meet.",
-                    "I expect better service from a professional provider."
-                ])
-            else:
-                return random.choice([
-                    "I'm getting frustrated with this process.",
-                    "This is taking too long to resolve.",
-                    "I'm not happy with how this is progressing."
-                ])
-        elif frustration > 0.5:
-            if persona == 'angry':
-                return random.choice([
-                    "This is not acceptable!",
-                    "Why is this so difficult?",
-                    "I'm losing patience here!"
-                ])
-            else:
-                return random.choice([
-                    "This is taking longer than expected.",
-                    "I hope this gets resolved soon.",
-                    "I'm getting concerned about this."
-                ])
-        else:
-            if persona == 'loyal':
-                return random.choice([
-                    "Thank you for your help. I appreciate it.",
-                    "I understand these things happen sometimes.",
-                    "I'm glad you're working on this for me."
-                ])
-            elif persona == 'tech_savvy':
-                return random.choice([
-                    "Can you provide more technical details about the fix?",
-                    "What's the root cause of this issue?",
-                    "Will this prevent future occurrences?"
-                ])
-            else:
-                return random.choice([
-                    "Okay, thank you for checking on that.",
-                    "I appreciate you looking into this.",
-                    "That's helpful information, thanks."
-                ])
+        level = 'high' if frustration > 0.8 else 'medium' if frustration > 0.5 else 'low'
+        responses = self.CUSTOMER_RESPONSES[level]
+        return self.rng.choice(responses.get(persona, responses['default']))
 
     def calculate_metrics(self, hidden_state, transcript, resolved, escalated, resolution_progress):
         """Calculate duration, CSAT, and churn based on conversation dynamics"""
@@ -333,7 +356,7 @@ class StochasticCallCenterSimulator:
         base_frustration = hidden_state['initial_frustration']
         
         # Duration based on turns and issue complexity
-        base_duration = len(transcript) * random.randint(25, 45)
+        base_duration = len(transcript) * self.rng.randint(25, 45)
         if issue in ['cancellation', 'billing']:
             base_duration = int(base_duration * 1.3)  # More complex issues take longer
         if agent_skill < 0.5:
@@ -372,7 +395,7 @@ class StochasticCallCenterSimulator:
         if escalated:
             base_churn += 0.15
         
-        churned = random.random() < base_churn
+        churned = self.rng.random() < base_churn
         
         return duration, int(csat), bool(churned)
 
@@ -384,7 +407,7 @@ class StochasticCallCenterSimulator:
         
         return {
             "call_id": f"CALL_{uuid.uuid4().hex[:8].upper()}",
-            "agent_id": f"AGENT_{random.randint(100, 999)}",
+            "agent_id": f"AGENT_{self.rng.randint(100, 999)}",
             "customer_persona": hidden_state['customer_persona'],
             "issue_category": hidden_state['issue_category'],
             "transcript": transcript,
@@ -397,41 +420,16 @@ class StochasticCallCenterSimulator:
 
     def create_database_and_schema(self):
         """Create PostgreSQL database and schema."""
-        conn_params = {
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'database': os.getenv('DB_NAME', 'call_center_db'),
-            'user': os.getenv('DB_USER', 'postgres'),
-            'password': os.getenv('DB_PASSWORD', 'your_password_here'),
-            'port': os.getenv('DB_PORT', '5432')
-        }
-        
-        # Connect to default database first to create our target database
-        conn = psycopg2.connect(
-            host=conn_params['host'],
-            database='postgres',
-            user=conn_params['user'],
-            password=conn_params['password'],
-            port=conn_params['port']
-        )
-        conn.autocommit = True
-        cursor = conn.cursor()
-        
-        # Create database if it doesn't exist
-        cursor.execute(f"""
-            SELECT 1 FROM pg_catalog.pg_database WHERE datname = '{conn_params['database']}';
-        """)
-        exists = cursor.fetchone()
-        if not exists:
-            cursor.execute(f"CREATE DATABASE {conn_params['database']};")
-            print(f"Database {conn_params['database']} created successfully!")
-        
-        cursor.close()
-        conn.close()
-        
-        # Now connect to our specific database and create tables
-        conn = psycopg2.connect(**conn_params)
-        cursor = conn.cursor()
-        
+        database = connection_params()['database']
+        if ensure_database(database):
+            print(f"Database {database} created successfully!")
+
+        with transaction() as cursor:
+            self._create_schema(cursor)
+
+        print("Stochastic Simulation Engine schema created successfully!")
+
+    def _create_schema(self, cursor):
         # Drop table if exists and create new one
         cursor.execute("DROP TABLE IF EXISTS call_logs CASCADE;")
         
@@ -449,6 +447,7 @@ class StochasticCallCenterSimulator:
                 customer_persona VARCHAR(50),
                 data_quality_score DECIMAL(3,2) DEFAULT 1.00,
                 created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
                 clean_text TEXT,
                 agent_word_count INTEGER,
                 customer_word_count INTEGER,
@@ -462,16 +461,11 @@ class StochasticCallCenterSimulator:
         
         # Create indexes for better query performance
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_logs_timestamp ON call_logs(timestamp);")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_logs_updated_at ON call_logs(updated_at);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_logs_agent_id ON call_logs(agent_id);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_logs_issue_category ON call_logs(issue_category);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_logs_csat_score ON call_logs(csat_score);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_transcript_gin ON call_logs USING GIN(transcript_json);")
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-        print("Stochastic Simulation Engine schema created successfully!")
 
     def calculate_word_counts_from_transcript(self, transcript):
         """Calculate word counts from transcript."""
@@ -493,26 +487,10 @@ class StochasticCallCenterSimulator:
                 texts.append(turn.get('text', ''))
         return ' '.join(texts)
 
-    def seed_stochastic_data(self, num_records: int = 1000):
-        """Seed the PostgreSQL database with stochastic synthetic data."""
-        conn_params = {
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'database': os.getenv('DB_NAME', 'call_center_db'),
-            'user': os.getenv('DB_USER', 'postgres'),
-            'password': os.getenv('DB_PASSWORD', 'your_password_here'),
-            'port': os.getenv('DB_PORT', '5432')
-        }
-        
-        conn = psycopg2.connect(**conn_params)
-        cursor = conn.cursor()
-        
-        print(f"Seeding {num_records} stochastic records into PostgreSQL...")
-        
-        records = []
-        simulator = StochasticCallCenterSimulator()
-        
+    def iter_records(self, num_records: int):
+        """Lazily yields call_logs rows (in CALL_LOG_COLUMNS order)."""
         for i in range(num_records):
-            call_data = simulator.generate_call()
+            call_data = self.generate_call()
             
             # Calculate additional metrics from transcript
             agent_words, customer_words = self.calculate_word_counts_from_transcript(call_data['transcript'])
@@ -521,22 +499,22 @@ class StochasticCallCenterSimulator:
             clean_text = self.generate_clean_text(call_data['transcript'])
             
             # Generate timestamp
-            days_back = random.randint(1, 90)
+            days_back = self.rng.randint(1, 90)
             call_time = datetime.now() - timedelta(days=days_back, 
-                                                 hours=random.randint(0, 23),
-                                                 minutes=random.randint(0, 59))
+                                                 hours=self.rng.randint(0, 23),
+                                                 minutes=self.rng.randint(0, 59))
             
-            record = (
+            yield (
                 call_data['call_id'],
                 call_data['agent_id'],
-                f"CUST_{random.randint(5000, 9999)}",
+                f"CUST_{self.rng.randint(5000, 9999)}",
                 call_time,
                 call_data['duration_sec'],
                 json.dumps(call_data['transcript']),
                 call_data['csat'],
                 call_data['issue_category'],
                 call_data['customer_persona'],
-                round(random.uniform(0.6, 1.0), 2),
+                round(self.rng.uniform(0.6, 1.0), 2),
                 clean_text,
                 agent_words,
                 customer_words,
@@ -546,6 +524,32 @@ class StochasticCallCenterSimulator:
                 call_data['escalated'],
                 call_data['churned']
             )
+
+    def seed_stochastic_data(self, num_records: int = 1000, method: str = "copy", chunk_size: int = 20_000,
+                             vectorized: bool = False, seed: int = None):
+        """
+        Seed the PostgreSQL database with stochastic synthetic data.
+        method: "copy" streams rows through COPY into a staging table in
+        chunks (flat memory); "insert" is the legacy executemany upsert.
+        vectorized: generate rows with VectorizedCallSimulator (no transcript
+        text, for benchmark-scale tables).
+        """
+        print(f"Seeding {num_records} stochastic records into PostgreSQL ({method})...")
+
+        if vectorized:
+            from src.database.vectorized_simulator import VectorizedCallSimulator
+            rows = VectorizedCallSimulator(seed=seed).iter_records(num_records, batch_size=chunk_size)
+        else:
+            rows = self.iter_records(num_records)
+
+        if method == "copy":
+            report = copy_upsert(rows, chunk_size=chunk_size)
+            print(f"Successfully seeded {report['rows']} stochastic records into PostgreSQL "
+                  f"({report['rows_per_sec']:,.0f} rows/sec)!")
+            return report
+
+        records = []
+        for i, record in enumerate(rows):
             records.append(record)
             
             if (i + 1) % 100 == 0:
@@ -558,7 +562,7 @@ class StochasticCallCenterSimulator:
                                  data_quality_score, clean_text, agent_word_count, 
                                  customer_word_count, talk_ratio, turns_count, resolved, 
                                  escalated, churned)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            VALUES %s
             ON CONFLICT (call_id) DO UPDATE SET
                 agent_id = EXCLUDED.agent_id,
                 customer_id = EXCLUDED.customer_id,
@@ -576,24 +580,32 @@ class StochasticCallCenterSimulator:
                 turns_count = EXCLUDED.turns_count,
                 resolved = EXCLUDED.resolved,
                 escalated = EXCLUDED.escalated,
-                churned = EXCLUDED.churned;
+                churned = EXCLUDED.churned,
+                updated_at = NOW();
         """
         
-        cursor.executemany(insert_query, records)
-        conn.commit()
-        cursor.close()
-        conn.close()
+        insert_values(insert_query, records)
         
         print(f"Successfully seeded {num_records} stochastic records into PostgreSQL!")
 
 def main():
+    parser = argparse.ArgumentParser(description="Seed call_logs with stochastic synthetic calls")
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--method", choices=["copy", "insert"], default="copy")
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    parser.add_argument("--vectorized", action="store_true",
+                        help="Use the NumPy simulator (fast, no transcript text)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
     simulator = StochasticCallCenterSimulator()
     
     # Create database and schema
     simulator.create_database_and_schema()
     
     # Seed data
-    simulator.seed_stochastic_data(num_records=1000)
+    simulator.seed_stochastic_data(num_records=args.records, method=args.method, chunk_size=args.chunk_size,
+                                   vectorized=args.vectorized, seed=args.seed)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
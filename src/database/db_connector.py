@@ -0,0 +1,212 @@
+# src/database/db_connector.py
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional, Sequence
+
+import pandas as pd
+import psycopg2
+from psycopg2 import extras, pool
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_FETCH_SIZE = 20_000
+
+# Pools are per process (a forked child must not reuse its parent's sockets) and per DB_* settings
+_pools: Dict[tuple, "BlockingConnectionPool"] = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+
+
+def connection_params(database: Optional[str] = None) -> Dict[str, str]:
+    """PostgreSQL settings from the DB_* environment variables (.env)."""
+    return {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'database': database or os.getenv('DB_NAME', 'call_center_db'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', 'your_password_here'),
+        'port': os.getenv('DB_PORT', '5432')
+    }
+
+
+class BlockingConnectionPool(pool.ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool that waits up to `timeout` seconds for a free
+    connection instead of raising as soon as maxconn are checked out.
+    Every checkout pings the connection with SELECT 1 and replaces it if the
+    ping fails. conn.closed only reports client-side closes, so this is what
+    catches a connection the server dropped while it sat idle (a restart,
+    idle_session_timeout, pg_terminate_backend).
+    """
+
+    def __init__(self, minconn: int, maxconn: int, timeout: float = 30.0, **kwargs):
+        super().__init__(minconn, maxconn, **kwargs)
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(maxconn)
+
+    def getconn(self, key=None):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise pool.PoolError(f"no free connection within {self.timeout}s ({self.maxconn} in use)")
+        try:
+            conn = super().getconn(key)
+            # Idle connections may all be dead after a restart; a fresh one ends the loop
+            for _ in range(self.maxconn):
+                if self._alive(conn):
+                    break
+                super().putconn(conn, key, close=True)
+                conn = super().getconn(key)
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    @staticmethod
+    def _alive(conn) -> bool:
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+            conn.rollback()  # hand it out idle, not inside the ping's transaction
+            return True
+        except psycopg2.Error:
+            return False
+
+    def putconn(self, conn, key=None, close: bool = False):
+        try:
+            # The base class rolls back a connection left mid-transaction before keeping it
+            super().putconn(conn, key, close=close or bool(conn.closed))
+        finally:
+            self._slots.release()
+
+
+def get_pool(database: Optional[str] = None) -> BlockingConnectionPool:
+    """
+    Process-wide pool for the current DB_* settings, created on first use.
+    DB_POOL_MIN / DB_POOL_MAX / DB_POOL_TIMEOUT size it.
+    """
+    global _pools_pid
+    params = connection_params(database)
+    key = tuple(sorted(params.items()))
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _pools.clear()
+            _pools_pid = os.getpid()
+        if key not in _pools:
+            _pools[key] = BlockingConnectionPool(
+                int(os.getenv('DB_POOL_MIN', '1')), int(os.getenv('DB_POOL_MAX', '8')),
+                timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')), **params)
+        return _pools[key]
+
+
+def close_pools():
+    """Closes every pooled connection (tests, or before the DB is dropped)."""
+    with _pools_lock:
+        for connection_pool in _pools.values():
+            if not connection_pool.closed:
+                connection_pool.closeall()
+        _pools.clear()
+
+
+def get_connection():
+    """A new, unpooled connection; the caller closes it. Prefer connection() / transaction()."""
+    return psycopg2.connect(**connection_params())
+
+
+@contextmanager
+def connection(conn=None) -> Iterator:
+    """
+    Borrows a pooled connection for the duration of the block and returns it
+    afterwards (rolled back if a transaction was left open). An explicit conn
+    is passed through untouched, so callers can take an optional one.
+    """
+    if conn is not None:
+        yield conn
+        return
+    connection_pool = get_pool()
+    conn = connection_pool.getconn()
+    try:
+        yield conn
+    finally:
+        connection_pool.putconn(conn)
+
+
+@contextmanager
+def transaction(conn=None) -> Iterator:
+    """Cursor inside one transaction: committed when the block exits, rolled back on error."""
+    with connection(conn) as conn:
+        try:
+            with conn.cursor() as cursor:
+                yield cursor
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def read_frame(query: str, params: Optional[Sequence] = None, conn=None) -> pd.DataFrame:
+    """Small result sets (dashboards, checks) as a DataFrame."""
+    with transaction(conn) as cursor:
+        cursor.execute(query, params)
+        return pd.DataFrame(cursor.fetchall(), columns=[d[0] for d in cursor.description])
+
+
+def stream_frames(query: str, params: Optional[Sequence] = None, chunk_size: int = DEFAULT_FETCH_SIZE,
+                  conn=None, name: str = "stream") -> Iterator[pd.DataFrame]:
+    """
+    Large reads through a named (server-side) cursor: the server holds the
+    result set and only chunk_size rows are resident client-side at a time.
+    """
+    with connection(conn) as conn:
+        try:
+            with conn.cursor(name=f"{name}_{os.getpid()}_{threading.get_ident()}") as cursor:
+                cursor.itersize = chunk_size
+                cursor.execute(query, params)
+                columns = None
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    columns = columns or [d[0] for d in cursor.description]
+                    yield pd.DataFrame(rows, columns=columns)
+            conn.commit()  # close the read transaction the named cursor lived in
+        except BaseException:
+            # Also reached when the consumer stops early (GeneratorExit)
+            conn.rollback()
+            raise
+
+
+def insert_values(query: str, records: Iterable[Sequence], page_size: int = 1000, conn=None) -> int:
+    """
+    Multi-row INSERT / upsert via execute_values (query has a single VALUES %s),
+    page_size rows per statement, in one transaction. Returns the row count.
+    """
+    records = list(records)
+    with transaction(conn) as cursor:
+        extras.execute_values(cursor, query, records, page_size=page_size)
+    return len(records)
+
+
+def copy_upsert(rows: Iterable[tuple], conn=None, verbose: bool = True, **loader_kwargs) -> Dict:
+    """Streams rows through CopyBulkLoader (COPY + merge per chunk) on a pooled connection."""
+    from src.database.bulk_loader import CopyBulkLoader
+
+    with connection(conn) as conn:
+        return CopyBulkLoader(conn, **loader_kwargs).load(rows, verbose=verbose)
+
+
+def ensure_database(database: Optional[str] = None) -> bool:
+    """Creates the DB_NAME database if missing (via the maintenance DB); True if it was created."""
+    params = connection_params(database)
+    conn = psycopg2.connect(**dict(params, database='postgres'))
+    conn.autocommit = True  # CREATE DATABASE cannot run inside a transaction
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_catalog.pg_database WHERE datname = %s;", (params['database'],))
+            if cursor.fetchone():
+                return False
+            cursor.execute(f"CREATE DATABASE {params['database']};")
+            return True
+    finally:
+        conn.close()
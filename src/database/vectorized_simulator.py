@@ -0,0 +1,243 @@
+# src/database/vectorized_simulator.py
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.database.bulk_loader import CALL_LOG_COLUMNS
+from src.database.data_generator import StochasticCallCenterSimulator
+
+PERSONAS = ['angry', 'loyal', 'elderly', 'business', 'tech_savvy', 'churn_risk']
+ISSUES = ['billing', 'internet', 'device', 'cancellation', 'upgrade']
+MAX_TURNS = 12
+
+
+def _word_counts(texts) -> np.ndarray:
+    return np.array([len(t.split()) for t in texts], dtype=np.int64)
+
+
+class VectorizedCallSimulator:
+    """
+    NumPy version of StochasticCallCenterSimulator for benchmark-scale datasets.
+
+    Whole batches of calls are simulated as arrays: hidden states, turn counts,
+    frustration trajectories, resolution / escalation / churn outcomes and
+    durations follow the same rules (and therefore the same marginal
+    distributions) as generate_call. The turn loop runs at most 12 times per
+    batch instead of once per call. Transcript text is not materialized; word
+    counts are looked up from the shared response templates.
+
+    call_ids are a per-simulator prefix derived from the seed plus a running
+    counter, so they never repeat within a run (random 32-bit ids are likely
+    to collide past ~77k rows), and they fit call_id VARCHAR(20).
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+        # Separate stream from self.rng, so ids don't shift the simulated values
+        self.id_prefix = int(np.random.SeedSequence(seed).generate_state(1)[0]) & 0xFFFFFF
+        self.next_id = 0
+        scalar = StochasticCallCenterSimulator()
+
+        # Business physics parameters, indexed by persona / issue code
+        self.frustration_base = np.array([scalar.persona_frustration_base[p] for p in PERSONAS])
+        self.churn_base = np.array([scalar.persona_churn_base[p] for p in PERSONAS])
+        self.resolution_base = np.array([scalar.issue_resolution_base[i] for i in ISSUES])
+        self.escalation_personas = np.isin(PERSONAS, ['angry', 'churn_risk', 'business'])
+
+        # Word-count lookup tables built from the scalar simulator's templates
+        S = StochasticCallCenterSimulator
+        self.problem_wc = np.array([_word_counts([S.PROBLEM_STATEMENTS[i][p] for p in PERSONAS]) for i in ISSUES])
+        self.greeting_wc = _word_counts(
+            [f"Thank you for calling. This is {name}. How can I assist you today?" for name in S.AGENT_NAMES])
+        self.high_wc = np.array([_word_counts(S.HIGH_SKILL_RESPONSES[i]) for i in ISSUES])
+        self.high_no_progress_wc = _word_counts(S.HIGH_SKILL_NO_PROGRESS_RESPONSES)
+        self.medium_wc = np.array([_word_counts(S.MEDIUM_SKILL_RESPONSES[i]) for i in ISSUES])
+        self.medium_no_progress_wc = _word_counts(S.MEDIUM_SKILL_NO_PROGRESS_RESPONSES)
+        self.low_wc = _word_counts(S.LOW_SKILL_RESPONSES)
+        levels = ['high', 'medium', 'low']
+        self.customer_wc = np.array([
+            [_word_counts(S.CUSTOMER_RESPONSES[lvl].get(p, S.CUSTOMER_RESPONSES[lvl]['default'])) for p in PERSONAS]
+            for lvl in levels
+        ])  # (level, persona, option)
+        self.hangup_wc = len(S.HANGUP_TEXT.split())
+
+        # ID lookup tables (cheaper than formatting millions of strings)
+        self.agent_ids = np.array([f"AGENT_{i}" for i in range(100, 1000)], dtype=object)
+        self.customer_ids = np.array([f"CUST_{i}" for i in range(5000, 10000)], dtype=object)
+
+    def simulate(self, n: int, trajectories: bool = False) -> Dict[str, np.ndarray]:
+        """Simulates n calls; returns one array per field (see generate_batch)."""
+        rng = self.rng
+
+        # 1. Hidden state
+        persona = rng.integers(0, len(PERSONAS), n)
+        issue = rng.integers(0, len(ISSUES), n)
+        agent_skill = 0.1 + 0.9 * rng.random(n)
+        initial_frustration = rng.random(n)
+
+        persona_factor = 1.0 - (self.frustration_base[persona] * 0.3)
+        resolution_probability = np.minimum(1.0, self.resolution_base[issue] * agent_skill * persona_factor)
+        churn_risk = np.minimum(1.0, self.churn_base[persona] + initial_frustration * 0.4)
+
+        # 2. Conversation
+        max_turns = rng.integers(3, MAX_TURNS + 1, n)
+        resolution_achieved = rng.random(n) < resolution_probability
+        frustration = initial_frustration.copy()
+        progress = np.zeros(n)
+        turns = np.zeros(n, dtype=np.int64)
+        transcript_len = np.full(n, 2, dtype=np.int64)  # problem statement + greeting
+        agent_words = self.greeting_wc[rng.integers(0, len(self.greeting_wc), n)]
+        customer_words = self.problem_wc[issue, persona]
+        active = np.ones(n, dtype=bool)
+        resolved = np.zeros(n, dtype=bool)
+        escalated = np.zeros(n, dtype=bool)
+
+        high = agent_skill > 0.7
+        medium = ~high & (agent_skill > 0.4)
+        low = ~high & ~medium
+        can_escalate = self.escalation_personas[persona]
+        trajectory = np.full((n, MAX_TURNS), np.nan, dtype=np.float32) if trajectories else None
+
+        for t in range(MAX_TURNS):
+            # Only calls still in progress are touched, so late turns cost little
+            idx = np.flatnonzero(active & (turns < max_turns))
+            if idx.size == 0:
+                break
+            m = idx.size
+            iss, per, achieved = issue[idx], persona[idx], resolution_achieved[idx]
+            prog = progress[idx]
+            fr = frustration[idx] + 0.08  # Delay factor
+            turns[idx] += 1
+
+            # Agent response by skill level
+            hi, med, lo = high[idx], medium[idx], low[idx]
+            high_progress = hi & (prog < 0.8) & achieved
+            high_stall = hi & ~high_progress
+            medium_progress = med & (prog < 0.6) & achieved & (rng.random(m) < 0.7)
+            medium_stall = med & ~medium_progress
+
+            prog = prog + np.where(high_progress, 0.15, 0.0)
+            fr = np.where(high_progress, fr - 0.12, fr)
+            prog = prog + np.where(medium_progress, 0.1, 0.0)
+            fr = np.where(medium_progress, fr - 0.08, fr)
+            fr = np.where(medium_stall, fr + 0.05, fr)
+            fr = np.where(lo, fr + 0.15, fr)
+
+            option3 = rng.integers(0, 3, m)
+            option5 = rng.integers(0, 5, m)
+            agent_words[idx] += np.select(
+                [high_progress, high_stall, medium_progress, medium_stall],
+                [self.high_wc[iss, option3], self.high_no_progress_wc[option3],
+                 self.medium_wc[iss, option3], self.medium_no_progress_wc[option3]],
+                self.low_wc[option5],
+            )
+
+            # Customer response by frustration level and persona
+            level = np.where(fr > 0.8, 0, np.where(fr > 0.5, 1, 2))
+            customer_words[idx] += self.customer_wc[level, per, rng.integers(0, 3, m)]
+            transcript_len[idx] += 2
+            if trajectories:
+                trajectory[idx, t] = fr
+
+            # Escalation, resolution, hang-up (first match ends the call)
+            escalate = (fr > 0.85) & can_escalate[idx] & (rng.random(m) < 0.4)
+            resolve = ~escalate & (prog > 0.8) & achieved
+            hang_up = ~escalate & ~resolve & (fr > 0.95) & (rng.random(m) < 0.3)
+            escalated[idx[escalate]] = True
+            resolved[idx[resolve]] = True
+            transcript_len[idx[hang_up]] += 1
+            customer_words[idx[hang_up]] += self.hangup_wc
+            active[idx[escalate | resolve | hang_up]] = False
+
+            progress[idx] = prog
+            frustration[idx] = fr
+
+        # 3. Metrics (same rules as calculate_metrics, called with progress 0 as in generate_call)
+        duration = transcript_len * rng.integers(25, 46, n)
+        complex_issue = np.isin(issue, [ISSUES.index('cancellation'), ISSUES.index('billing')])
+        duration = np.where(complex_issue, (duration * 1.3).astype(np.int64), duration)
+        duration = np.where(agent_skill < 0.5, (duration * 1.2).astype(np.int64), duration)
+        duration = np.clip(duration, 60, 1200)
+
+        csat = 3.0 + np.where(resolved, 1.0, -1.0)
+        csat = np.where(escalated, csat - 0.5, csat)
+        csat = np.where(initial_frustration > 0.7, csat - 0.5, csat)
+        csat = np.where(transcript_len > 8, csat - 0.3, csat)
+        csat = np.clip(np.round(csat), 1, 5).astype(np.int64)
+
+        churn = churn_risk.copy()
+        churn = np.where(resolved, churn * 0.6, churn)
+        churn = np.where(persona == PERSONAS.index('loyal'), churn * 0.3, churn)
+        churn = np.where(csat < 3, churn + 0.2, churn)
+        churn = np.where(escalated, churn + 0.15, churn)
+        churned = rng.random(n) < churn
+
+        out = {
+            "persona": persona,
+            "issue": issue,
+            "agent_skill": agent_skill,
+            "initial_frustration": initial_frustration,
+            "final_frustration": frustration,
+            "turns": turns,
+            "transcript_len": transcript_len,
+            "agent_words": agent_words,
+            "customer_words": customer_words,
+            "resolved": resolved,
+            "escalated": escalated,
+            "churned": churned,
+            "duration_sec": duration,
+            "csat": csat,
+        }
+        if trajectories:
+            out["frustration_trajectory"] = trajectory
+        return out
+
+    def generate_batch(self, n: int) -> pd.DataFrame:
+        """n calls as a call_logs-shaped DataFrame (transcript_json / clean_text are left empty)."""
+        sim = self.simulate(n)
+        rng = self.rng
+
+        offsets = (rng.integers(1, 91, n) * 86400 + rng.integers(0, 24, n) * 3600
+                   + rng.integers(0, 60, n) * 60).astype("timedelta64[s]")
+        timestamps = np.datetime64(datetime.now(), "s") - offsets
+
+        prefix = f"CALL_{self.id_prefix:06X}"
+        call_ids = [f"{prefix}{i:09X}" for i in range(self.next_id, self.next_id + n)]
+        self.next_id += n
+
+        return pd.DataFrame({
+            "call_id": call_ids,
+            "agent_id": self.agent_ids[rng.integers(0, len(self.agent_ids), n)],
+            "customer_id": self.customer_ids[rng.integers(0, len(self.customer_ids), n)],
+            "timestamp": timestamps,
+            "duration_sec": sim["duration_sec"],
+            "transcript_json": None,
+            "csat_score": sim["csat"],
+            "issue_category": pd.Categorical.from_codes(sim["issue"], ISSUES),
+            "customer_persona": pd.Categorical.from_codes(sim["persona"], PERSONAS),
+            "data_quality_score": np.round(0.6 + 0.4 * rng.random(n), 2),
+            "clean_text": None,
+            "agent_word_count": sim["agent_words"],
+            "customer_word_count": sim["customer_words"],
+            "talk_ratio": np.round(sim["agent_words"] / sim["customer_words"], 2),
+            "turns_count": sim["transcript_len"],
+            "resolved": sim["resolved"],
+            "escalated": sim["escalated"],
+            "churned": sim["churned"],
+        }, columns=list(CALL_LOG_COLUMNS))
+
+    def generate(self, num_records: int, batch_size: int = 250_000) -> Iterator[pd.DataFrame]:
+        """Yields DataFrames of at most batch_size calls until num_records are produced."""
+        remaining = num_records
+        while remaining > 0:
+            n = min(batch_size, remaining)
+            yield self.generate_batch(n)
+            remaining -= n
+
+    def iter_records(self, num_records: int, batch_size: int = 250_000):
+        """Row tuples in CALL_LOG_COLUMNS order, ready for CopyBulkLoader."""
+        for batch in self.generate(num_records, batch_size):
+            batch = batch.astype({"timestamp": object, "issue_category": object, "customer_persona": object})
+            yield from batch.itertuples(index=False, name=None)
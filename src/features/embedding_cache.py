@@ -0,0 +1,140 @@
+# src/features/embedding_cache.py
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Sequence
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join("data", "embeddings")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding store keyed by sha1(model name + normalized text).
+
+    Vectors are appended as raw float32 rows to one file next to
+    transcript_embeddings.npy, and their keys to a log with one key per row
+    (the row number is the line number). The dimension is kept in a small
+    meta file. flush() therefore only writes the new vectors, so repeated
+    notebook runs only encode transcripts that have never been seen before.
+    The vectors are memory-mapped on load.
+    """
+
+    def __init__(self, model_name: str, cache_dir: str = DEFAULT_CACHE_DIR, read_only: bool = False):
+        """
+        read_only: never write to disk; new vectors are only kept in memory.
+        Used by pool workers so a single process owns the on-disk store.
+        """
+        self.model_name = model_name
+        self.read_only = read_only
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", model_name).strip("_")
+        self.vectors_path = os.path.join(cache_dir, f"embedding_cache_{slug}.f32")
+        self.keys_path = os.path.join(cache_dir, f"embedding_cache_{slug}_keys.txt")
+        self.meta_path = os.path.join(cache_dir, f"embedding_cache_{slug}_meta.json")
+
+        self.hits = 0
+        self.misses = 0
+        self._index: Dict[str, int] = {}
+        self._vectors = None
+        self._rows = 0
+        self._keys_bytes = 0
+        self._dim = None
+        self._pending: Dict[str, np.ndarray] = {}
+
+        # meta is written last by the first flush, so without it there is no committed row
+        if os.path.exists(self.meta_path):
+            self._load()
+
+    def _load(self):
+        with open(self.meta_path) as f:
+            self._dim = json.load(f)["dim"]
+        keys = []
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path) as f:
+                keys = f.read().split("\n")[:-1]  # a key without its newline is an interrupted append
+        vector_rows = os.path.getsize(self.vectors_path) // (4 * self._dim) if os.path.exists(self.vectors_path) else 0
+        # Rows need both their vector and their key; anything past that is a torn flush
+        self._rows = min(len(keys), vector_rows)
+        self._index = {key: row for row, key in enumerate(keys[:self._rows])}
+        self._keys_bytes = sum(len(key) + 1 for key in keys[:self._rows])
+        self._map()
+
+    def _map(self):
+        # np.memmap can't map an empty file
+        self._vectors = (np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._rows, self._dim))
+                         if self._rows else None)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Same normalization as TextSanitizer.clean_batch."""
+        return _WHITESPACE.sub(" ", text.lower().strip())
+
+    def key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.model_name}\x00{self.normalize(text)}".encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._index) + len(self._pending)
+
+    def lookup(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Returns the cached vectors for the keys that are present."""
+        found = {}
+        for key in keys:
+            if key in self._pending:
+                found[key] = self._pending[key]
+            elif key in self._index:
+                found[key] = np.asarray(self._vectors[self._index[key]])
+        return found
+
+    def add(self, keys: Sequence[str], vectors: np.ndarray):
+        """Stages new vectors in memory; call flush() to persist them."""
+        for key, vector in zip(keys, vectors):
+            if key not in self._index:
+                self._pending[key] = np.asarray(vector, dtype=np.float32)
+
+    def flush(self):
+        """Appends staged vectors and their keys to the on-disk store; existing rows are not rewritten."""
+        if self.read_only or not self._pending:
+            return
+        os.makedirs(os.path.dirname(self.vectors_path) or ".", exist_ok=True)
+        keys = list(self._pending)
+        new = np.ascontiguousarray(np.vstack(list(self._pending.values())), dtype=np.float32)
+        first_flush = self._dim is None
+        if first_flush:
+            self._dim = new.shape[1]
+
+        # 1. Vectors first, then keys: a row only counts once its key is written.
+        #    Truncating to the known rows drops whatever a torn flush left behind.
+        key_lines = "".join(f"{k}\n" for k in keys).encode("ascii")
+        for path, size, payload in ((self.vectors_path, self._rows * self._dim * 4, new.tobytes()),
+                                    (self.keys_path, self._keys_bytes, key_lines)):
+            with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                f.truncate(size)
+                f.seek(size)
+                f.write(payload)
+
+        # 2. The first flush commits the store by writing meta last; until then a reopen starts empty
+        if first_flush:
+            with open(self.meta_path + ".tmp", "w") as f:
+                json.dump({"model_name": self.model_name, "dtype": "float32", "dim": self._dim}, f)
+            os.replace(self.meta_path + ".tmp", self.meta_path)
+
+        # 3. Index the new rows and re-map the longer file
+        for offset, key in enumerate(keys):
+            self._index[key] = self._rows + offset
+        self._rows += len(keys)
+        self._keys_bytes += len(key_lines)
+        self._map()
+        self._pending = {}
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self),
+        }
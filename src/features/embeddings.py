@@ -1,14 +1,74 @@
 # src/features/embeddings.py
+import os
+from typing import Optional
+
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from src.features.embedding_cache import EmbeddingCache
+from src.utils.batching import DEFAULT_MAX_TOKENS, LengthBucketScheduler, token_lengths
+
+# Transcript vectors saved by notebook 02, row-aligned with clustered_data
+DEFAULT_EMBEDDINGS_PATH = os.path.join("data", "embeddings", "transcript_embeddings.npy")
+
 class VectorEngine:
-    def __init__(self, model_name='all-mpnet-base-v2'):
+    def __init__(self, model_name='all-mpnet-base-v2', cache_dir: Optional[str] = None,
+                 read_only_cache: bool = False, max_batch_tokens: Optional[int] = DEFAULT_MAX_TOKENS):
+        """
+        cache_dir: if set, embeddings are read from / written to an EmbeddingCache
+        there (e.g. data/embeddings) and only unseen transcripts are encoded.
+        read_only_cache: look up the cache but never write it to disk.
+        max_batch_tokens: padded-token budget per encode batch (None = fixed batch_size).
+        """
         # MPNet is the gold standard for sentence embeddings in 2026
-        self.model = SentenceTransformer(model_name)
+        self.model_name = model_name
+        self.cache = EmbeddingCache(model_name, cache_dir, read_only=read_only_cache) if cache_dir else None
+        self._model = None
+        self.scheduler = LengthBucketScheduler(max_batch_tokens)
 
-    def generate_embeddings(self, texts: list):
+    @property
+    def model(self) -> SentenceTransformer:
+        # Loaded on first encode, so a fully cached run never loads MPNet
+        if self._model is None:
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def generate_embeddings(self, texts: list, batch_size: int = 32, verbose: bool = True):
         """Converts a list of transcripts into a matrix of embeddings."""
-        print(f"Generating embeddings for {len(texts)} transcripts...")
-        embeddings = self.model.encode(texts, show_progress_bar=True)
-        return embeddings
\ No newline at end of file
+        if self.cache is None:
+            if verbose:
+                print(f"Generating embeddings for {len(texts)} transcripts...")
+            return self._encode(texts, batch_size)
+
+        keys = [self.cache.key(t) for t in texts]
+        found = self.cache.lookup(keys)
+
+        # Encode each unseen text once, even if it repeats within this batch
+        miss_texts = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in miss_texts:
+                miss_texts[key] = text
+        self.cache.misses += len(miss_texts)
+        self.cache.hits += len(texts) - len(miss_texts)
+
+        if verbose:
+            print(f"Generating embeddings for {len(texts)} transcripts "
+                  f"({len(miss_texts)} to encode, {len(texts) - len(miss_texts)} cached)...")
+        if miss_texts:
+            encoded = self._encode(list(miss_texts.values()), batch_size)
+            found.update(zip(miss_texts.keys(), encoded))
+            self.cache.add(list(miss_texts.keys()), encoded)
+            self.cache.flush()
+
+        return np.vstack([found[key] for key in keys]).astype(np.float32)
+
+    def _encode(self, texts: list, batch_size: int) -> np.ndarray:
+        """Encodes token-budget batches of similar-length texts; rows keep the input order."""
+        model = self.model
+        if not len(texts):
+            return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+        lengths = token_lengths(texts, model.tokenizer, max_length=model.max_seq_length)
+        rows = self.scheduler.map(
+            lambda batch: model.encode(batch, batch_size=len(batch), show_progress_bar=False),
+            texts, lengths, max_batch_size=batch_size)
+        return np.vstack(rows).astype(np.float32)
@@ -0,0 +1,199 @@
+# src/features/extraction.py
+import argparse
+import json
+import os
+import time
+from typing import Dict, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.database.db_connector import stream_frames
+from src.utils.artifacts import PROCESSED_DIR, artifact_paths
+from src.utils.helpers import get_rss_mb
+
+DEFAULT_CHUNK_SIZE = 20_000
+
+# Only what notebook 01's feature set needs; jsonb comes back as text and is parsed per chunk
+EXTRACT_QUERY = """
+    SELECT call_id, agent_id, timestamp, duration_sec, transcript_json::text AS transcript_json,
+           csat_score, issue_category, customer_persona, resolved, escalated, churned
+    FROM call_logs
+"""
+
+# analytics_base layout (notebook 01 build_feature_set, keyed by call_id)
+ANALYTICS_SCHEMA = pa.schema([
+    ("call_id", pa.string()),
+    ("agent_id", pa.string()),
+    ("duration_sec", pa.int32()),
+    ("csat_score", pa.int16()),
+    ("issue_category", pa.dictionary(pa.int32(), pa.string())),
+    ("customer_persona", pa.dictionary(pa.int32(), pa.string())),
+    ("clean_text", pa.string()),
+    ("talk_ratio", pa.float64()),
+    ("turns_count", pa.int32()),
+    ("resolved", pa.bool_()),
+    ("escalated", pa.bool_()),
+    ("churned", pa.bool_()),
+    ("hour_of_day", pa.int8()),
+    ("is_weekend", pa.int8()),
+    ("avg_word_per_turn", pa.float64()),
+])
+ANALYTICS_COLUMNS = ANALYTICS_SCHEMA.names
+
+
+def parse_transcripts(transcripts: pd.Series) -> pd.Series:
+    """JSON text (or already-decoded lists) to lists of turns; text is decoded with one json.loads per chunk."""
+    if transcripts.map(lambda t: isinstance(t, str)).all():
+        return pd.Series(json.loads("[" + ",".join(transcripts) + "]"), index=transcripts.index)
+    return transcripts.map(lambda t: json.loads(t) if isinstance(t, str) else (t or []))
+
+
+def transcript_features(transcripts: pd.Series) -> pd.DataFrame:
+    """
+    clean_text, agent/customer word counts, talk_ratio and turns_count per call,
+    matching notebook 01's process_transcript, computed on the exploded turns
+    of the whole chunk instead of row by row.
+    """
+    parsed = parse_transcripts(transcripts)
+    turns = parsed.explode().dropna()
+    turn_frame = pd.DataFrame(turns.tolist(), index=turns.index, columns=["speaker", "text"])
+    texts = turn_frame["text"].fillna("")
+    words = texts.str.count(r"\S+")  # same tokens as str.split()
+
+    calls = parsed.index
+    turns_count = parsed.str.len().fillna(0).astype(np.int64)
+    agent_words = words.where(turn_frame["speaker"] == "Agent", 0).groupby(level=0).sum()
+    customer_words = words.where(turn_frame["speaker"] == "Customer", 0).groupby(level=0).sum()
+    agent_words = agent_words.reindex(calls, fill_value=0).astype(np.int64)
+    customer_words = customer_words.reindex(calls, fill_value=0).astype(np.int64)
+
+    # Avoid division by zero; Python's round() keeps the notebook's values on .xx5 ties
+    ratio = np.where(customer_words > 0, agent_words / customer_words.where(customer_words > 0, 1), 0.0)
+    ratio = [round(r, 2) for r in ratio.tolist()]
+
+    # Exploded turns are contiguous per call, so each clean_text is one slice join
+    bounds = np.concatenate([[0], np.cumsum(turns_count.to_numpy())])
+    texts = texts.tolist()
+    return pd.DataFrame({
+        "clean_text": [" ".join(texts[a:b]) for a, b in zip(bounds[:-1], bounds[1:])],
+        "agent_word_count": agent_words,
+        "customer_word_count": customer_words,
+        "talk_ratio": ratio,
+        "turns_count": turns_count,
+    }, index=calls)
+
+
+def build_feature_set(calls: pd.DataFrame) -> pd.DataFrame:
+    """Raw call_logs rows to the analytics_base columns (notebook 01 cells 7 and 10)."""
+    features = transcript_features(calls["transcript_json"])
+    try:
+        timestamps = pd.to_datetime(calls["timestamp"])
+    except ValueError:  # mixed UTC offsets (e.g. across a DST change): use UTC hours
+        timestamps = pd.to_datetime(calls["timestamp"], utc=True)
+    out = pd.DataFrame({
+        "call_id": calls["call_id"],
+        "agent_id": calls["agent_id"],
+        "duration_sec": calls["duration_sec"],
+        "csat_score": calls["csat_score"],
+        "issue_category": calls["issue_category"],
+        "customer_persona": calls["customer_persona"],
+        "clean_text": features["clean_text"],
+        "talk_ratio": features["talk_ratio"],
+        "turns_count": features["turns_count"],
+        "resolved": calls["resolved"],
+        "escalated": calls["escalated"],
+        "churned": calls["churned"],
+        "hour_of_day": timestamps.dt.hour,
+        "is_weekend": timestamps.dt.dayofweek // 5,
+    })
+    # Text Complexity (NLP Proxy)
+    out["avg_word_per_turn"] = (out["duration_sec"] / out["turns_count"]).round(2)
+    return out.reset_index(drop=True)
+
+
+class CallLogExtractor:
+    """
+    Streams call_logs through a named (server-side) cursor, so only one chunk
+    of rows is ever resident, and appends each feature-engineered chunk to the
+    analytics_base Parquet / CSV files as it arrives.
+    """
+
+    def __init__(self, conn=None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """conn: open psycopg2 connection (defaults to one borrowed from the shared pool per scan)."""
+        self.conn = conn
+        self.chunk_size = chunk_size
+
+    def iter_chunks(self, where: Optional[str] = None, params: Optional[Sequence] = None,
+                    order_by: str = "call_id") -> Iterator[pd.DataFrame]:
+        """Raw call_logs rows, chunk_size at a time. where / params filter the scan (e.g. a watermark)."""
+        query = EXTRACT_QUERY + (f" WHERE {where}" if where else "") + f" ORDER BY {order_by}"
+        return stream_frames(query, params, chunk_size=self.chunk_size, conn=self.conn, name="call_logs_extract")
+
+    def iter_features(self, where: Optional[str] = None, params: Optional[Sequence] = None) -> Iterator[pd.DataFrame]:
+        for chunk in self.iter_chunks(where, params):
+            yield build_feature_set(chunk)
+
+    def extract(self, name: str = "analytics_base", processed_dir: str = PROCESSED_DIR, csv: bool = True,
+                where: Optional[str] = None, params: Optional[Sequence] = None) -> Dict:
+        """
+        Writes the artifact chunk by chunk (Parquet row groups, CSV appends) into
+        temporary files that replace the old artifact only once the scan completes.
+        """
+        os.makedirs(processed_dir, exist_ok=True)
+        paths = artifact_paths(name, processed_dir)
+        tmp = {kind: f"{path}.tmp" for kind, path in paths.items()}
+        start = time.perf_counter()
+        rows = chunks = 0
+
+        try:
+            with pq.ParquetWriter(tmp["parquet"], ANALYTICS_SCHEMA, compression="zstd") as writer:
+                for features in self.iter_features(where, params):
+                    writer.write_table(to_arrow(features))
+                    if csv:
+                        features.to_csv(tmp["csv"], mode="a", header=chunks == 0, index=False)
+                    rows += len(features)
+                    chunks += 1
+                    print(f"  chunk {chunks}: {rows} rows")
+
+            if csv and chunks == 0:
+                pd.DataFrame(columns=ANALYTICS_COLUMNS).to_csv(tmp["csv"], index=False)
+            os.replace(tmp["parquet"], paths["parquet"])
+            if csv:
+                os.replace(tmp["csv"], paths["csv"])
+            else:
+                paths.pop("csv")
+        finally:
+            for path in tmp.values():
+                if os.path.exists(path):
+                    os.remove(path)
+
+        seconds = time.perf_counter() - start
+        return {"rows": rows, "chunks": chunks, "seconds": round(seconds, 2),
+                "rows_per_sec": round(rows / seconds, 1) if seconds else 0.0,
+                "peak_rss_mb": round(get_rss_mb("VmHWM"), 1), "paths": paths}
+
+
+def to_arrow(features: pd.DataFrame) -> pa.Table:
+    """A feature chunk as a table with the fixed ANALYTICS_SCHEMA, so every row group matches."""
+    table = pa.Table.from_pandas(features[ANALYTICS_COLUMNS], preserve_index=False)
+    return table.cast(ANALYTICS_SCHEMA)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream call_logs into the analytics_base artifact")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--processed-dir", default=PROCESSED_DIR)
+    parser.add_argument("--no-csv", action="store_true", help="write only the Parquet artifact")
+    args = parser.parse_args()
+
+    report = CallLogExtractor(chunk_size=args.chunk_size).extract(processed_dir=args.processed_dir,
+                                                                   csv=not args.no_csv)
+    print(f"Extracted {report['rows']} rows in {report['chunks']} chunks "
+          f"({report['rows_per_sec']:,.0f} rows/sec, peak RSS {report['peak_rss_mb']} MB) -> {report['paths']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# src/features/similarity.py
+import json
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.features.embeddings import DEFAULT_EMBEDDINGS_PATH
+
+DEFAULT_INDEX_DIR = os.path.join("data", "embeddings", "similar_calls_index")
+
+# Below this many rows a brute-force scan is already well under a few milliseconds
+EXACT_SEARCH_MAX_ROWS = 100_000
+
+
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class ExactIndex:
+    """Brute-force cosine search over the transcript embeddings (small N)."""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = _l2_normalize(np.asarray(vectors, dtype=np.float32))
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def vector(self, row: int) -> np.ndarray:
+        return self.vectors[row]
+
+    def search(self, query: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (rows, cosine similarities) of the k nearest rows, best first."""
+        scores = self.vectors @ _l2_normalize(np.asarray(query, dtype=np.float32))
+        top = _top_k(scores, k)
+        return top, scores[top]
+
+
+class IVFIndex:
+    """
+    Inverted-file index with 8-bit scalar quantization for large N.
+
+    Rows are bucketed under k-means centroids (sorted so each list is one
+    contiguous slice); a query scans only the nprobe closest lists using int8
+    codes (4x smaller than float32), then re-ranks the best candidates with the
+    exact vectors read from the memmapped embeddings file. Rows appended to the
+    embeddings file after the build are scanned exactly until the next build.
+    """
+
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, order: np.ndarray, codes: np.ndarray,
+                 scale: np.ndarray, vectors: np.ndarray, nprobe: int = 16, rerank: int = 10):
+        """
+        vectors: full-precision embeddings (usually a memmap), row-aligned with clustered_data.
+        nprobe: inverted lists scanned per query.
+        rerank: candidates per requested neighbour that are re-scored exactly.
+        """
+        self.centroids = centroids
+        self.offsets = offsets
+        self.order = order
+        self.codes = codes
+        self.scale = scale
+        self.vectors = vectors
+        self.nprobe = nprobe
+        self.rerank = rerank
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, nlist: Optional[int] = None, nprobe: int = 16, rerank: int = 10,
+              train_size: int = 100_000, seed: int = 42) -> "IVFIndex":
+        """nlist defaults to ~sqrt(N) lists; the coarse quantizer trains on a sample of train_size rows."""
+        from sklearn.cluster import MiniBatchKMeans
+
+        n = len(vectors)
+        nlist = nlist or max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+
+        # 1. Coarse quantizer on a sample of normalized vectors
+        sample = np.sort(rng.choice(n, size=min(n, max(train_size, nlist * 40)), replace=False))
+        kmeans = MiniBatchKMeans(n_clusters=nlist, batch_size=4096, n_init=1, random_state=seed)
+        kmeans.fit(_l2_normalize(np.asarray(vectors[sample], dtype=np.float32)))
+        centroids = _l2_normalize(kmeans.cluster_centers_.astype(np.float32))
+
+        # 2. Assign and quantize in chunks so the float matrix never has to be resident
+        assignments = np.empty(n, dtype=np.int32)
+        scale = np.zeros(vectors.shape[1], dtype=np.float32)
+        for start in range(0, n, 65_536):
+            chunk = _l2_normalize(np.asarray(vectors[start:start + 65_536], dtype=np.float32))
+            assignments[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+            scale = np.maximum(scale, np.abs(chunk).max(axis=0))
+        scale = np.maximum(scale, 1e-12) / 127.0
+
+        order = np.argsort(assignments, kind="stable")
+        offsets = np.searchsorted(assignments[order], np.arange(nlist + 1)).astype(np.int64)
+        codes = np.empty((n, vectors.shape[1]), dtype=np.int8)
+        for start in range(0, n, 65_536):
+            rows = order[start:start + 65_536]
+            chunk = _l2_normalize(np.asarray(vectors[np.sort(rows)], dtype=np.float32))
+            chunk = chunk[np.argsort(np.argsort(rows))]  # back to list order
+            codes[start:start + len(rows)] = np.clip(np.rint(chunk / scale), -127, 127)
+        return cls(centroids, offsets, order, codes, scale, vectors, nprobe=nprobe, rerank=rerank)
+
+    @property
+    def n_indexed(self) -> int:
+        return len(self.order)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def vector(self, row: int) -> np.ndarray:
+        return _l2_normalize(np.asarray(self.vectors[row], dtype=np.float32))
+
+    def search(self, query: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (rows, cosine similarities) of the k nearest rows, best first."""
+        query = _l2_normalize(np.asarray(query, dtype=np.float32))
+
+        # 1. Closest inverted lists
+        probes = _top_k(self.centroids @ query, self.nprobe)
+        positions = np.concatenate([np.arange(self.offsets[p], self.offsets[p + 1]) for p in probes])
+
+        # 2. Approximate scores from the int8 codes
+        approx = self.codes[positions].astype(np.float32) @ (query * self.scale)
+        candidates = self.order[positions[_top_k(approx, k * self.rerank)]]
+
+        # 3. Rows added after the build are not in any list yet
+        if len(self.vectors) > self.n_indexed:
+            candidates = np.concatenate([candidates, np.arange(self.n_indexed, len(self.vectors))])
+
+        # 4. Exact re-rank (sorted reads keep memmap access sequential)
+        candidates = np.sort(candidates)
+        exact = _l2_normalize(np.asarray(self.vectors[candidates], dtype=np.float32)) @ query
+        top = _top_k(exact, k)
+        return candidates[top], exact[top]
+
+    def save(self, index_dir: str = DEFAULT_INDEX_DIR):
+        os.makedirs(index_dir, exist_ok=True)
+        for name in ("centroids", "offsets", "order", "codes", "scale"):
+            np.save(os.path.join(index_dir, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(index_dir, "meta.json"), "w") as f:
+            json.dump({"nprobe": self.nprobe, "rerank": self.rerank, "n_indexed": self.n_indexed}, f)
+
+    @classmethod
+    def load(cls, vectors: np.ndarray, index_dir: str = DEFAULT_INDEX_DIR) -> "IVFIndex":
+        with open(os.path.join(index_dir, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r" if name == "codes" else None)
+                  for name in ("centroids", "offsets", "order", "codes", "scale")}
+        return cls(vectors=vectors, nprobe=meta["nprobe"], rerank=meta["rerank"], **arrays)
+
+
+def index_signature(embeddings_path: str = DEFAULT_EMBEDDINGS_PATH, index_dir: str = DEFAULT_INDEX_DIR) -> Tuple:
+    """
+    (mtime, size, inode) of the embeddings file and the IVF metadata. It changes
+    whenever either is rewritten (the archetype service and incremental ETL
+    os.replace the embeddings), so a loaded index can tell that it is stale.
+    """
+    signature = []
+    for path in (embeddings_path, os.path.join(index_dir, "meta.json")):
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def load_similarity_index(embeddings_path: str = DEFAULT_EMBEDDINGS_PATH, index_dir: str = DEFAULT_INDEX_DIR):
+    """
+    The persisted IVFIndex if one was built, otherwise an ExactIndex over the
+    embeddings file. Embeddings are memmapped, so large files are not read up front.
+    The index's signature attribute records index_signature() at load time.
+    """
+    signature = index_signature(embeddings_path, index_dir)  # before reading, so a concurrent replace is noticed
+    vectors = np.load(embeddings_path, mmap_mode="r")
+    index = None
+    if os.path.exists(os.path.join(index_dir, "meta.json")):
+        index = IVFIndex.load(vectors, index_dir)
+        if index.n_indexed > len(vectors):
+            print(f"{index_dir} indexes {index.n_indexed} rows but {embeddings_path} has {len(vectors)}; "
+                  f"using exact search until the index is rebuilt.")
+            index = None
+    if index is None:
+        index = ExactIndex(vectors)
+    index.signature = signature
+    return index
+
+
+def build_similarity_index(embeddings_path: str = DEFAULT_EMBEDDINGS_PATH, index_dir: str = DEFAULT_INDEX_DIR,
+                           exact_max_rows: int = EXACT_SEARCH_MAX_ROWS, **kwargs):
+    """Builds and saves an IVFIndex when the embeddings are too many for brute force."""
+    vectors = np.load(embeddings_path, mmap_mode="r")
+    if len(vectors) <= exact_max_rows:
+        print(f"{len(vectors)} rows: exact search is fast enough, no index built.")
+        return ExactIndex(vectors)
+    print(f"Building IVF index over {len(vectors)} rows...")
+    index = IVFIndex.build(vectors, **kwargs)
+    index.save(index_dir)
+    print(f"Saved {len(index.centroids)}-list index to {index_dir}")
+    return index
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the similar-calls index over transcript embeddings")
+    parser.add_argument("--embeddings", default=DEFAULT_EMBEDDINGS_PATH)
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--force", action="store_true", help="Build an IVF index even for small N")
+    args = parser.parse_args()
+
+    build_similarity_index(args.embeddings, args.index_dir, exact_max_rows=0 if args.force else EXACT_SEARCH_MAX_ROWS,
+                           nlist=args.nlist, nprobe=args.nprobe)
+
+
+if __name__ == "__main__":
+    main()
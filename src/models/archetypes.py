@@ -0,0 +1,295 @@
+# src/models/archetypes.py
+import os
+from typing import Dict, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.features.embeddings import DEFAULT_EMBEDDINGS_PATH, VectorEngine
+from src.utils.artifacts import PROCESSED_DIR, read_artifact, write_artifact
+
+DEFAULT_ARCHETYPE_PATH = os.path.join("data", "models", "archetype_model.joblib")
+
+# Same settings as notebook 02
+UMAP_PARAMS = dict(n_neighbors=50, min_dist=0.1, n_components=5, metric="cosine", random_state=42)
+VIZ_UMAP_PARAMS = dict(n_components=2, n_neighbors=50, random_state=42)
+HDBSCAN_PARAMS = dict(min_cluster_size=100, min_samples=15, metric="euclidean", cluster_selection_method="eom")
+OUTLIER_QUANTILE = 0.95
+
+
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def align_labels(previous: np.ndarray, refit: np.ndarray) -> np.ndarray:
+    """
+    Renumbers refit cluster ids to the previous id they overlap most, so the
+    archetype names in the friction scorecard survive a refit. Clusters with no
+    counterpart get fresh ids; noise stays -1.
+    """
+    previous, refit = np.asarray(previous), np.asarray(refit)
+    overlap = pd.crosstab(refit, previous)
+    overlap = overlap.drop(index=-1, columns=-1, errors="ignore")
+    pairs = overlap.stack().sort_values(ascending=False)
+
+    mapping, taken = {-1: -1}, set()
+    for (new_id, old_id), count in pairs.items():
+        if count == 0 or new_id in mapping or old_id in taken:
+            continue
+        mapping[new_id] = old_id
+        taken.add(old_id)
+    next_id = int(max(previous.max(initial=-1), refit.max(initial=-1))) + 1
+    for new_id in sorted(set(refit) - set(mapping)):
+        mapping[new_id] = next_id
+        next_id += 1
+    return np.array([mapping[label] for label in refit], dtype=np.int64)
+
+
+class ArchetypeModel:
+    """
+    Persisted notebook 02 clustering: the 5-d UMAP reducer, the HDBSCAN
+    clusterer (fitted with prediction_data) and the 2-d map reducer.
+
+    New embeddings are projected with the stored UMAP transform and labelled with
+    hdbscan.approximate_predict, so adding calls costs a transform instead of a
+    refit. The UMAP transform tends to pull unseen topics onto existing clusters,
+    so drift is measured in embedding space as well: the share of assigned calls
+    farther from every archetype centroid than 95% of the fitted calls were.
+    """
+
+    def __init__(self, reducer, clusterer, embeddings: np.ndarray, viz_reducer=None,
+                 drift_threshold: float = 0.10, max_growth: float = 1.0):
+        """
+        embeddings: the vectors reducer/clusterer were fitted on (for the centroids).
+        drift_threshold: refit once the noise rate or the outlier rate of assigned
+        calls exceeds its fit-time value by this much.
+        max_growth: refit once assigned calls exceed this fraction of the fitted set.
+        """
+        self.reducer = reducer
+        self.clusterer = clusterer
+        self.viz_reducer = viz_reducer
+        self.drift_threshold = drift_threshold
+        self.max_growth = max_growth
+
+        labels = np.asarray(clusterer.labels_)
+        self.n_fitted = len(labels)
+        self.baseline_noise_rate = float(np.mean(labels == -1)) if len(labels) else 0.0
+
+        # Archetype centroids and the fit-time distance band around them
+        vectors = _l2_normalize(np.asarray(embeddings, dtype=np.float32))
+        cluster_ids = sorted(set(labels.tolist()) - {-1})
+        self.centroids = _l2_normalize(np.vstack([vectors[labels == c].mean(axis=0) for c in cluster_ids])) \
+            if cluster_ids else np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        distances = self._centroid_distance(vectors[labels != -1])
+        self.outlier_distance = float(np.quantile(distances, OUTLIER_QUANTILE)) if len(distances) else np.inf
+        self.baseline_outlier_rate = 1.0 - OUTLIER_QUANTILE
+
+        self.n_assigned = 0
+        self.n_assigned_noise = 0
+        self.n_assigned_outliers = 0
+
+    def _centroid_distance(self, vectors: np.ndarray) -> np.ndarray:
+        """Cosine distance of each (normalized) vector to its nearest archetype centroid."""
+        if not len(self.centroids) or not len(vectors):
+            return np.full(len(vectors), np.inf)
+        return 1.0 - (vectors @ self.centroids.T).max(axis=1)
+
+    @classmethod
+    def fit(cls, embeddings: np.ndarray, with_viz: bool = True, **kwargs) -> "ArchetypeModel":
+        import hdbscan
+        import umap
+
+        reducer = umap.UMAP(**UMAP_PARAMS)
+        reduced = reducer.fit_transform(embeddings)
+        clusterer = hdbscan.HDBSCAN(prediction_data=True, **HDBSCAN_PARAMS).fit(reduced)
+        viz_reducer = umap.UMAP(**VIZ_UMAP_PARAMS).fit(embeddings) if with_viz else None
+        return cls(reducer, clusterer, embeddings, viz_reducer, **kwargs)
+
+    def fitted_assignments(self) -> pd.DataFrame:
+        """Labels, membership strengths and map coordinates of the fitted set."""
+        out = pd.DataFrame({
+            "cluster_id": np.asarray(self.clusterer.labels_),
+            "membership_strength": np.asarray(self.clusterer.probabilities_),
+        })
+        if self.viz_reducer is not None:
+            out["x_coord"] = self.viz_reducer.embedding_[:, 0]
+            out["y_coord"] = self.viz_reducer.embedding_[:, 1]
+        return out
+
+    def assign(self, embeddings: np.ndarray) -> pd.DataFrame:
+        """Labels new embeddings without refitting; updates the drift counters."""
+        import hdbscan
+
+        reduced = self.reducer.transform(embeddings)
+        labels, strengths = hdbscan.approximate_predict(self.clusterer, reduced)
+        out = pd.DataFrame({"cluster_id": labels, "membership_strength": strengths})
+        if self.viz_reducer is not None:
+            coords = self.viz_reducer.transform(embeddings)
+            out["x_coord"] = coords[:, 0]
+            out["y_coord"] = coords[:, 1]
+
+        distances = self._centroid_distance(_l2_normalize(np.asarray(embeddings, dtype=np.float32)))
+        self.n_assigned += len(labels)
+        self.n_assigned_noise += int(np.sum(labels == -1))
+        self.n_assigned_outliers += int(np.sum(distances > self.outlier_distance))
+        return out
+
+    def drift(self) -> Dict:
+        assigned = max(self.n_assigned, 1)
+        noise_drift = self.n_assigned_noise / assigned - self.baseline_noise_rate
+        outlier_drift = self.n_assigned_outliers / assigned - self.baseline_outlier_rate
+        growth = self.n_assigned / self.n_fitted if self.n_fitted else 0.0
+        drifted = noise_drift > self.drift_threshold or outlier_drift > self.drift_threshold
+        return {
+            "assigned": self.n_assigned,
+            "noise_drift": round(noise_drift, 4),
+            "outlier_drift": round(outlier_drift, 4),
+            "growth": round(growth, 4),
+            "needs_refit": bool(self.n_assigned) and (drifted or growth > self.max_growth),
+        }
+
+    def save(self, path: str = DEFAULT_ARCHETYPE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        joblib.dump(self, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_ARCHETYPE_PATH) -> "ArchetypeModel":
+        return joblib.load(path)
+
+
+class IncrementalArchetypeService:
+    """
+    Appends new calls to the clustered_data artifact using the persisted
+    ArchetypeModel. A full refit over all stored embeddings happens only when the
+    model reports drift; refit clusters are renumbered to match the previous ids.
+    """
+
+    def __init__(self, model_path: str = DEFAULT_ARCHETYPE_PATH, processed_dir: str = PROCESSED_DIR,
+                 embeddings_path: str = DEFAULT_EMBEDDINGS_PATH, vector_engine=None, sanitizer=None):
+        self.model_path = model_path
+        self.processed_dir = processed_dir
+        self.embeddings_path = embeddings_path
+        self.vector_engine = vector_engine
+        self.sanitizer = sanitizer
+        self._model = None
+
+    @property
+    def model(self) -> ArchetypeModel:
+        if self._model is None:
+            self._model = ArchetypeModel.load(self.model_path)
+        return self._model
+
+    def _embed(self, new_calls: pd.DataFrame) -> np.ndarray:
+        if "sanitized_text" not in new_calls.columns:
+            if self.sanitizer is None:
+                from src.preprocessing.cleaner import TextSanitizer
+                self.sanitizer = TextSanitizer()
+            new_calls["sanitized_text"] = self.sanitizer.sanitize(new_calls["clean_text"].tolist())
+        if self.vector_engine is None:
+            self.vector_engine = VectorEngine(cache_dir=os.path.dirname(self.embeddings_path))
+        return self.vector_engine.generate_embeddings(new_calls["sanitized_text"].tolist(), verbose=False)
+
+    def _save_embeddings(self, embeddings: np.ndarray):
+        os.makedirs(os.path.dirname(self.embeddings_path) or ".", exist_ok=True)
+        tmp_path = self.embeddings_path + ".tmp.npy"
+        np.save(tmp_path, embeddings)
+        os.replace(tmp_path, self.embeddings_path)
+
+    def add_calls(self, new_calls: pd.DataFrame, embeddings: Optional[np.ndarray] = None,
+                  force_refit: bool = False, key: Optional[str] = None) -> Dict:
+        """
+        new_calls: analytics_base-shaped rows (clean_text, optionally sanitized_text).
+        embeddings: precomputed vectors for new_calls; computed with VectorEngine otherwise.
+        key: id column (e.g. "call_id"). Calls whose id is already stored replace
+            that row and its vector in place, so row numbers stay stable; the rest
+            are appended.
+        Returns a report with the drift stats, whether a refit ran, the assigned
+        input rows ("assigned_rows") and the stored rows they replaced ("replaced_rows").
+        """
+        new_calls = new_calls.reset_index(drop=True).copy()
+        if key is not None:
+            latest = ~new_calls[key].duplicated(keep="last")
+            if embeddings is not None:
+                embeddings = np.asarray(embeddings)[latest.to_numpy()]
+            new_calls = new_calls[latest].reset_index(drop=True)
+
+        # 1. Embed and assign against the stored model
+        if embeddings is None:
+            embeddings = self._embed(new_calls)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        assignments = self.model.assign(embeddings)
+        for col in assignments.columns:
+            new_calls[col] = assignments[col].values
+
+        # 2. Replace known calls in place, append the rest (stored embeddings stay aligned with clustered_data rows)
+        existing = read_artifact("clustered_data", processed_dir=self.processed_dir)
+        stored = np.load(self.embeddings_path)
+        if len(stored) != len(existing):
+            raise ValueError(f"{self.embeddings_path} has {len(stored)} rows but clustered_data has {len(existing)}")
+
+        known = np.zeros(len(new_calls), dtype=bool)
+        replaced = existing.iloc[0:0]
+        if key is not None and key in existing.columns:
+            positions = pd.Series(np.arange(len(existing)), index=existing[key])
+            positions = positions[~positions.index.duplicated(keep="last")]
+            known = new_calls[key].isin(positions.index).to_numpy()
+            rows = positions.loc[new_calls.loc[known, key]].to_numpy()
+            replaced = existing.iloc[rows].copy()
+
+            replacement = new_calls[known].copy()
+            replacement.index = existing.index[rows]
+            existing = pd.concat([existing.drop(index=replacement.index), replacement]).sort_index()
+            stored = stored.copy()
+            stored[rows] = embeddings[known]
+
+        combined = pd.concat([existing, new_calls[~known]], ignore_index=True)
+        all_embeddings = np.vstack([stored, embeddings[~known]])
+
+        # 3. Refit only when drift crosses the threshold
+        drift = self.model.drift()
+        refit = force_refit or drift["needs_refit"]
+        if refit:
+            print(f"Archetype drift detected ({drift}); refitting on {len(all_embeddings)} calls...")
+            refit_model = ArchetypeModel.fit(all_embeddings, with_viz=self.model.viz_reducer is not None,
+                                             drift_threshold=self.model.drift_threshold,
+                                             max_growth=self.model.max_growth)
+            refit_assignments = refit_model.fitted_assignments()
+            refit_assignments["cluster_id"] = align_labels(combined["cluster_id"].to_numpy(),
+                                                           refit_assignments["cluster_id"].to_numpy())
+            for col in refit_assignments.columns:
+                combined[col] = refit_assignments[col].values
+            self._model = refit_model
+
+        write_artifact(combined, "clustered_data", processed_dir=self.processed_dir)
+        self._save_embeddings(all_embeddings)
+        self.model.save(self.model_path)
+
+        print(f"Archetype assignment: {int((~known).sum())} new calls, {int(known.sum())} updated, "
+              f"{int((new_calls['cluster_id'] == -1).sum())} noise, refit={refit}")
+        return {"added": int((~known).sum()), "updated": int(known.sum()), "total": len(combined),
+                "refit": refit, "drift": drift, "assigned_rows": new_calls, "replaced_rows": replaced}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Assign new calls to the persisted intent archetypes")
+    parser.add_argument("input", help="CSV or Parquet file of analytics_base-shaped rows")
+    parser.add_argument("--model", default=DEFAULT_ARCHETYPE_PATH)
+    parser.add_argument("--processed-dir", default=PROCESSED_DIR)
+    parser.add_argument("--embeddings", default=DEFAULT_EMBEDDINGS_PATH)
+    parser.add_argument("--refit", action="store_true", help="Force a full refit")
+    parser.add_argument("--key", default=None, help="id column; stored calls with the same id are replaced")
+    args = parser.parse_args()
+
+    new_calls = pd.read_parquet(args.input) if args.input.endswith(".parquet") else pd.read_csv(args.input)
+    service = IncrementalArchetypeService(args.model, args.processed_dir, args.embeddings)
+    report = service.add_calls(new_calls, force_refit=args.refit, key=args.key)
+    report.pop("assigned_rows"), report.pop("replaced_rows")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
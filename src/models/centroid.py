@@ -0,0 +1,152 @@
+# src/models/centroid.py
+import os
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from src.features.embeddings import DEFAULT_EMBEDDINGS_PATH, VectorEngine
+
+DEFAULT_CENTROID_PATH = os.path.join("data", "models", "intent_centroids.npz")
+
+# Notebook 03 archetype names (ARCHETYPE_NAMES) -> CallAnalyticsEngine candidate labels
+ARCHETYPE_LABELS = {
+    "Technical Troubleshooting": "Technical Support & Error Troubleshooting",
+    "Billing & Payment Disputes": "Billing, Payment, and Invoice Disputes",
+    "Subscription Cancellation": "Subscription Cancellation & Account Closure",
+    "Account Access & Security": "Account Access, Security & Hacking",
+}
+
+
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class CentroidIntentClassifier:
+    """
+    Fast intent classifier: one MPNet embedding per transcript, scored against
+    precomputed per-label centroid vectors with a vectorized cosine similarity.
+
+    Returns the same {"sequence", "labels", "scores"} contract as the zero-shot
+    pipeline, so CallAnalyticsEngine can swap it in for BART-MNLI.
+    """
+
+    def __init__(self, vector_engine: VectorEngine, labels: Sequence[str], centroids: np.ndarray,
+                 temperature: float = 0.05):
+        """
+        temperature: softmax temperature over cosine similarities. Cosine scores
+        sit in a narrow band, so a low temperature spreads them into usable confidences.
+        """
+        if len(labels) != len(centroids):
+            raise ValueError("labels and centroids must have the same length")
+        self.vector_engine = vector_engine
+        self.labels = list(labels)
+        self.centroids = _l2_normalize(np.asarray(centroids, dtype=np.float32))
+        self.temperature = temperature
+        self._label_index = {label: i for i, label in enumerate(self.labels)}
+
+    @classmethod
+    def from_labels(cls, vector_engine: VectorEngine, labels: Sequence[str],
+                    descriptions: Optional[Dict[str, List[str]]] = None, **kwargs) -> "CentroidIntentClassifier":
+        """
+        Cold-start centroids from the label text itself. descriptions optionally maps
+        a label to example phrases; each centroid is the mean of their embeddings.
+        """
+        descriptions = descriptions or {}
+        centroids = []
+        for label in labels:
+            phrases = descriptions.get(label) or [f"This call is about {label}."]
+            vectors = vector_engine.generate_embeddings(phrases, verbose=False)
+            centroids.append(_l2_normalize(np.asarray(vectors, dtype=np.float32)).mean(axis=0))
+        return cls(vector_engine, labels, np.vstack(centroids), **kwargs)
+
+    @classmethod
+    def from_archetypes(cls, vector_engine: VectorEngine, embeddings: np.ndarray, archetype_names: Sequence[str],
+                        labels: Sequence[str], label_map: Optional[Dict[str, str]] = None,
+                        descriptions: Optional[Dict[str, List[str]]] = None, **kwargs) -> "CentroidIntentClassifier":
+        """
+        Centroids for the candidate labels from the notebook 02 embeddings.
+        label_map maps archetype names to candidate labels (archetypes mapped to the
+        same label are pooled; unmapped ones, e.g. noise, are ignored). Labels no
+        archetype maps to are cold-started from their text, as in from_labels.
+        """
+        label_map = ARCHETYPE_LABELS if label_map is None else label_map
+        unknown = sorted(set(label_map.values()) - set(labels))
+        if unknown:
+            raise ValueError(f"label_map targets labels that are not candidates: {unknown}")
+        names = np.asarray([label_map.get(n) if isinstance(n, str) else None for n in archetype_names], dtype=object)
+        vectors = _l2_normalize(np.asarray(embeddings, dtype=np.float32))
+
+        labels = list(labels)
+        cold = [label for label in labels if not np.any(names == label)]
+        cold_start = cls.from_labels(vector_engine, cold, descriptions) if cold else None
+        centroids = [vectors[names == label].mean(axis=0) if label not in cold
+                     else cold_start.centroids[cold.index(label)] for label in labels]
+        return cls(vector_engine, labels, np.vstack(centroids), **kwargs)
+
+    def save(self, path: str = DEFAULT_CENTROID_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path, labels=np.asarray(self.labels), centroids=self.centroids,
+                 temperature=self.temperature, model_name=getattr(self.vector_engine, "model_name", ""))
+
+    @classmethod
+    def load(cls, vector_engine: VectorEngine, path: str = DEFAULT_CENTROID_PATH) -> "CentroidIntentClassifier":
+        data = np.load(path, allow_pickle=False)
+        return cls(vector_engine, data["labels"].tolist(), data["centroids"], temperature=float(data["temperature"]))
+
+    def __call__(self, sequences: Union[str, List[str]], candidate_labels: Optional[Sequence[str]] = None,
+                 batch_size: int = 32) -> Union[Dict, List[Dict]]:
+        single = isinstance(sequences, str)
+        if single:
+            sequences = [sequences]
+        labels = list(candidate_labels) if candidate_labels is not None else self.labels
+        missing = [label for label in labels if label not in self._label_index]
+        if missing:
+            raise KeyError(f"No centroid for labels: {missing}")
+        centroids = self.centroids[[self._label_index[label] for label in labels]]
+
+        embeddings = self.vector_engine.generate_embeddings(list(sequences), batch_size=batch_size, verbose=False)
+        similarities = _l2_normalize(np.asarray(embeddings, dtype=np.float32)) @ centroids.T
+
+        logits = similarities / self.temperature
+        scores = np.exp(logits - logits.max(axis=1, keepdims=True))
+        scores /= scores.sum(axis=1, keepdims=True)
+
+        results = []
+        for sequence, row in zip(sequences, scores):
+            order = np.argsort(-row, kind="stable")
+            results.append({
+                "sequence": sequence,
+                "labels": [labels[i] for i in order],
+                "scores": [float(row[i]) for i in order],
+            })
+        return results[0] if single else results
+
+
+def main():
+    import argparse
+
+    from src.models.inference import CANDIDATE_LABELS
+    from src.pipeline.scorecard import ARCHETYPE_NAMES
+    from src.utils.artifacts import PROCESSED_DIR, read_artifact
+
+    parser = argparse.ArgumentParser(description="Build the centroid backend's label centroids from notebook 02")
+    parser.add_argument("--processed-dir", default=PROCESSED_DIR)
+    parser.add_argument("--embeddings", default=DEFAULT_EMBEDDINGS_PATH)
+    parser.add_argument("--out", default=DEFAULT_CENTROID_PATH)
+    args = parser.parse_args()
+
+    # Rows of clustered_data line up with the saved transcript embeddings
+    clusters = read_artifact("clustered_data", columns=["cluster_id"], processed_dir=args.processed_dir)
+    embeddings = np.load(args.embeddings)
+    if len(embeddings) != len(clusters):
+        raise ValueError(f"{args.embeddings} has {len(embeddings)} rows but clustered_data has {len(clusters)}")
+    archetype_names = clusters["cluster_id"].astype(int).map(ARCHETYPE_NAMES).tolist()
+
+    classifier = CentroidIntentClassifier.from_archetypes(VectorEngine(), embeddings, archetype_names, CANDIDATE_LABELS)
+    classifier.save(args.out)
+    print(f"Saved {len(classifier.labels)} intent centroids to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# src/models/executor.py
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+_STOP = object()
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised by submit() when the request queue is full (backpressure)."""
+
+
+class _Request:
+    __slots__ = ("call", "task", "instrument", "future", "enqueued", "deadline")
+
+    def __init__(self, call: Optional[Dict], timeout: Optional[float], task: Optional[Callable] = None,
+                 instrument: bool = False):
+        self.call = call
+        self.task = task
+        self.instrument = instrument
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+        self.deadline = self.enqueued + timeout if timeout else None
+
+
+class InferenceExecutor:
+    """
+    Serializes access to CallAnalyticsEngine behind a bounded request queue.
+
+    The transformers pipelines are not thread-safe, so each worker thread owns
+    one engine and is the only caller of it. A worker takes the oldest request,
+    then keeps collecting for up to max_wait_ms (or until max_batch_size) and
+    runs the whole micro-batch through engine.analyze_calls, so concurrent
+    users share one forward pass instead of queueing behind each other.
+    submit() raises ExecutorSaturated once max_queue requests are waiting, and
+    requests still queued past their timeout fail with TimeoutError without
+    reaching the models. Other engine work (e.g. similar_calls) goes through
+    the same queue with submit_task() / run(), one request per task.
+    A request with instrument=True has its stages timed on the worker's
+    engine, so one caller's diagnostics don't switch timing on for everyone.
+    """
+
+    def __init__(self, engine, workers: int = 1, engine_factory: Optional[Callable] = None,
+                 max_queue: int = 64, max_batch_size: int = 16, max_wait_ms: float = 10.0,
+                 timeout_s: Optional[float] = 60.0, window: int = 1000):
+        """
+        engine: CallAnalyticsEngine served by the first worker.
+        workers: worker threads; each extra worker gets its own engine from
+            engine_factory() (so model memory grows with workers).
+        max_queue: waiting requests accepted before submit() pushes back.
+        max_batch_size / max_wait_ms: micro-batch size cap and collection window.
+        timeout_s: default per-request deadline (None = wait indefinitely).
+        window: latencies kept for the percentiles in stats().
+        """
+        if workers > 1 and engine_factory is None:
+            raise ValueError("workers > 1 needs an engine_factory (one engine per worker)")
+        self.engines = [engine] + [engine_factory() for _ in range(workers - 1)]
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.timeout_s = timeout_s
+        self.max_queue = max_queue
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.batches = 0
+        self._batch_sizes = deque(maxlen=window)
+        self._queue_ms = deque(maxlen=window)
+        self._latency_ms = deque(maxlen=window)
+
+        self._threads = [threading.Thread(target=self._worker, args=(e,), name=f"inference-worker-{i}", daemon=True)
+                         for i, e in enumerate(self.engines)]
+        for thread in self._threads:
+            thread.start()
+
+    # ── Client side ─────────────────────────────────────────────
+    def submit(self, transcript: str, talk_ratio: float = 0.5, duration: int = 300,
+               timeout: Optional[float] = None, instrument: bool = False) -> Future:
+        """Queues one call; the Future resolves to the analyze_call result dict."""
+        call = {"transcript": transcript, "talk_ratio": talk_ratio, "duration": duration}
+        return self._enqueue(_Request(call, timeout if timeout is not None else self.timeout_s,
+                                      instrument=instrument))
+
+    def submit_task(self, task: Callable[[Any], Any], timeout: Optional[float] = None,
+                    instrument: bool = False) -> Future:
+        """Queues task(engine), run alone on a worker's engine; the Future resolves to its return value."""
+        return self._enqueue(_Request(None, timeout if timeout is not None else self.timeout_s,
+                                      task=task, instrument=instrument))
+
+    def _enqueue(self, request: _Request) -> Future:
+        if self._closed:
+            raise RuntimeError("InferenceExecutor is shut down")
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise ExecutorSaturated(f"{self._queue.maxsize} requests already waiting; retry shortly") from None
+        with self._lock:
+            self.submitted += 1
+        return request.future
+
+    def analyze_call(self, raw_transcript: str, talk_ratio: float = 0.5, duration: int = 300,
+                     timeout: Optional[float] = None, instrument: bool = False) -> Dict:
+        """Blocking submit + wait, with the same signature and result as engine.analyze_call."""
+        timeout = timeout if timeout is not None else self.timeout_s
+        future = self.submit(raw_transcript, talk_ratio, duration, timeout=timeout, instrument=instrument)
+        return self._wait(future, timeout, "analyze_call")
+
+    def run(self, task: Callable[[Any], Any], timeout: Optional[float] = None, instrument: bool = False):
+        """Blocking submit_task + wait, e.g. run(lambda engine: engine.similar_calls(text))."""
+        timeout = timeout if timeout is not None else self.timeout_s
+        return self._wait(self.submit_task(task, timeout=timeout, instrument=instrument), timeout, "task")
+
+    @staticmethod
+    def _wait(future: Future, timeout: Optional[float], what: str):
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()  # still queued: the worker will skip it
+            raise TimeoutError(f"{what} did not finish within {timeout}s") from None
+
+    # ── Worker side ─────────────────────────────────────────────
+    def _collect(self, first: _Request) -> Tuple[List[_Request], bool]:
+        """The first request plus whatever arrives within max_wait; True if shutdown was signalled."""
+        batch = [first]
+        window_end = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = window_end - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is _STOP:
+                return batch, True
+            batch.append(request)
+        return batch, False
+
+    def _runnable(self, batch: List[_Request]) -> List[_Request]:
+        """Drops cancelled and expired requests before they reach the models."""
+        now = time.perf_counter()
+        runnable, dropped = [], 0
+        for request in batch:
+            if not request.future.set_running_or_notify_cancel():
+                dropped += 1  # the caller stopped waiting (analyze_call timeout)
+            elif request.deadline is not None and now > request.deadline:
+                request.future.set_exception(TimeoutError("request expired in the queue"))
+                dropped += 1
+            else:
+                runnable.append(request)
+        if dropped:
+            with self._lock:
+                self.timed_out += dropped
+        return runnable
+
+    @staticmethod
+    @contextmanager
+    def _instrumented(engine, batch: List[_Request]):
+        """Times the engine's stages while it serves requests that asked for it."""
+        instr = getattr(engine, "instrumentation", None)
+        if instr is None or instr.enabled or not any(r.instrument for r in batch):
+            yield
+            return
+        instr.enabled = True
+        try:
+            yield
+        finally:
+            instr.enabled = False
+
+    def _worker(self, engine):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch, stop = self._collect(first)
+            batch = self._runnable(batch)
+            # Tasks run one at a time; analyze requests share one micro-batch
+            for request in [r for r in batch if r.task is not None]:
+                self._run(engine, [request], lambda: [request.task(engine)])
+            calls = [r for r in batch if r.task is None]
+            if calls:
+                self._run(engine, calls,
+                          lambda: list(engine.analyze_calls([r.call for r in calls], batch_size=len(calls))))
+
+    def _run(self, engine, batch: List[_Request], fn: Callable[[], List]):
+        """Resolves each request's Future with fn()'s matching result (or its exception)."""
+        start = time.perf_counter()
+        try:
+            with self._instrumented(engine, batch):
+                results = fn()
+        except Exception as exc:
+            for request in batch:
+                request.future.set_exception(exc)
+            with self._lock:
+                self.failed += len(batch)
+            return
+
+        done = time.perf_counter()
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
+        with self._lock:
+            self.completed += len(batch)
+            self.batches += 1
+            self._batch_sizes.append(len(batch))
+            self._queue_ms.extend((start - r.enqueued) * 1000 for r in batch)
+            self._latency_ms.extend((done - r.enqueued) * 1000 for r in batch)
+
+    # ── Lifecycle / stats ───────────────────────────────────────
+    def shutdown(self, wait: bool = True):
+        """Stops the workers once the requests queued before this call are done."""
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def engine_stats(self) -> List[Dict]:
+        """engine.stats() of every worker's engine, in worker order."""
+        return [engine.stats() for engine in self.engines]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            latency = np.fromiter(self._latency_ms, dtype=float)
+            queue_wait = np.fromiter(self._queue_ms, dtype=float)
+            sizes = np.fromiter(self._batch_sizes, dtype=float)
+            counters = {"submitted": self.submitted, "completed": self.completed, "failed": self.failed,
+                        "rejected": self.rejected, "timed_out": self.timed_out, "batches": self.batches}
+        p50, p95, p99 = np.percentile(latency, [50, 95, 99]) if len(latency) else (0.0, 0.0, 0.0)
+        return {
+            **counters,
+            "workers": len(self._threads),
+            "queue_depth": self.queue_depth(),
+            "max_queue": self.max_queue,
+            "mean_batch": round(float(sizes.mean()), 2) if len(sizes) else 0.0,
+            "queue_p95_ms": round(float(np.percentile(queue_wait, 95)), 3) if len(queue_wait) else 0.0,
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+        }
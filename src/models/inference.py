@@ -2,58 +2,402 @@ import os
 import torch
 import numpy as np
 import re
-from typing import Dict, List, Union
+import threading
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from transformers import pipeline
 from src.preprocessing.cleaner import TextSanitizer
-from src.features.embeddings import VectorEngine
+from src.preprocessing.spans import offset_map
+from src.features.embeddings import DEFAULT_EMBEDDINGS_PATH, VectorEngine
+from src.features.similarity import DEFAULT_INDEX_DIR, index_signature, load_similarity_index
+from src.models.centroid import DEFAULT_CENTROID_PATH, CentroidIntentClassifier
+from src.models.onnx_runtime import OnnxModel, load_classifier
+from src.models.result_cache import ResultCache
+from src.models.zero_shot import CachedZeroShotClassifier
+from src.utils.batching import DEFAULT_MAX_TOKENS, LengthBucketScheduler, token_lengths
+from src.utils.helpers import get_rss_mb, model_size_mb
+from src.utils.instrumentation import Instrumentation
+
+# Expanded labels to improve BART's ability to distinguish subtle intents
+CANDIDATE_LABELS = (
+    "Technical Support & Error Troubleshooting",
+    "Billing, Payment, and Invoice Disputes",
+    "Subscription Cancellation & Account Closure",
+    "Account Access, Security & Hacking",
+    "Onboarding, Setup & Initial Training",
+    "General Inquiry & Miscellaneous Questions",
+)
+
 
 class CallAnalyticsEngine:
-    def __init__(self, device: int = -1):
+    # Model-backed stages, each loaded lazily on first use
+    STAGES = ("sanitizer", "vector_engine", "classifier", "similarity_index")
+
+    CLASSIFIER_BACKENDS = ("pipeline", "cached", "centroid")
+
+    def __init__(self, device: int = -1, warm_up: bool = False, classifier_backend: str = "pipeline",
+                 centroid_path: str = DEFAULT_CENTROID_PATH, redaction_tier: str = "ner",
+                 embeddings_path: str = DEFAULT_EMBEDDINGS_PATH, similarity_index_dir: str = DEFAULT_INDEX_DIR,
+                 runtime: str = "torch", instrument: bool = False, stats_log: Optional[str] = None,
+                 result_cache: Optional[ResultCache] = None, max_batch_tokens: Optional[int] = DEFAULT_MAX_TOKENS):
         """
         Production-grade inference engine.
         device: -1 for CPU, 0 for GPU.
+        warm_up: start loading the analyze_call models on a background thread.
+        classifier_backend: "pipeline" (transformers zero-shot pipeline) or
+            "cached" (CachedZeroShotClassifier, reuses label hypothesis tokens) or
+            "centroid" (CentroidIntentClassifier, MPNet embedding vs label centroids).
+        centroid_path: saved centroids for the "centroid" backend; if the file is
+            missing, centroids are built from the candidate label text.
+        redaction_tier: TextSanitizer tier ("regex", "gazetteer" or "ner").
+        embeddings_path / similarity_index_dir: historical transcript vectors and
+            their optional IVF index, used by similar_calls.
+        runtime: "torch" (fp32) or "onnx" (int8-quantized ONNX Runtime on CPU) for
+            the NER and zero-shot models; "onnx" falls back to torch if unavailable.
+        instrument: record per-stage latencies, batch sizes and token counts
+            (see stats()); toggle later via engine.instrumentation.enabled.
+        stats_log: optional path for the per-stage JSON-lines log.
+        result_cache: optional ResultCache (or any get/put/stats object) for the
+            redaction + classification output, keyed on the normalized transcript
+            and cache_version(); risk is always rescored from talk_ratio / duration.
+        max_batch_tokens: padded-token budget per NER, embedding and zero-shot
+            batch; inputs are bucketed by token length and results come back in
+            input order (None = fixed-count batches in input order).
+
+        Models are loaded lazily the first time their stage needs them, so
+        constructing the engine is cheap and analyze_call only pays for MPNet
+        when the centroid backend is selected.
         """
-        # Load custom modules
-        self.sanitizer = TextSanitizer(device=device)
-        self.vector_engine = VectorEngine()
-        
-        # Load Zero-Shot Classifier
-        self.classifier = pipeline(
-            "zero-shot-classification",
-            model="facebook/bart-large-mnli",
-            device=device
-        )
+        if classifier_backend not in self.CLASSIFIER_BACKENDS:
+            raise ValueError(f"classifier_backend must be one of {self.CLASSIFIER_BACKENDS}")
+        self.device = device
+        self.classifier_backend = classifier_backend
+        self.centroid_path = centroid_path
+        self.redaction_tier = redaction_tier
+        self.embeddings_path = embeddings_path
+        self.similarity_index_dir = similarity_index_dir
+        self.runtime = runtime
+        self.instrumentation = Instrumentation(enabled=instrument, log_path=stats_log)
+        self.result_cache = result_cache
+        self.max_batch_tokens = max_batch_tokens
+        self.classifier_scheduler = LengthBucketScheduler(max_batch_tokens)
+        self._components = {}
+        self._load_locks = {name: threading.Lock() for name in self.STAGES}
+        self._warm_up_thread = None
         
-        # Expanded labels to improve BART's ability to distinguish subtle intents
-        self.candidate_labels = [
-            "Technical Support & Error Troubleshooting", 
-            "Billing, Payment, and Invoice Disputes", 
-            "Subscription Cancellation & Account Closure", 
-            "Account Access, Security & Hacking",
-            "Onboarding, Setup & Initial Training",
-            "General Inquiry & Miscellaneous Questions"
-        ]
+        self.candidate_labels = list(CANDIDATE_LABELS)
+
+        if warm_up:
+            self.warm_up(background=True)
+
+    # ── Lazy components ──────────────────────────────────────────
+    @property
+    def sanitizer(self) -> TextSanitizer:
+        return self._get_component("sanitizer")
+
+    @property
+    def vector_engine(self) -> VectorEngine:
+        return self._get_component("vector_engine")
+
+    @property
+    def classifier(self):
+        return self._get_component("classifier")
+
+    @property
+    def similarity_index(self):
+        # Reload when the embeddings (or IVF index) were rewritten since the load, e.g. by add_calls
+        index = self._components.get("similarity_index")
+        if index is not None and index.signature != index_signature(self.embeddings_path, self.similarity_index_dir):
+            with self._load_locks["similarity_index"]:
+                if self._components.get("similarity_index") is index:
+                    del self._components["similarity_index"]
+        return self._get_component("similarity_index")
+
+    def _get_component(self, name: str):
+        component = self._components.get(name)
+        if component is None:
+            # Double-checked so a warm-up thread and a request never load twice
+            with self._load_locks[name]:
+                component = self._components.get(name)
+                if component is None:
+                    with self.instrumentation.stage(f"load_{name}"):
+                        component = self._load_component(name)
+                    self._components[name] = component
+        return component
+
+    def _load_component(self, name: str):
+        if name == "sanitizer":
+            sanitizer = TextSanitizer(device=self.device, tier=self.redaction_tier, runtime=self.runtime,
+                                      instrumentation=self.instrumentation, max_batch_tokens=self.max_batch_tokens)
+            if sanitizer.tier == "ner":
+                sanitizer.ner_pipeline  # load the NER model with its stage, not on first request
+            return sanitizer
+        if name == "vector_engine":
+            return VectorEngine(max_batch_tokens=self.max_batch_tokens)
+        if name == "classifier":
+            if self.classifier_backend == "centroid":
+                if os.path.exists(self.centroid_path):
+                    classifier = CentroidIntentClassifier.load(self.vector_engine, self.centroid_path)
+                    missing = [label for label in self.candidate_labels if label not in classifier.labels]
+                    if missing:
+                        raise ValueError(f"{self.centroid_path} has no centroid for {missing}; "
+                                         "rebuild it with python -m src.models.centroid")
+                    return classifier
+                return CentroidIntentClassifier.from_labels(self.vector_engine, self.candidate_labels)
+            if self.classifier_backend == "cached":
+                return CachedZeroShotClassifier(model_name="facebook/bart-large-mnli", device=self.device,
+                                                runtime=self.runtime)
+            if self.runtime == "onnx":
+                model, tokenizer, runtime = load_classifier("facebook/bart-large-mnli", "sequence-classification",
+                                                            runtime="onnx", device=self.device)
+                return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer,
+                                device=self.device if runtime == "torch" else -1)
+            return pipeline(
+                "zero-shot-classification",
+                model="facebook/bart-large-mnli",
+                device=self.device
+            )
+        if name == "similarity_index":
+            return load_similarity_index(self.embeddings_path, self.similarity_index_dir)
+        raise ValueError(f"Unknown component: {name}")
+
+    def warm_up(self, stages: Iterable[str] = ("sanitizer", "classifier"),
+                background: bool = True) -> Optional[threading.Thread]:
+        """Loads the given stages ahead of the first request, optionally off-thread."""
+        stages = list(stages)
+        unknown = [name for name in stages if name not in self.STAGES]
+        if unknown:
+            raise ValueError(f"Unknown stages {unknown}; expected a subset of {self.STAGES}")
+
+        def _load():
+            for name in stages:
+                self._get_component(name)
+
+        if not background:
+            _load()
+            return None
+        self._warm_up_thread = threading.Thread(target=_load, name="engine-warm-up", daemon=True)
+        self._warm_up_thread.start()
+        return self._warm_up_thread
+
+    def loaded_components(self) -> Dict[str, bool]:
+        """Which stage models are currently resident."""
+        return {name: name in self._components for name in self.STAGES}
+
+    def memory_report(self) -> Dict:
+        """Process RSS plus the parameter footprint of each resident model."""
+        components = {}
+        for name in self.STAGES:
+            module = self._torch_module(self._components.get(name))
+            if module is None:
+                size = 0.0
+            elif isinstance(module, OnnxModel):
+                size = module.size_mb()  # int8 weights live in the ONNX graph, not torch parameters
+            else:
+                size = model_size_mb(module)
+            components[name] = {
+                "loaded": name in self._components,
+                "runtime": "onnx" if isinstance(module, OnnxModel) else "torch",
+                "param_mb": round(size, 1),
+            }
+        return {"rss_mb": round(get_rss_mb(), 1), "components": components}
+
+    def stats(self) -> Dict:
+        """
+        Rolling p50/p95/p99 latency, batch size and token totals per stage,
+        plus RSS / peak RSS, padding per length-bucketed stage and, when
+        enabled, result cache hit rates.
+        """
+        stats = self.instrumentation.stats()
+        stats["batching"] = self.batching_report()
+        if self.result_cache is not None:
+            stats["result_cache"] = self.result_cache.stats()
+        return stats
+
+    def batching_report(self) -> Dict:
+        """Real vs padding tokens per transformer stage, and the saving over input-order batches."""
+        report = {"zero_shot": self.classifier_scheduler.report()}
+        sanitizer = self._components.get("sanitizer")
+        if sanitizer is not None:
+            report["ner"] = sanitizer.ner_scheduler.report()
+        vector_engine = self._components.get("vector_engine")
+        if vector_engine is not None:
+            report["embeddings"] = vector_engine.scheduler.report()
+        return report
+
+    @staticmethod
+    def _torch_module(component):
+        if component is None:
+            return None
+        if isinstance(component, TextSanitizer):
+            return component._ner_pipeline.model if component._ner_pipeline is not None else None
+        if isinstance(component, VectorEngine):
+            return component._model
+        return getattr(component, "model", None)
+
+    def similar_calls(self, text: str, k: int = 5, sanitized: bool = False) -> List[Dict]:
+        """
+        The k historical calls closest to a transcript, as {"row", "similarity"}
+        dicts; row indexes clustered_data. Stored vectors embed redacted text, so
+        the query is sanitized first unless sanitized=True (e.g. analyze_call's clean_text).
+        """
+        if not sanitized:
+            text = self.sanitizer.sanitize([text])[0]
+        query = self.vector_engine.generate_embeddings([text], verbose=False)[0]
+        rows, scores = self.similarity_index.search(query, k)
+        return [{"row": int(r), "similarity": round(float(s), 4)} for r, s in zip(rows, scores)]
+
+    def similar_to_call(self, row: int, k: int = 5) -> List[Dict]:
+        """Neighbours of a stored call by its saved vector (no model needed); excludes the call itself."""
+        index = self.similarity_index
+        rows, scores = index.search(index.vector(row), k + 1)
+        return [{"row": int(r), "similarity": round(float(s), 4)} for r, s in zip(rows, scores) if r != row][:k]
 
     def analyze_call(self, raw_transcript: str, talk_ratio: float = 0.5, duration: int = 300) -> Dict:
         """
         Runs the full pipeline: Sanitize -> Classify -> Risk Assessment.
         """
-        # 1. Sanitize (Regex + NER)
-        redacted_list = self.sanitizer.batch_redact([raw_transcript])
-        clean_text = self.sanitizer.clean_batch(redacted_list)[0]
+        call = {"transcript": raw_transcript, "talk_ratio": talk_ratio, "duration": duration}
+        return next(self.analyze_calls([call], batch_size=1))
+
+    def analyze_calls(self, calls: Iterable[Union[str, Dict]], batch_size: int = 32) -> Iterator[Dict]:
+        """
+        Streams the full pipeline over many calls, micro-batching every stage.
+        Each item is either a raw transcript string or a dict with a 'transcript'
+        key and optional 'talk_ratio' / 'duration' keys. Results are yielded
+        in input order with the same schema as analyze_call.
+        """
+        instr = self.instrumentation
+        calls = iter(calls)
+        while True:
+            batch = [self._unpack_call(c) for c in islice(calls, batch_size)]
+            if not batch:
+                return
+            transcripts = [b[0] for b in batch]
+            n = len(batch)
 
-        # 2. Classify Intent
-        classification = self.classifier(clean_text, self.candidate_labels)
+            # 1-2. Redaction + intent come from the result cache when possible
+            outputs = self._cached_outputs(transcripts, batch_size)
+
+            # 3. Risk is cheap and depends on the call metadata, score per call
+            with instr.stage("risk_scoring", items=n):
+                results = [self._build_result(output["clean_text"], output, talk_ratio, duration, transcript)
+                           for (transcript, talk_ratio, duration), output in zip(batch, outputs)]
+            yield from results
+
+    def cache_version(self) -> str:
+        """Everything besides the transcript that a cached result depends on."""
+        parts = [self.redaction_tier, self.runtime, self.classifier_backend]
+        if self.classifier_backend == "centroid" and os.path.exists(self.centroid_path):
+            parts.append(str(os.path.getmtime(self.centroid_path)))
+        return "|".join(parts + list(self.candidate_labels))
+
+    def _cached_outputs(self, transcripts: List[str], batch_size: int) -> List[Dict]:
+        """{"clean_text", "labels", "scores"} per transcript; only cache misses reach the models."""
+        if self.result_cache is None:
+            return self._redact_and_classify(transcripts, batch_size)
+
+        version = self.cache_version()
+        with self.instrumentation.stage("result_cache_lookup", items=len(transcripts)):
+            keys = [ResultCache.key(t, version) for t in transcripts]
+            outputs = [self.result_cache.get(key) for key in keys]
+
+        # One model pass per distinct missing key, even if it repeats within the batch
+        first = {}
+        for i, (key, output) in enumerate(zip(keys, outputs)):
+            if output is None and key not in first:
+                first[key] = i
+        if first:
+            fresh = self._redact_and_classify([transcripts[i] for i in first.values()], batch_size)
+            for (key, i), output in zip(first.items(), fresh):
+                self.result_cache.put(key, output)
+                outputs[i] = output
+        return [output if output is not None else outputs[first[key]] for key, output in zip(keys, outputs)]
+
+    def _redact_and_classify(self, transcripts: List[str], batch_size: int) -> List[Dict]:
+        instr = self.instrumentation
+        n = len(transcripts)
+
+        # 1. Sanitize (Regex + NER) for the whole micro-batch; each clean text is rendered once from its spans
+        redactions = self.sanitizer.redact(transcripts, batch_size=batch_size)
+        clean_texts = [r["text"] for r in redactions]
+
+        # 2. Classify Intent - premise/label pairs bucketed by premise length under a token budget
+        tokens = sum(len(t.split()) for t in clean_texts) if instr.enabled else 0
+        with instr.stage("intent_classification", items=n, tokens=tokens):
+            classifications = self._classify(clean_texts, batch_size)
+
+        # Plain lists and floats, so outputs can be cached as JSON. Spans are stored in
+        # normalized-transcript offsets, which every transcript sharing the cache key agrees on.
+        outputs = []
+        for transcript, redaction, c in zip(transcripts, redactions, classifications):
+            normalized = offset_map(transcript, [], normalize=True) if redaction["spans"] else None
+            outputs.append({
+                "clean_text": redaction["text"], "labels": list(c["labels"]), "scores": [float(x) for x in c["scores"]],
+                "redactions": [[int(normalized[start]), int(normalized[end]), label]
+                               for start, end, label in redaction["spans"]],
+            })
+        return outputs
+
+    def _classify(self, texts: List[str], batch_size: int) -> List[Dict]:
+        classifier = self.classifier
+        n_labels = len(self.candidate_labels)
+
+        def run(batch, pair_batch_size=None):
+            results = classifier(batch, self.candidate_labels, batch_size=pair_batch_size or len(batch) * n_labels)
+            return [results] if isinstance(results, dict) else results
+
+        if self.classifier_backend == "centroid":
+            # One embedding per text (labels are precomputed centroids); VectorEngine buckets the encode batches
+            return run(texts, batch_size)
+        # Every premise is scored against each label, so a text costs n_labels padded rows
+        lengths = token_lengths(texts, getattr(classifier, "tokenizer", None)) * n_labels
+        return self.classifier_scheduler.map(run, texts, lengths, max_batch_size=batch_size)
+
+    @staticmethod
+    def _unpack_call(call: Union[str, Dict]) -> Tuple[str, float, int]:
+        if isinstance(call, str):
+            return call, 0.5, 300
+        return call["transcript"], call.get("talk_ratio", 0.5), call.get("duration", 300)
+
+    @staticmethod
+    def _source_spans(transcript: str, redactions: List) -> List[Dict]:
+        """Stored normalized-offset spans -> {"start", "end", "label"} in this transcript's own offsets."""
+        if not redactions:
+            return []
+        normalized = offset_map(transcript, [], normalize=True)
+        # Dropped whitespace shares its position with the next kept character: starts take the last such index
+        return [{"start": int(np.searchsorted(normalized, start, "right") - 1),
+                 "end": int(np.searchsorted(normalized, end, "left")), "label": label}
+                for start, end, label in redactions]
+
+    def _build_result(self, clean_text: str, classification: Dict, talk_ratio: float, duration: int,
+                      transcript: Optional[str] = None) -> Dict:
         top_intent = classification['labels'][0]
         confidence = classification['scores'][0]
         
         # Store all scores for the UI dropdown
         all_scores = dict(zip(classification['labels'], classification['scores']))
 
-        # 3. Calculate Risk (Heuristic from Notebook 03 results)
+        risk_score, risk_level = self.score_risk(top_intent, talk_ratio, duration)
+
+        return {
+            "clean_text": clean_text,
+            "intent": top_intent,
+            "confidence": round(confidence, 4),
+            "all_scores": all_scores,  # Passed to Streamlit for the expander
+            "risk_level": risk_level,
+            "risk_score": risk_score,
+            # What was removed, as spans over the input transcript (for highlighting)
+            "redactions": self._source_spans(transcript, classification.get("redactions")) if transcript else [],
+        }
+
+    @staticmethod
+    def score_risk(intent: str, talk_ratio: float, duration: int) -> Tuple[int, str]:
+        """Heuristic risk score derived from the Notebook 03 friction results."""
         risk_score = 0
         # Map specific intent keywords to risk
-        if "Cancellation" in top_intent: 
+        if "Cancellation" in intent: 
             risk_score += 40
         
         if talk_ratio > 1.1: 
@@ -63,12 +407,4 @@ class CallAnalyticsEngine:
             risk_score += 30
         
         risk_level = "HIGH" if risk_score >= 70 else "MEDIUM" if risk_score >= 40 else "LOW"
-
-        return {
-            "clean_text": clean_text,
-            "intent": top_intent,
-            "confidence": round(confidence, 4),
-            "all_scores": all_scores,  # Passed to Streamlit for the expander
-            "risk_level": risk_level,
-            "risk_score": risk_score
-        }
\ No newline at end of file
+        return risk_score, risk_level
@@ -0,0 +1,151 @@
+# src/models/onnx_runtime.py
+import inspect
+import os
+import re
+import tempfile
+import warnings
+from typing import Optional, Tuple
+
+import torch
+from transformers import (AutoConfig, AutoModelForSequenceClassification, AutoModelForTokenClassification,
+                          AutoTokenizer)
+from transformers.modeling_outputs import SequenceClassifierOutput, TokenClassifierOutput
+
+DEFAULT_ONNX_DIR = os.path.join("data", "models", "onnx")
+
+# "torch": fp32 PyTorch · "onnx": int8-quantized ONNX Runtime on CPU (falls back to torch)
+RUNTIMES = ("torch", "onnx")
+
+# Part of the export file name; bumped when the export changes, so stale exports are not reused
+# (v2: inputs ordered by forward(), BART exported without its decoder cache)
+EXPORT_VERSION = 2
+
+TASKS = {
+    "token-classification": (AutoModelForTokenClassification, TokenClassifierOutput),
+    "sequence-classification": (AutoModelForSequenceClassification, SequenceClassifierOutput),
+}
+
+
+def onnx_available() -> bool:
+    try:
+        import onnxruntime  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def onnx_path(model_name: str, task: str, onnx_dir: str = DEFAULT_ONNX_DIR) -> str:
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+    return os.path.join(onnx_dir, f"{slug}-{task}-int8-v{EXPORT_VERSION}.onnx")
+
+
+def export_quantized(model: torch.nn.Module, tokenizer, path: str) -> str:
+    """Exports a transformers classifier to ONNX, then applies dynamic int8 weight quantization."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    dummy = tokenizer(["This is a sample call transcript."], return_tensors="pt")
+    # Inputs are traced positionally: order them as forward() declares them, not as the tokenizer lists
+    # them (BERT's tokenizer puts token_type_ids before attention_mask, forward() the other way round)
+    input_names = [name for name in inspect.signature(model.forward).parameters if name in dummy]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    # Encoder-decoder models (BART) otherwise return an EncoderDecoderCache, which the tracer can't export
+    if getattr(model.config, "use_cache", False):
+        model.config.use_cache = False
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        fp32_path = os.path.join(tmp, "model.onnx")
+        with torch.inference_mode():
+            torch.onnx.export(model, tuple(dummy[name] for name in input_names), fp32_path,
+                              input_names=input_names, output_names=["logits"], dynamic_axes=dynamic_axes,
+                              opset_version=17, dynamo=False)
+        quantize_dynamic(fp32_path, path, weight_type=QuantType.QInt8)
+    return path
+
+
+class OnnxModel(torch.nn.Module):
+    """
+    An onnxruntime session behind the forward() of a transformers classifier,
+    so pipelines and CachedZeroShotClassifier can use it unchanged. Always CPU.
+    """
+
+    def __init__(self, session, config, output_cls, path: str):
+        super().__init__()
+        self.session = session
+        self.config = config
+        self.output_cls = output_cls
+        self.onnx_path = path
+        self.input_names = [i.name for i in session.get_inputs()]
+
+    @property
+    def device(self) -> torch.device:
+        return torch.device("cpu")
+
+    @property
+    def dtype(self) -> torch.dtype:
+        return torch.float32
+
+    def can_generate(self) -> bool:
+        return False
+
+    def size_mb(self) -> float:
+        return os.path.getsize(self.onnx_path) / 1024 ** 2
+
+    def forward(self, **inputs):
+        feeds = {name: inputs[name].detach().cpu().numpy() for name in self.input_names if name in inputs}
+        logits = self.session.run(["logits"], feeds)[0]
+        return self.output_cls(logits=torch.from_numpy(logits))
+
+
+def load_onnx_model(model_name: str, task: str, onnx_dir: str = DEFAULT_ONNX_DIR,
+                    num_threads: Optional[int] = None) -> Tuple[OnnxModel, object]:
+    """(model, tokenizer) for the quantized ONNX export of model_name; exports on first use."""
+    import onnxruntime as ort
+
+    auto_cls, output_cls = TASKS[task]
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    path = onnx_path(model_name, task, onnx_dir)
+    if os.path.exists(path):
+        config = AutoConfig.from_pretrained(model_name)
+    else:
+        print(f"Exporting {model_name} to quantized ONNX ({path})...")
+        torch_model = auto_cls.from_pretrained(model_name).eval()
+        config = torch_model.config
+        export_quantized(torch_model, tokenizer, path)
+        del torch_model
+
+    options = ort.SessionOptions()
+    if num_threads:
+        options.intra_op_num_threads = num_threads
+    session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    # Named after the exported architecture so the pipelines' supported-model check passes
+    architecture = (config.architectures or ["OnnxModel"])[0]
+    model_cls = type(architecture, (OnnxModel,), {})
+    return model_cls(session, config, output_cls, path), tokenizer
+
+
+def load_classifier(model_name: str, task: str, runtime: str = "torch", device: int = -1,
+                    onnx_dir: str = DEFAULT_ONNX_DIR) -> Tuple[torch.nn.Module, object, str]:
+    """
+    (model, tokenizer, runtime actually used). runtime="onnx" falls back to
+    torch when onnxruntime is missing, a GPU is requested, or the export fails.
+    """
+    if runtime not in RUNTIMES:
+        raise ValueError(f"runtime must be one of {RUNTIMES}")
+    if runtime == "onnx":
+        if not onnx_available():
+            print("onnxruntime is not installed; falling back to torch.")
+        elif device >= 0:
+            print("The ONNX backend is CPU-only; using torch on the GPU.")
+        else:
+            try:
+                model, tokenizer = load_onnx_model(model_name, task, onnx_dir)
+                return model, tokenizer, "onnx"
+            except Exception as e:
+                warnings.warn(f"ONNX backend unavailable for {model_name} ({type(e).__name__}: {e}); "
+                              f"falling back to torch.", RuntimeWarning)
+    auto_cls, _ = TASKS[task]
+    return auto_cls.from_pretrained(model_name), AutoTokenizer.from_pretrained(model_name), "torch"
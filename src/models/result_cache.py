@@ -0,0 +1,154 @@
+# src/models/result_cache.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+DEFAULT_RESULT_CACHE_PATH = os.path.join("data", "cache", "analyze_results.sqlite")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class ResultCache:
+    """
+    Bounded LRU cache for the model-dependent part of analyze_call
+    (redacted clean_text plus the intent labels / scores).
+
+    Keys hash the transcript with only whitespace folded, together with a
+    version string describing the models and candidate labels, so changing
+    either never serves stale results. Case is kept: name and account-id
+    redaction depend on it, so folding it could return a cached result in which
+    PII that the current input would lose was left in. Entries
+    expire after ttl_seconds. With disk_path set, entries are also written to a
+    SQLite file so they survive process (e.g. Streamlit) restarts; disk hits are
+    promoted into memory. Any object with get(key) / put(key, value) / stats()
+    can stand in for this class in CallAnalyticsEngine.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 24 * 3600,
+                 disk_path: Optional[str] = None, max_disk_entries: int = 100_000):
+        """
+        max_entries: in-memory LRU bound.
+        ttl_seconds: entry lifetime (None = never expires).
+        disk_path: optional SQLite file for the persistent tier.
+        max_disk_entries: rows kept on disk; the oldest are pruned beyond this.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._puts = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if disk_path:
+            os.makedirs(os.path.dirname(disk_path) or ".", exist_ok=True)
+            # One connection shared by Streamlit's script threads, serialized by self._lock
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS results "
+                             "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created)")
+            self._prune_disk()
+
+    @staticmethod
+    def key(text: str, version: str) -> str:
+        return hashlib.sha1(f"{version}\x00{_WHITESPACE.sub(' ', text.strip())}".encode("utf-8")).hexdigest()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, value = entry
+                if not self._expired(created):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+                self.expirations += 1
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    if not self._expired(row[1]):
+                        value = json.loads(row[0])
+                        self._remember(key, row[1], value)
+                        self.disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._db.commit()
+                    self.expirations += 1
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict):
+        """value must be JSON-serializable when the disk tier is enabled."""
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, value)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO results (key, value, created) VALUES (?, ?, ?)",
+                                 (key, json.dumps(value), created))
+                self._db.commit()
+                self._puts += 1
+                if self._puts % 100 == 0:
+                    self._prune_disk()
+
+    def _remember(self, key: str, created: float, value: Dict):
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _prune_disk(self):
+        """Drops expired rows and the oldest rows beyond max_disk_entries."""
+        if self.ttl_seconds is not None:
+            self._db.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl_seconds,))
+        self._db.execute("DELETE FROM results WHERE key NOT IN "
+                         "(SELECT key FROM results ORDER BY created DESC LIMIT ?)", (self.max_disk_entries,))
+        self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def stats(self) -> Dict:
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        disk_entries = None
+        if self._db is not None:
+            with self._lock:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "entries": len(self),
+            "disk_entries": disk_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,151 @@
+# src/models/zero_shot.py
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from src.models.onnx_runtime import load_classifier
+
+
+class CachedZeroShotClassifier:
+    """
+    Drop-in replacement for pipeline("zero-shot-classification") that tokenizes
+    each candidate-label hypothesis once and reuses it for every transcript.
+
+    The premise of each transcript is tokenized once (not once per label), joined
+    with the cached hypothesis ids, and all premise/label pairs of a batch of
+    transcripts are stacked into a single forward pass.
+    """
+
+    def __init__(self, model_name: str = "facebook/bart-large-mnli", device: int = -1,
+                 hypothesis_template: str = "This example is {}.", runtime: str = "torch"):
+        """runtime: "torch" or "onnx" (int8 ONNX Runtime on CPU, falls back to torch)."""
+        if runtime == "torch":
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+            self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        else:
+            self.model, self.tokenizer, runtime = load_classifier(
+                model_name, "sequence-classification", runtime=runtime, device=device)
+        self.runtime = runtime
+        self.model.eval()
+        self.device = torch.device("cpu" if device < 0 else f"cuda:{device}")
+        self.model.to(self.device)
+
+        self.hypothesis_template = hypothesis_template
+        self.max_length = min(self.tokenizer.model_max_length, self.model.config.max_position_embeddings)
+        self.entailment_id = self._find_entailment_id()
+        self.uses_token_types = "token_type_ids" in self.tokenizer.model_input_names
+
+        self._template = self._pair_template()
+        self._hypothesis_cache: Dict[Tuple[str, ...], List[Tuple[List[int], List[int]]]] = {}
+
+    def _find_entailment_id(self) -> int:
+        for label, idx in self.model.config.label2id.items():
+            if label.lower().startswith("entail"):
+                return int(idx)
+        return -1  # Same fallback as the transformers pipeline
+
+    def _pair_template(self) -> Dict:
+        """
+        Learns where this tokenizer puts its special tokens around a sentence
+        pair (e.g. <s> A </s></s> B </s> for BART) by encoding a probe pair, so
+        we can assemble pairs from cached ids without re-tokenizing.
+        """
+        a_ids = self.tokenizer("premise", add_special_tokens=False)["input_ids"]
+        b_ids = self.tokenizer("hypothesis", add_special_tokens=False)["input_ids"]
+        probe = self.tokenizer("premise", "hypothesis")
+        ids = probe["input_ids"]
+        types = probe.get("token_type_ids", [0] * len(ids))
+
+        a_start = next(i for i in range(len(ids)) if ids[i:i + len(a_ids)] == a_ids)
+        a_end = a_start + len(a_ids)
+        b_start = next(i for i in range(a_end, len(ids)) if ids[i:i + len(b_ids)] == b_ids)
+        b_end = b_start + len(b_ids)
+        return {
+            "prefix": (ids[:a_start], types[:a_start]),
+            "middle": (ids[a_end:b_start], types[a_end:b_start]),
+            "suffix": (ids[b_end:], types[b_end:]),
+            "premise_type": types[a_start] if a_ids else 0,
+            "hypothesis_type": types[b_start] if b_ids else 0,
+        }
+
+    def hypothesis_encodings(self, candidate_labels: Sequence[str]) -> List[Tuple[List[int], List[int]]]:
+        """Cached (input_ids, token_type_ids) tail for each label: middle + hypothesis + suffix."""
+        key = tuple(candidate_labels)
+        if key not in self._hypothesis_cache:
+            middle_ids, middle_types = self._template["middle"]
+            suffix_ids, suffix_types = self._template["suffix"]
+            hyp_type = self._template["hypothesis_type"]
+            hypotheses = [self.hypothesis_template.format(label) for label in candidate_labels]
+            encoded = self.tokenizer(hypotheses, add_special_tokens=False)["input_ids"]
+            self._hypothesis_cache[key] = [
+                (middle_ids + ids + suffix_ids, middle_types + [hyp_type] * len(ids) + suffix_types)
+                for ids in encoded
+            ]
+        return self._hypothesis_cache[key]
+
+    def __call__(self, sequences: Union[str, List[str]], candidate_labels: Sequence[str],
+                 batch_size: int = 48) -> Union[Dict, List[Dict]]:
+        """
+        Same contract as the zero-shot pipeline (single-label mode).
+        batch_size: premise/label pairs per forward pass.
+        """
+        single = isinstance(sequences, str)
+        if single:
+            sequences = [sequences]
+        candidate_labels = list(candidate_labels)
+        n_labels = len(candidate_labels)
+
+        hypotheses = self.hypothesis_encodings(candidate_labels)
+        premises = self.tokenizer(list(sequences), add_special_tokens=False)["input_ids"]
+
+        prefix_ids, prefix_types = self._template["prefix"]
+        premise_type = self._template["premise_type"]
+        pairs = []
+        for premise in premises:
+            for hyp_ids, hyp_types in hypotheses:
+                # Truncate only the premise, mirroring truncation="only_first"
+                budget = self.max_length - len(prefix_ids) - len(hyp_ids)
+                p = premise[:budget]
+                pairs.append((prefix_ids + p + hyp_ids, prefix_types + [premise_type] * len(p) + hyp_types))
+
+        entail_logits = self._entailment_logits(pairs, batch_size).reshape(len(sequences), n_labels)
+
+        # Softmax over the entailment logits of all labels (pipeline single-label mode)
+        shifted = entail_logits - entail_logits.max(axis=1, keepdims=True)
+        scores = np.exp(shifted)
+        scores /= scores.sum(axis=1, keepdims=True)
+
+        results = []
+        for sequence, row in zip(sequences, scores):
+            order = np.argsort(-row, kind="stable")
+            results.append({
+                "sequence": sequence,
+                "labels": [candidate_labels[i] for i in order],
+                "scores": [float(row[i]) for i in order],
+            })
+        return results[0] if single else results
+
+    @torch.inference_mode()
+    def _entailment_logits(self, pairs: List[Tuple[List[int], List[int]]], batch_size: int) -> np.ndarray:
+        pad_id = self.tokenizer.pad_token_id or 0
+        out = []
+        for start in range(0, len(pairs), batch_size):
+            chunk = pairs[start:start + batch_size]
+            width = max(len(ids) for ids, _ in chunk)
+            input_ids = torch.full((len(chunk), width), pad_id, dtype=torch.long)
+            attention_mask = torch.zeros((len(chunk), width), dtype=torch.long)
+            token_type_ids = torch.zeros((len(chunk), width), dtype=torch.long)
+            for row, (ids, types) in enumerate(chunk):
+                input_ids[row, :len(ids)] = torch.tensor(ids)
+                attention_mask[row, :len(ids)] = 1
+                token_type_ids[row, :len(types)] = torch.tensor(types)
+
+            inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if self.uses_token_types:
+                inputs["token_type_ids"] = token_type_ids
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            logits = self.model(**inputs).logits
+            out.append(logits[:, self.entailment_id].float().cpu().numpy())
+        return np.concatenate(out) if out else np.zeros(0, dtype=np.float32)
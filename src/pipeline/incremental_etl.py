@@ -0,0 +1,173 @@
+# src/pipeline/incremental_etl.py
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import pandas as pd
+
+from src.database.db_connector import transaction
+from src.features.extraction import ANALYTICS_COLUMNS, DEFAULT_CHUNK_SIZE, CallLogExtractor
+from src.pipeline.scorecard import ARCHETYPE_NAMES, COST_PER_MINUTE, STATE_FILE, FrictionScorecard
+from src.utils.artifacts import PROCESSED_DIR, artifact_columns, read_artifact, upsert_artifact
+
+ETL_STATE_FILE = "etl_state.json"
+
+# updated_at is bumped by CopyBulkLoader upserts; tables created before it existed fall back to created_at
+WATERMARK_COLUMNS = ("updated_at", "created_at")
+
+# Rows committed late (long transactions) can carry a stamp just below the last watermark
+OVERLAP_SECONDS = 300
+
+
+class IncrementalETL:
+    """
+    Refreshes the processed store from call_logs rows changed since the last run.
+
+    A high-water mark on updated_at (or created_at) is kept in etl_state.json.
+    Each run:
+      1. streams rows with watermark - overlap < ts <= NOW() through CallLogExtractor
+      2. upserts their features into analytics_base by call_id
+      3. sanitizes, embeds and assigns them with IncrementalArchetypeService
+         (known calls are replaced in place in clustered_data, new ones appended)
+      4. folds them into the friction scorecard, subtracting the old version of updated calls
+      5. advances the watermark once every artifact is written
+    Model work scales with the changed rows. Every step is an upsert, so rows
+    seen again through the overlap window, or after a failed run, are harmless.
+    """
+
+    def __init__(self, conn=None, processed_dir: str = PROCESSED_DIR, state_path: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, overlap_seconds: int = OVERLAP_SECONDS,
+                 archetype_service=None, archetype_names: Optional[Dict[int, str]] = None):
+        """
+        conn: open psycopg2 connection (defaults to the shared pool).
+        archetype_service: IncrementalArchetypeService (defaults to the persisted model and embeddings).
+        archetype_names: cluster id -> scorecard label (defaults to ARCHETYPE_NAMES).
+        """
+        self.extractor = CallLogExtractor(conn, chunk_size=chunk_size)
+        self.processed_dir = processed_dir
+        self.state_path = state_path or os.path.join(processed_dir, ETL_STATE_FILE)
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.archetype_names = archetype_names or ARCHETYPE_NAMES
+        if archetype_service is None:
+            from src.models.archetypes import IncrementalArchetypeService
+            archetype_service = IncrementalArchetypeService(processed_dir=processed_dir)
+        self.archetype_service = archetype_service
+
+    # ── Watermark state ─────────────────────────────────────────
+    def load_state(self) -> Dict:
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path) as f:
+            return json.load(f)
+
+    def _save_state(self, state: Dict):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def watermark_column(self) -> str:
+        with transaction(self.extractor.conn) as cursor:
+            cursor.execute("SELECT column_name FROM information_schema.columns "
+                           "WHERE table_name = 'call_logs' AND column_name = ANY(%s);", (list(WATERMARK_COLUMNS),))
+            available = {row[0] for row in cursor.fetchall()}
+        for column in WATERMARK_COLUMNS:
+            if column in available:
+                return column
+        raise ValueError(f"call_logs has none of the watermark columns {WATERMARK_COLUMNS}")
+
+    def _db_now(self) -> datetime:
+        with transaction(self.extractor.conn) as cursor:
+            cursor.execute("SELECT NOW();")
+            return cursor.fetchone()[0]
+
+    def initialize(self) -> Dict:
+        """Marks everything currently in call_logs as processed (e.g. right after running the notebooks)."""
+        state = {"column": self.watermark_column(), "watermark": self._db_now().isoformat(),
+                 "last_run": datetime.now().isoformat(timespec="seconds"), "last_report": None}
+        self._save_state(state)
+        return state
+
+    # ── Run ─────────────────────────────────────────────────────
+    def run(self, full: bool = False) -> Dict:
+        """Processes rows changed since the watermark (all rows if full=True or no state exists)."""
+        start = time.perf_counter()
+        if not os.path.exists(self.archetype_service.model_path):
+            raise FileNotFoundError(f"No archetype model at {self.archetype_service.model_path}; run notebook 02 first")
+        if "call_id" not in artifact_columns("clustered_data", self.processed_dir):
+            raise ValueError("clustered_data has no call_id column; rebuild it with notebooks 01-02 first")
+
+        column = self.watermark_column()
+        state = self.load_state()
+        upper = self._db_now()
+
+        # 1. Changed rows only (a full pass has no bounds, so rows without a stamp are included)
+        where, params = None, None
+        if not full and state.get("watermark") and state.get("column") == column:
+            since = datetime.fromisoformat(state["watermark"]) - self.overlap
+            where, params = f"{column} > %s AND {column} <= %s", (since, upper)
+        else:
+            print("No usable watermark; processing every call (idempotent upsert).")
+        chunks = list(self.extractor.iter_features(where, params))
+        delta = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=ANALYTICS_COLUMNS)
+        report = {"rows": len(delta), "added": 0, "updated": 0, "refit": False, "watermark_column": column}
+
+        if len(delta):
+            # 2. analytics_base
+            upsert_artifact(delta, "analytics_base", key="call_id", processed_dir=self.processed_dir)
+
+            # 3. clustered_data + embeddings
+            assigned = self.archetype_service.add_calls(delta, key="call_id")
+            report.update(added=assigned["added"], updated=assigned["updated"], refit=assigned["refit"])
+
+            # 4. Scorecard: a refit relabels history, so only then is it rebuilt from clustered_data
+            self._update_scorecard(assigned)
+
+        # 5. Advance the watermark only after every artifact is written
+        report["watermark"] = upper.isoformat()
+        report["seconds"] = round(time.perf_counter() - start, 2)
+        self._save_state({"column": column, "watermark": upper.isoformat(),
+                          "last_run": datetime.now().isoformat(timespec="seconds"), "last_report": report})
+        print(f"Incremental ETL: {report['rows']} changed calls ({report['added']} new, {report['updated']} updated), "
+              f"refit={report['refit']}, watermark {column} <= {report['watermark']} in {report['seconds']}s")
+        return report
+
+    def _update_scorecard(self, assigned: Dict):
+        previous = FrictionScorecard.load(self.processed_dir) \
+            if os.path.exists(os.path.join(self.processed_dir, STATE_FILE)) else None
+        if assigned["refit"] or previous is None:
+            clustered = read_artifact("clustered_data", processed_dir=self.processed_dir)
+            cost = previous.cost_per_minute if previous is not None else COST_PER_MINUTE
+            scorecard = FrictionScorecard(cost).update(clustered, self.archetype_names)
+        else:
+            scorecard = previous
+            if len(assigned["replaced_rows"]):
+                scorecard.remove(assigned["replaced_rows"], self.archetype_names)
+            scorecard.update(assigned["assigned_rows"], self.archetype_names)
+        scorecard.save(self.processed_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental call_logs -> analytics artifacts refresh")
+    parser.add_argument("--processed-dir", default=PROCESSED_DIR)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--overlap-seconds", type=int, default=OVERLAP_SECONDS)
+    parser.add_argument("--full", action="store_true", help="ignore the watermark and upsert every call")
+    parser.add_argument("--init", action="store_true",
+                        help="only set the watermark to now (artifacts were just rebuilt by the notebooks)")
+    args = parser.parse_args()
+
+    etl = IncrementalETL(processed_dir=args.processed_dir, chunk_size=args.chunk_size,
+                         overlap_seconds=args.overlap_seconds)
+    if args.init:
+        print(f"Watermark initialized: {etl.initialize()}")
+    else:
+        etl.run(full=args.full)
+
+
+if __name__ == "__main__":
+    main()
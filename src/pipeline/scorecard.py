@@ -0,0 +1,135 @@
+# src/pipeline/scorecard.py
+import os
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.artifacts import PROCESSED_DIR
+
+SCORECARD_FILE = "executive_friction_scorecard.csv"
+STATE_FILE = "friction_scorecard_state.parquet"
+
+# Notebook 03: cost per archetype assumes 1 minute = $1.50
+COST_PER_MINUTE = 1.50
+
+# Notebook 03: cluster ids mapped to the business labels found via zero-shot
+# (update after re-running notebook 02; ids missing here are left out of the scorecard)
+ARCHETYPE_NAMES = {
+    0: "Technical Troubleshooting",
+    1: "Billing & Payment Disputes",
+    2: "Subscription Cancellation",
+    3: "Account Access & Security",
+    -1: "Unclassified / Noise",
+}
+
+# Per-archetype means in the scorecard (resolution_rate is emitted so app.py need not regroup)
+MEAN_COLUMNS = {
+    "duration_sec": "duration_sec",
+    "talk_ratio": "talk_ratio",
+    "escalated": "escalated",
+    "csat_score": "csat_score",
+    "resolved": "resolution_rate",
+}
+
+
+class FrictionScorecard:
+    """
+    Mergeable running aggregate behind executive_friction_scorecard.csv.
+
+    The state is one row per archetype holding a call count plus sums and
+    non-null counts per metric, so absorbing a batch is a groupby over that
+    batch only, and partial states from parallel workers merge by addition.
+    to_scorecard() emits the notebook 03 columns (means, summed call_cost and
+    Friction_Index) without rescanning history.
+    """
+
+    def __init__(self, cost_per_minute: float = COST_PER_MINUTE, state: Optional[pd.DataFrame] = None):
+        self.cost_per_minute = cost_per_minute
+        self.state = state if state is not None else pd.DataFrame(columns=self._state_columns(), dtype=float)
+
+    @staticmethod
+    def _state_columns():
+        columns = ["Call_Volume", "call_cost_sum"]
+        for col in MEAN_COLUMNS:
+            columns += [f"{col}_sum", f"{col}_count"]
+        return columns
+
+    def _partial(self, calls: pd.DataFrame) -> pd.DataFrame:
+        """Per-archetype counts and sums for one batch."""
+        calls = calls[calls["archetype_name"].notna()]
+        metrics = pd.DataFrame({"archetype_name": calls["archetype_name"]})
+        for col in MEAN_COLUMNS:
+            values = calls[col].astype(float) if col in calls.columns else np.nan
+            metrics[f"{col}_sum"] = values
+            metrics[f"{col}_count"] = pd.notna(values) if col in calls.columns else 0
+        metrics["call_cost_sum"] = calls["duration_sec"].astype(float) / 60 * self.cost_per_minute
+        grouped = metrics.groupby("archetype_name")
+        partial = grouped.sum(min_count=0)
+        partial["Call_Volume"] = grouped.size()
+        return partial[self._state_columns()].astype(float)
+
+    def update(self, calls: pd.DataFrame, archetype_names: Optional[Dict[int, str]] = None) -> "FrictionScorecard":
+        """
+        Absorbs a batch of calls in O(len(calls)). Rows need an archetype_name
+        column, or a cluster_id column plus archetype_names (unmapped ids are
+        dropped, as in notebook 03).
+        """
+        if "archetype_name" not in calls.columns:
+            calls = calls.assign(archetype_name=calls["cluster_id"].map(archetype_names or {}))
+        return self._add(self._partial(calls))
+
+    def remove(self, calls: pd.DataFrame, archetype_names: Optional[Dict[int, str]] = None) -> "FrictionScorecard":
+        """Subtracts calls absorbed earlier (e.g. the old version of an updated row)."""
+        if "archetype_name" not in calls.columns:
+            calls = calls.assign(archetype_name=calls["cluster_id"].map(archetype_names or {}))
+        self._add(-self._partial(calls))
+        self.state = self.state[self.state["Call_Volume"] > 0]
+        return self
+
+    def merge(self, other: "FrictionScorecard") -> "FrictionScorecard":
+        """Folds another partial state (e.g. from a worker) into this one."""
+        if other.cost_per_minute != self.cost_per_minute:
+            raise ValueError("Cannot merge scorecards built with different cost_per_minute")
+        return self._add(other.state)
+
+    def _add(self, partial: pd.DataFrame) -> "FrictionScorecard":
+        self.state = partial.copy() if self.state.empty else self.state.add(partial, fill_value=0)
+        self.state.index.name = "archetype_name"
+        return self
+
+    @classmethod
+    def combine(cls, parts: Iterable["FrictionScorecard"]) -> "FrictionScorecard":
+        combined = None
+        for part in parts:
+            combined = cls(part.cost_per_minute).merge(part) if combined is None else combined.merge(part)
+        return combined if combined is not None else cls()
+
+    def to_scorecard(self) -> pd.DataFrame:
+        """The executive friction scorecard, sorted by Friction_Index."""
+        state = self.state
+        scorecard = pd.DataFrame(index=state.index)
+        scorecard["Call_Volume"] = state["Call_Volume"].astype(int)
+        for col, name in MEAN_COLUMNS.items():
+            scorecard[name] = state[f"{col}_sum"] / state[f"{col}_count"].replace(0, np.nan)
+        scorecard["call_cost"] = state["call_cost_sum"]
+
+        # High escalation and low CSAT yield a high friction score
+        scorecard["Friction_Index"] = (scorecard["escalated"] * (6 - scorecard["csat_score"])).round(2)
+        columns = ["Call_Volume", "duration_sec", "talk_ratio", "escalated", "csat_score", "call_cost",
+                   "Friction_Index", "resolution_rate"]
+        return scorecard[columns].sort_values(by="Friction_Index", ascending=False)
+
+    def save(self, processed_dir: str = PROCESSED_DIR):
+        """Writes the scorecard CSV and the running state it was computed from."""
+        os.makedirs(processed_dir, exist_ok=True)
+        self.to_scorecard().to_csv(os.path.join(processed_dir, SCORECARD_FILE))
+        state = self.state.copy()
+        state["cost_per_minute"] = self.cost_per_minute
+        state.to_parquet(os.path.join(processed_dir, STATE_FILE))
+
+    @classmethod
+    def load(cls, processed_dir: str = PROCESSED_DIR) -> "FrictionScorecard":
+        state = pd.read_parquet(os.path.join(processed_dir, STATE_FILE))
+        cost_per_minute = float(state.pop("cost_per_minute").iloc[0]) if len(state) else COST_PER_MINUTE
+        return cls(cost_per_minute, state)
@@ -0,0 +1,179 @@
+# src/pipeline/sharded.py
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+import multiprocessing as mp
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.features.embedding_cache import EmbeddingCache
+
+# Per-process models, created once by the pool initializer
+_worker: Dict = {}
+
+
+def _init_worker(redaction_tier: str, model_name: str, torch_threads: int, cache_dir: Optional[str]):
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    import torch
+    torch.set_num_threads(torch_threads)
+
+    from src.features.embeddings import VectorEngine
+    from src.preprocessing.cleaner import TextSanitizer
+    _worker["sanitizer"] = TextSanitizer(tier=redaction_tier)
+    # Workers only read the shared cache; the parent process writes it once at the end
+    _worker["vector_engine"] = VectorEngine(model_name, cache_dir=cache_dir, read_only_cache=True)
+
+
+def _process_shard(shard_id: int, texts: List[str], out_dir: str, batch_size: int) -> Dict:
+    """redact -> clean -> embed one shard and write it to disk."""
+    sanitizer = _worker["sanitizer"]
+    vector_engine = _worker["vector_engine"]
+
+    cache = vector_engine.cache
+    hits_before, misses_before = (cache.hits, cache.misses) if cache else (0, 0)
+
+    start = time.perf_counter()
+    sanitized = sanitizer.sanitize(texts, batch_size=batch_size)
+    embeddings = np.asarray(vector_engine.generate_embeddings(sanitized, batch_size=batch_size, verbose=False),
+                            dtype=np.float32)
+
+    base = os.path.join(out_dir, f"shard_{shard_id:05d}")
+    np.save(base + ".npy", embeddings)
+    with open(base + ".json", "w") as f:
+        json.dump(sanitized, f)
+
+    return {
+        "shard_id": shard_id,
+        "rows": len(texts),
+        "seconds": time.perf_counter() - start,
+        "cache_hits": cache.hits - hits_before if cache else 0,
+        "cache_misses": cache.misses - misses_before if cache else 0,
+    }
+
+
+class ShardedPipeline:
+    """
+    Notebook 02's sanitize + embed step, sharded across a process pool.
+
+    Each worker holds its own TextSanitizer / VectorEngine with a bounded torch
+    thread count, streams shards through redact -> clean -> embed and writes
+    shard_XXXXX.npy / .json files to out_dir as soon as each shard finishes.
+    """
+
+    def __init__(self, out_dir: str = os.path.join("data", "embeddings", "shards"),
+                 num_workers: Optional[int] = None, torch_threads: int = 2, shard_size: int = 256,
+                 batch_size: int = 16, redaction_tier: str = "ner",
+                 model_name: str = "all-mpnet-base-v2", cache_dir: Optional[str] = None):
+        """
+        num_workers: defaults to cpu_count // torch_threads.
+        cache_dir: optional EmbeddingCache location, read by workers and
+            updated by this process once all shards are done.
+        """
+        self.out_dir = out_dir
+        self.torch_threads = torch_threads
+        self.num_workers = num_workers or max(1, (os.cpu_count() or 1) // torch_threads)
+        self.shard_size = shard_size
+        self.batch_size = batch_size
+        self.redaction_tier = redaction_tier
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.stats: Dict = {}
+
+    def _shards(self, texts: Iterable[str]) -> Iterator[Tuple[int, List[str]]]:
+        texts = iter(texts)
+        shard_id = 0
+        while True:
+            shard = list(islice(texts, self.shard_size))
+            if not shard:
+                return
+            yield shard_id, shard
+            shard_id += 1
+
+    def process(self, texts: Iterable[str]) -> List[Dict]:
+        """
+        Runs every shard and returns per-shard reports in shard order.
+        At most 2 shards per worker are in flight, so the input can be a lazy
+        iterable of any length.
+        """
+        os.makedirs(self.out_dir, exist_ok=True)
+        reports = []
+        max_in_flight = 2 * self.num_workers
+        start = time.perf_counter()
+
+        ctx = mp.get_context("spawn")  # fork + torch threads is unsafe
+        with ProcessPoolExecutor(max_workers=self.num_workers, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(self.redaction_tier, self.model_name,
+                                           self.torch_threads, self.cache_dir)) as pool:
+            pending = set()
+            for shard_id, shard in self._shards(texts):
+                pending.add(pool.submit(_process_shard, shard_id, shard, self.out_dir, self.batch_size))
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    reports.extend(f.result() for f in done)
+            reports.extend(f.result() for f in pending)
+
+        reports.sort(key=lambda r: r["shard_id"])
+        rows = sum(r["rows"] for r in reports)
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            "shards": len(reports),
+            "rows": rows,
+            "seconds": round(elapsed, 2),
+            "rows_per_sec": round(rows / elapsed, 1) if elapsed else 0.0,
+            "workers": self.num_workers,
+            "torch_threads": self.torch_threads,
+        }
+        return reports
+
+    def iter_results(self, num_shards: int) -> Iterator[Tuple[List[str], np.ndarray]]:
+        """Reads (sanitized_texts, embeddings) back shard by shard, in input order."""
+        for shard_id in range(num_shards):
+            base = os.path.join(self.out_dir, f"shard_{shard_id:05d}")
+            with open(base + ".json") as f:
+                sanitized = json.load(f)
+            yield sanitized, np.load(base + ".npy")
+
+    def run(self, texts: Iterable[str]) -> Tuple[List[str], np.ndarray]:
+        """Processes all texts and returns (sanitized_texts, embeddings) in input order."""
+        reports = self.process(texts)
+        sanitized, embeddings = [], []
+        for shard_texts, shard_embeddings in self.iter_results(len(reports)):
+            sanitized.extend(shard_texts)
+            embeddings.append(shard_embeddings)
+        embeddings = np.vstack(embeddings) if embeddings else np.zeros((0, 0), dtype=np.float32)
+
+        if self.cache_dir and sanitized:
+            cache = EmbeddingCache(self.model_name, self.cache_dir)
+            cache.add([cache.key(t) for t in sanitized], embeddings)
+            cache.flush()
+            self.stats["cache_hits"] = sum(r["cache_hits"] for r in reports)
+            self.stats["cache_misses"] = sum(r["cache_misses"] for r in reports)
+        return sanitized, embeddings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded redact -> clean -> embed over analytics_base.csv")
+    parser.add_argument("--input", default=os.path.join("data", "processed", "analytics_base.csv"))
+    parser.add_argument("--out-dir", default=os.path.join("data", "embeddings", "shards"))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--torch-threads", type=int, default=2)
+    parser.add_argument("--shard-size", type=int, default=256)
+    parser.add_argument("--tier", default="ner", choices=["regex", "gazetteer", "ner"])
+    parser.add_argument("--cache-dir", default=None)
+    args = parser.parse_args()
+
+    import pandas as pd
+    texts = pd.read_csv(args.input, usecols=["clean_text"])["clean_text"].fillna("").tolist()
+    runner = ShardedPipeline(out_dir=args.out_dir, num_workers=args.workers, torch_threads=args.torch_threads,
+                             shard_size=args.shard_size, redaction_tier=args.tier, cache_dir=args.cache_dir)
+    _, embeddings = runner.run(texts)
+    print(f"Sharded pipeline complete: {embeddings.shape} -> {args.out_dir}")
+    print(runner.stats)
+
+
+if __name__ == "__main__":
+    main()
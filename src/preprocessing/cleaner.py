@@ -1,19 +1,120 @@
 from transformers import pipeline
 import re
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.models.onnx_runtime import load_classifier
+from src.preprocessing.spans import Span, render, resolve_spans, view_to_source
+from src.utils.batching import DEFAULT_MAX_TOKENS, LengthBucketScheduler, token_lengths
+from src.utils.instrumentation import Instrumentation
+
+# Cheap gazetteer for the "gazetteer" tier: common first names, including every
+# agent name the stochastic simulator emits.
+COMMON_FIRST_NAMES = frozenset("""
+    Aaron Adam Alex Alice Amanda Amy Andrew Angela Anna Anthony Ashley Barbara Ben Brian
+    Carol Catherine Charles Chris Christopher Daniel David Deborah Diana Donald Dorothy
+    Edward Elizabeth Emily Emma Eric Frank Gary George Grace Hannah Helen Jack James Jane
+    Jason Jennifer Jessica John Joseph Joshua Julia Karen Kevin Kimberly Laura Linda Lisa
+    Margaret Maria Mark Mary Matthew Melissa Michael Michelle Mike Nancy Nicole Olivia Patricia
+    Paul Rachel Rebecca Richard Robert Ryan Sam Sandra Sarah Sophia Stephanie Steven Susan
+    Taylor Thomas Timothy William
+""".split())
+
+# Capitalized words that open sentences but are not names; the NER pre-check
+# treats every other capitalized word as a possible name, wherever it appears.
+SENTENCE_STARTERS = frozenset("""
+    About After Again Ah Alright Also Although Am An And Any Anything Are As At Be Because Before But By
+    Bye Can Check Could Did Do Does Done Each Either Even Every Excellent Fine First For From Good Goodbye
+    Great Had Has Have He Hello Her Here Hey Hi His Hmm How However If In Is It Its Just Last Let Lets
+    Like Maybe Me Might Most Much Must My Need New Next No Nope Not Nothing Now Of Oh Ok Okay On Once One
+    Only Or Other Our Perfect Please Right See She Should Since So Some Someone Something Sorry Still Such
+    Sure Thank Thanks That The Their Then There These They This Those Though To Today Too Um Uh Unfortunately
+    Until Very Was We Well Were What When Where Whether Which While Who Why With Would Wow Yeah Yes Yet You
+    Your Yours
+""".split()) - COMMON_FIRST_NAMES
+
+def token_windows(text: str, offsets: Sequence[Tuple[int, int]], window_tokens: int,
+                  overlap: int) -> List[Tuple[int, int, int]]:
+    """
+    (char start, char end, tokens) windows of at most window_tokens tokens over
+    a tokenized text, consecutive windows sharing about `overlap` tokens. Cuts
+    fall on word starts, so each window re-tokenizes to the same tokens, and a
+    name shorter than the overlap that straddles one window's edge appears
+    whole in its neighbour.
+    """
+    n = len(offsets)
+    if n <= window_tokens:
+        return [(0, len(text), n)]
+    # Token i starts a word when whitespace (or the start of the text) precedes it
+    word_start = [offsets[i][0] == 0 or text[offsets[i][0] - 1].isspace() for i in range(n)]
+    windows, start = [], 0
+    while True:
+        end = min(start + window_tokens, n)
+        if end < n:
+            cut = end
+            while cut > start and not word_start[cut]:
+                cut -= 1
+            end = cut if cut > start else end  # a single word longer than the window: hard cut
+        windows.append((offsets[start][0], offsets[end - 1][1], end - start))
+        if end >= n:
+            return windows
+        next_start = max(end - overlap, start + 1)
+        while next_start < end and not word_start[next_start]:
+            next_start += 1
+        start = next_start
+
+
+def merge_spans(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sorted union of (start, end) spans; overlapping or touching spans become one."""
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
 
 class TextSanitizer:
-    def __init__(self, device=-1):
+    # regex: patterns only · gazetteer: + first-name list · ner: + bert-base-NER
+    TIERS = ("regex", "gazetteer", "ner")
+
+    def __init__(self, device=-1, tier: str = "ner", skip_ner_without_candidates: bool = True,
+                 runtime: str = "torch", instrumentation: Optional[Instrumentation] = None,
+                 max_batch_tokens: Optional[int] = DEFAULT_MAX_TOKENS, windowed_ner: bool = True,
+                 ner_window_tokens: Optional[int] = None, ner_window_overlap: int = 64):
         """
         device = -1  → CPU
         device = 0   → GPU (if available)
+        tier: redaction tier, one of TIERS. The NER model is only loaded for "ner".
+        skip_ner_without_candidates: don't send texts to NER when a fast pre-check
+            finds no capitalized token outside SENTENCE_STARTERS that could be a name.
+        runtime: "torch" or "onnx" (int8 ONNX Runtime for the NER model, with
+            fallback to torch; see src/models/onnx_runtime.py).
+        instrumentation: per-stage timers (regex / gazetteer / NER); disabled by default.
+        max_batch_tokens: padded-token budget per NER batch; texts are sorted by
+            length so batches carry little padding (None = input-order batches).
+        windowed_ner: split texts longer than the NER model's 512-token limit into
+            overlapping windows, batch the windows of all texts together and map
+            PERSON spans back to the original character offsets.
+        ner_window_tokens: tokens per window (None = the model limit minus [CLS]/[SEP]).
+        ner_window_overlap: tokens shared by consecutive windows.
         """
-        self.ner_pipeline = pipeline(
-            "ner",
-            model="dslim/bert-base-NER",
-            aggregation_strategy="simple",
-            device=device
-        )
+        if tier not in self.TIERS:
+            raise ValueError(f"tier must be one of {self.TIERS}")
+        self.device = device
+        self.tier = tier
+        self.skip_ner_without_candidates = skip_ner_without_candidates
+        self.runtime = runtime
+        self.instrumentation = instrumentation or Instrumentation()
+        self._ner_pipeline = None
+        self.ner_skipped = 0
+        self.ner_scheduler = LengthBucketScheduler(max_batch_tokens)
+        self.windowed_ner = windowed_ner
+        self.ner_window_tokens = ner_window_tokens
+        self.ner_window_overlap = ner_window_overlap
+        self.ner_windows = 0
 
         # Precompile regex for performance
         self.email_pattern = re.compile(r'\S+@\S+')
@@ -25,38 +126,162 @@ class TextSanitizer:
             re.IGNORECASE
         )
 
+        # Gazetteer: a capitalized word found in COMMON_FIRST_NAMES plus an optional
+        # capitalized surname (a set lookup per word beats a 100-way alternation per position)
+        self.name_pattern = re.compile(r"\b[A-Z][a-z]+\b")
+        self.surname_pattern = re.compile(r"\s+[A-Z][a-z]+\b")
+
+        # Name pre-check: capitalized words (placeholders like [EMAIL] and shouting like NOW don't match)
+        self.capitalized_pattern = re.compile(r"\b[A-Z][a-z]+")
+        self.whitespace_pattern = re.compile(r"\s+")
+
+        # (label, pattern, literal every match contains): the scan is skipped when the literal is absent
+        self.regex_patterns = (("EMAIL", self.email_pattern, "@"), ("ACCOUNT_ID", self.account_pattern, "ACC-"),
+                               ("ADDRESS", self.address_pattern, None))
+
+    @property
+    def ner_pipeline(self):
+        if self._ner_pipeline is None:
+            if self.runtime == "onnx":
+                model, tokenizer, self.runtime = load_classifier(
+                    "dslim/bert-base-NER", "token-classification", runtime="onnx", device=self.device)
+                self._ner_pipeline = pipeline(
+                    "ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple",
+                    device=self.device if self.runtime == "torch" else -1
+                )
+                return self._ner_pipeline
+            self._ner_pipeline = pipeline(
+                "ner",
+                model="dslim/bert-base-NER",
+                aggregation_strategy="simple",
+                device=self.device
+            )
+        return self._ner_pipeline
+
+    def _regex_spans(self, text: str) -> List[Span]:
+        """Stage 1: Fast regex-based spans for predictable patterns."""
+        return resolve_spans([(m.start(), m.end(), label) for label, pattern, literal in self.regex_patterns
+                              if literal is None or literal in text for m in pattern.finditer(text)])
+
     def _regex_redact(self, text: str) -> str:
-        """Stage 1: Fast regex-based redaction for predictable patterns."""
-        text = self.email_pattern.sub("[EMAIL]", text)
-        text = self.account_pattern.sub("[ACCOUNT_ID]", text)
-        text = self.address_pattern.sub("[ADDRESS]", text)
-        return text
+        return render(text, self._regex_spans(text))[0]
 
-    def batch_redact(self, texts: List[str], batch_size: int = 16) -> List[str]:
-        """Stage 2: Transformer-based NER for names and complex entities."""
+    def _gazetteer_spans(self, text: str) -> List[Span]:
+        """Cheap name spans against COMMON_FIRST_NAMES."""
+        spans, end = [], 0
+        for match in self.name_pattern.finditer(text):
+            if match.start() < end or match.group() not in COMMON_FIRST_NAMES:
+                continue
+            end = match.end()
+            surname = self.surname_pattern.match(text, end)
+            if surname:
+                end = surname.end()
+            spans.append((match.start(), end, "PERSON"))
+        return spans
+
+    def has_name_candidates(self, text: str) -> bool:
+        """
+        Fast pre-check for NER: True if any capitalized word outside
+        SENTENCE_STARTERS appears, including at the start of a sentence
+        ("Hello. John here"), so only texts with no possible name skip NER.
+        """
+        return any(match.group() not in SENTENCE_STARTERS for match in self.capitalized_pattern.finditer(text))
+
+    def redaction_spans(self, texts: List[str], batch_size: int = 16) -> List[List[Span]]:
+        """
+        Resolved (start, end, label) spans per text, in its original offsets:
+        regex matches, then gazetteer names or NER PERSON entities by tier.
+        """
+        instr = self.instrumentation
+        tokens = sum(len(t.split()) for t in texts) if instr.enabled else 0
 
         # Step 1: Regex pass
-        regex_cleaned = [self._regex_redact(t) for t in texts]
+        with instr.stage("regex_redaction", items=len(texts), tokens=tokens):
+            spans = [self._regex_spans(t) for t in texts]
+
+        if self.tier == "regex":
+            return spans
+        if self.tier == "gazetteer":
+            with instr.stage("gazetteer_redaction", items=len(texts), tokens=tokens):
+                return [resolve_spans(s + self._gazetteer_spans(t)) for t, s in zip(texts, spans)]
+
+        # Step 2: Transformer pass (NER) over the regex-redacted view, only for texts that may contain a name
+        views = [render(t, s)[0] if s else t for t, s in zip(texts, spans)]
+        if self.skip_ner_without_candidates:
+            ner_indices = [i for i, v in enumerate(views) if self.has_name_candidates(v)]
+        else:
+            ner_indices = list(range(len(views)))
+        self.ner_skipped += len(views) - len(ner_indices)
+        if not ner_indices:
+            return spans
+
+        ner_texts = [views[i] for i in ner_indices]
+        ner_tokens = sum(len(t.split()) for t in ner_texts) if instr.enabled else 0
+        with instr.stage("ner", items=len(ner_texts), tokens=ner_tokens):
+            person_spans = self._person_spans(ner_texts, batch_size)
+
+        # Step 3: PERSON spans back to original offsets, merged with the regex spans
+        for i, person in zip(ner_indices, person_spans):
+            if person:
+                found = [(start, end, "PERSON") for start, end in view_to_source(person, spans[i])]
+                spans[i] = resolve_spans(spans[i] + found)
+        return spans
+
+    def redact(self, texts: List[str], batch_size: int = 16, normalize: bool = True,
+               with_offsets: bool = False) -> List[Dict]:
+        """
+        {"text", "spans", "offset_map"} per text. Each output string is built
+        once from the original and its spans; normalize folds in clean_batch.
+        offset_map (with_offsets=True) gives the output position of every
+        original character, see src/preprocessing/spans.py.
+        """
+        spans = self.redaction_spans(texts, batch_size)
+        with self.instrumentation.stage("render", items=len(texts)):
+            results = []
+            for text, text_spans in zip(texts, spans):
+                output, offsets = render(text, text_spans, normalize=normalize, with_offsets=with_offsets)
+                results.append({"text": output, "spans": text_spans, "offset_map": offsets})
+        return results
+
+    def batch_redact(self, texts: List[str], batch_size: int = 16) -> List[str]:
+        """Regex + (tier) name redaction, original casing and spacing kept."""
+        return [r["text"] for r in self.redact(texts, batch_size, normalize=False)]
+
+    def sanitize(self, texts: List[str], batch_size: int = 16) -> List[str]:
+        """clean_batch(batch_redact(texts)) in a single pass over each text."""
+        return [r["text"] for r in self.redact(texts, batch_size)]
 
-        # Step 2: Transformer pass (NER)
-        ner_results = self.ner_pipeline(regex_cleaned, batch_size=batch_size)
+    def _person_spans(self, texts: List[str], batch_size: int) -> List[List[Tuple[int, int]]]:
+        """Merged (start, end) PER spans per text, in original character offsets."""
+        ner = self.ner_pipeline
+        max_tokens = ner.model.config.max_position_embeddings
+        if not self.windowed_ner:
+            lengths = token_lengths(texts, ner.tokenizer, max_length=max_tokens)
+            results = self.ner_scheduler.map(lambda batch: ner(batch, batch_size=len(batch)),
+                                             texts, lengths, max_batch_size=batch_size)
+            return [merge_spans([(e["start"], e["end"]) for e in entities if e["entity_group"] == "PER"])
+                    for entities in results]
 
-        redacted_texts = []
+        # Step 1: Every text as windows within the model limit (short texts are one window)
+        window_tokens = self.ner_window_tokens or max_tokens - 2
+        offsets = ner.tokenizer(texts, add_special_tokens=False, return_offsets_mapping=True,
+                                verbose=False)["offset_mapping"]
+        windows = [(doc, start, end, n + 2) for doc, (text, doc_offsets) in enumerate(zip(texts, offsets))
+                   for start, end, n in token_windows(text, doc_offsets, window_tokens, self.ner_window_overlap)]
+        self.ner_windows += len(windows)
 
-        for text, entities in zip(regex_cleaned, ner_results):
-            # Replace PERSON entities safely from right-to-left to maintain index accuracy
-            for ent in sorted(entities, key=lambda x: x['start'], reverse=True):
-                if ent["entity_group"] == "PER":
-                    text = text[:ent["start"]] + "[PERSON]" + text[ent["end"]:]
-            redacted_texts.append(text)
+        # Step 2: Windows of all texts share token-budget batches
+        window_texts = [texts[doc][start:end] for doc, start, end, _ in windows]
+        lengths = np.array([n for *_, n in windows], dtype=np.int64)
+        results = self.ner_scheduler.map(lambda batch: ner(batch, batch_size=len(batch)),
+                                         window_texts, lengths, max_batch_size=batch_size)
 
-        return redacted_texts
+        # Step 3: Shift spans back to document offsets; overlap duplicates merge away
+        spans = [[] for _ in texts]
+        for (doc, start, _, _), entities in zip(windows, results):
+            spans[doc].extend((start + e["start"], start + e["end"]) for e in entities if e["entity_group"] == "PER")
+        return [merge_spans(doc_spans) for doc_spans in spans]
 
     def clean_batch(self, texts: List[str]) -> List[str]:
         """Normalization: Lowercase, stripping, and whitespace collapse."""
-        cleaned = []
-        for t in texts:
-            t = t.lower().strip()
-            t = re.sub(r"\s+", " ", t)
-            cleaned.append(t)
-        return cleaned
\ No newline at end of file
+        return [self.whitespace_pattern.sub(" ", t.lower().strip()) for t in texts]
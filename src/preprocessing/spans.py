@@ -0,0 +1,123 @@
+# src/preprocessing/spans.py
+import re
+from bisect import bisect_right
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# (start, end, label) over the original text; rendered as "[label]"
+Span = Tuple[int, int, str]
+
+# Overlapping spans merge into one, named after the longest of them, with ties
+# going to the earlier label here. This reproduces the old sequential re.sub
+# passes: an account id inside an e-mail address stays part of the [EMAIL], and
+# a PERSON entity spanning a placeholder swallows it.
+LABEL_PRIORITY = ("EMAIL", "ACCOUNT_ID", "ADDRESS", "PERSON")
+
+_WHITESPACE = re.compile(r"\s+")
+# Every code point str.isspace() / \s accepts (none lie above U+3000)
+_SPACE_CODES = np.array([c for c in range(0x3001) if chr(c).isspace()], dtype=np.uint32)
+
+
+def resolve_spans(spans: Sequence[Span]) -> List[Span]:
+    """Sorted, non-overlapping spans: overlapping ones are unioned under the dominant label."""
+    rank = {label: i for i, label in enumerate(LABEL_PRIORITY)}
+    resolved, dominant = [], None
+    for start, end, label in sorted(spans):
+        weight = (end - start, -rank.get(label, len(rank)))
+        if resolved and start < resolved[-1][1]:
+            prev_start, prev_end, prev_label = resolved[-1]
+            if weight > dominant:
+                prev_label, dominant = label, weight
+            resolved[-1] = (prev_start, max(prev_end, end), prev_label)
+        else:
+            resolved.append((start, end, label))
+            dominant = weight
+    return resolved
+
+
+def render(text: str, spans: Sequence[Span], normalize: bool = False,
+           with_offsets: bool = False) -> Tuple[str, Optional[np.ndarray]]:
+    """
+    The text with every resolved span replaced by "[LABEL]", joined once.
+
+    normalize folds TextSanitizer.clean_batch into the same pass (lowercase,
+    whitespace runs to one space, strip); placeholders hold no whitespace, so
+    the result equals clean_batch applied to the redacted text.
+
+    with_offsets also returns offset_map, an int array of len(text) + 1 where
+    offset_map[i] is the output position of original character i (characters
+    of a replaced span map to their placeholder, dropped whitespace to the
+    next output character) and offset_map[len(text)] == len(output).
+    """
+    n = len(text)
+    pieces, cursor = [], 0
+    for start, end, label in list(spans) + [(n, n, None)]:
+        if start > cursor:
+            kept = text[cursor:start]
+            if normalize:
+                kept = kept.lower()
+                if cursor == 0:
+                    kept = kept.lstrip()
+                if start == n:
+                    kept = kept.rstrip()
+                kept = _WHITESPACE.sub(" ", kept)
+            pieces.append(kept)
+        if label is not None:
+            pieces.append(f"[{label.lower()}]" if normalize else f"[{label}]")
+        cursor = end
+    output = "".join(pieces)
+    return output, offset_map(text, spans, normalize, len(output)) if with_offsets else None
+
+
+def offset_map(text: str, spans: Sequence[Span], normalize: bool = False,
+               output_length: Optional[int] = None) -> np.ndarray:
+    """render()'s original -> output position map, computed with array ops over the code points."""
+    n = len(text)
+    codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    # Characters each original position contributes to the output
+    emitted = np.ones(n, dtype=np.int64)
+    in_span = np.zeros(n, dtype=bool)
+    for start, end, label in spans:
+        in_span[start:end] = True
+        emitted[start:end] = 0
+        if end > start:
+            emitted[start] = len(label) + 2
+    if normalize and n:
+        space = np.isin(codes, _SPACE_CODES) & ~in_span
+        # A space survives only as the first of its run, and never at either end of the text
+        after_space = np.concatenate(([True], space[:-1]))
+        emitted[space & after_space] = 0
+        solid = np.flatnonzero(~space)
+        emitted[(solid[-1] + 1) if len(solid) else 0:] = 0
+    offsets = np.concatenate(([0], np.cumsum(emitted)))
+    for start, end, _ in spans:
+        offsets[start:end] = offsets[start]
+    if output_length is not None:
+        # Length-changing lowercase (e.g. U+0130) is rare; keep positions inside the output
+        np.minimum(offsets, output_length, out=offsets)
+        offsets[n] = output_length
+    return offsets
+
+
+def view_to_source(spans: Sequence[Tuple[int, int]], replaced: Sequence[Span]) -> List[Tuple[int, int]]:
+    """
+    Maps (start, end) spans found in render(text, replaced) back to text
+    offsets; a span touching a placeholder widens to the whole replaced span.
+    """
+    view_starts, view_ends, shift, shifts = [], [], 0, [0]
+    for start, end, label in replaced:
+        view_starts.append(start + shift)
+        shift += len(label) + 2 - (end - start)
+        view_ends.append(view_starts[-1] + len(label) + 2)
+        shifts.append(shift)
+
+    def source(pos: int, is_end: bool) -> int:
+        # An end is exclusive: place it by the character before it
+        char = pos - 1 if is_end else pos
+        i = bisect_right(view_starts, char) - 1
+        if i >= 0 and char < view_ends[i]:
+            return replaced[i][1] if is_end else replaced[i][0]
+        return pos - shifts[i + 1]
+
+    return [(source(start, False), source(end, True)) for start, end in spans]
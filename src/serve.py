@@ -0,0 +1,260 @@
+# src/serve.py
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.models.executor import ExecutorSaturated, InferenceExecutor
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_BATCH_CALLS = 1000
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class InferenceServer:
+    """
+    Minimal asyncio HTTP/1.1 front end for one warm CallAnalyticsEngine.
+
+    Every request is handed to an InferenceExecutor, whose worker coalesces
+    whatever arrives within max_wait_ms (up to max_batch_size) into one
+    analyze_calls pass, so concurrent clients share the loaded models and
+    their forward passes. The event loop only parses HTTP and awaits futures.
+
+      POST /analyze        {"transcript": str, "talk_ratio": float, "duration": int}
+      POST /analyze_batch  {"calls": [<analyze body> | str, ...]}
+      GET  /health         models loaded, queue depth
+      GET  /metrics        request latencies + executor and engine stats
+
+    A full queue answers 503 with Retry-After; a request past its timeout 504.
+    A batch is queued whole, so it may hold at most max_queue calls (413 above).
+    """
+
+    def __init__(self, executor: InferenceExecutor, engine=None, timeout_s: Optional[float] = None,
+                 window: int = 1000):
+        """engine: the executor's primary engine (for /health and /metrics); timeout_s: per-call deadline."""
+        self.executor = executor
+        self.engine = engine if engine is not None else executor.engines[0]
+        self.timeout_s = timeout_s if timeout_s is not None else executor.timeout_s
+        self.started = time.time()
+        self.in_flight = 0
+        self.requests: Dict[str, int] = {}
+        self.errors: Dict[int, int] = {}
+        self._latency_ms: Dict[str, deque] = {}
+        self.window = window
+        # More calls than the queue holds could never be accepted, however idle the server
+        self.max_batch_calls = min(MAX_BATCH_CALLS, executor.max_queue) if executor.max_queue > 0 else MAX_BATCH_CALLS
+
+    # ── Endpoints ───────────────────────────────────────────────
+    async def analyze(self, body: Dict) -> Dict:
+        return (await self._score([self._call(body)]))[0]
+
+    async def analyze_batch(self, body: Dict) -> Dict:
+        calls = body.get("calls") if isinstance(body, dict) else None
+        if not isinstance(calls, list) or not calls:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'calls' must be a non-empty list")
+        if len(calls) > self.max_batch_calls:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            f"at most {self.max_batch_calls} calls per request (--max-queue)")
+        return {"results": await self._score([self._call(c) for c in calls])}
+
+    def health(self) -> Dict:
+        return {"status": "ok", "models": self.engine.loaded_components(),
+                "queue_depth": self.executor.queue_depth(), "max_batch_calls": self.max_batch_calls,
+                "uptime_s": round(time.time() - self.started, 1)}
+
+    def metrics(self) -> Dict:
+        endpoints = {}
+        for path, latencies in self._latency_ms.items():
+            window = np.fromiter(latencies, dtype=float)
+            p50, p95, p99 = np.percentile(window, [50, 95, 99]) if len(window) else (0.0, 0.0, 0.0)
+            endpoints[path] = {"requests": self.requests.get(path, 0), "p50_ms": round(float(p50), 3),
+                               "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3)}
+        return {"in_flight": self.in_flight, "endpoints": endpoints,
+                "errors": {str(status): n for status, n in self.errors.items()},
+                "executor": self.executor.stats(), "engine": self.engine.stats()}
+
+    @staticmethod
+    def _call(body) -> Dict:
+        if isinstance(body, str):
+            body = {"transcript": body}
+        if not isinstance(body, dict) or not isinstance(body.get("transcript"), str):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "each call needs a 'transcript' string")
+        try:
+            return {"transcript": body["transcript"], "talk_ratio": float(body.get("talk_ratio", 0.5)),
+                    "duration": int(body.get("duration", 300))}
+        except (TypeError, ValueError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'talk_ratio' and 'duration' must be numbers") from None
+
+    async def _score(self, calls: List[Dict]) -> List[Dict]:
+        """Submits every call up front so a batch request lands in as few micro-batches as possible."""
+        futures = []
+        try:
+            for call in calls:
+                futures.append(self.executor.submit(call["transcript"], call["talk_ratio"], call["duration"],
+                                                    timeout=self.timeout_s))
+        except ExecutorSaturated as exc:
+            for future in futures:
+                future.cancel()
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, str(exc), {"Retry-After": "1"}) from None
+
+        waiting = [asyncio.wrap_future(f) for f in futures]
+        try:
+            return list(await asyncio.wait_for(asyncio.gather(*waiting), timeout=self.timeout_s))
+        except (asyncio.TimeoutError, TimeoutError):
+            for future in futures:
+                future.cancel()
+            raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, f"not scored within {self.timeout_s}s") from None
+
+    # ── HTTP plumbing ───────────────────────────────────────────
+    async def route(self, method: str, path: str, body: bytes) -> Dict:
+        routes = {("POST", "/analyze"): self.analyze, ("POST", "/analyze_batch"): self.analyze_batch}
+        if (method, path) in routes:
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "body must be JSON") from None
+            return await routes[(method, path)](payload)
+        if method == "GET" and path == "/health":
+            return self.health()
+        if method == "GET" and path == "/metrics":
+            return self.metrics()
+        if path in ("/analyze", "/analyze_batch", "/health", "/metrics"):
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {path}")
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"no route {path}")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """One connection; HTTP/1.1 keep-alive until the client closes or sends Connection: close."""
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload, extra = await self._dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._write(writer, status, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except HTTPError as exc:  # malformed request line / headers / body size
+            await self._write(writer, exc.status, {"error": str(exc)}, exc.headers, keep_alive=False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[HTTPStatus, Dict, Dict]:
+        start = time.perf_counter()
+        self.in_flight += 1
+        try:
+            status, payload, extra = HTTPStatus.OK, await self.route(method, path, body), {}
+        except HTTPError as exc:
+            status, payload, extra = exc.status, {"error": str(exc)}, exc.headers
+        except Exception as exc:  # model failure: report it, keep serving
+            status, payload, extra = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": repr(exc)}, {}
+        finally:
+            self.in_flight -= 1
+        self.requests[path] = self.requests.get(path, 0) + 1
+        if status != HTTPStatus.OK:
+            self.errors[status.value] = self.errors.get(status.value, 0) + 1
+        self._latency_ms.setdefault(path, deque(maxlen=self.window)).append((time.perf_counter() - start) * 1000)
+        return status, payload, extra
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "malformed request line") from None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0) or 0)
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body over {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, status: HTTPStatus, payload: Dict,
+                     extra: Dict[str, str], keep_alive: bool):
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(body)),
+                   "Connection": "keep-alive" if keep_alive else "close", **extra}
+        head = f"HTTP/1.1 {status.value} {status.phrase}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"CallSense inference service listening on http://{host}:{port} "
+              f"(max batch {self.executor.max_batch_size}, max wait {self.executor.max_wait * 1000:.0f} ms)")
+        async with server:
+            await server.serve_forever()
+
+
+def build_server(args) -> InferenceServer:
+    from src.models.inference import CallAnalyticsEngine
+    from src.models.result_cache import ResultCache
+
+    result_cache = ResultCache(disk_path=args.result_cache) if args.result_cache else None
+
+    def make_engine():
+        engine = CallAnalyticsEngine(device=-1, runtime=args.runtime, classifier_backend=args.classifier_backend,
+                                     redaction_tier=args.redaction_tier, instrument=True, result_cache=result_cache)
+        # Keep the models warm: load them before the first request, not during it
+        engine.warm_up(stages=("sanitizer", "classifier"), background=False)
+        return engine
+
+    print("Loading models...")
+    executor = InferenceExecutor(make_engine(), workers=args.workers, engine_factory=make_engine,
+                                 max_queue=args.max_queue, max_batch_size=args.max_batch_size,
+                                 max_wait_ms=args.max_wait_ms, timeout_s=args.timeout)
+    return InferenceServer(executor)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP inference service with dynamic micro-batching")
+    parser.add_argument("--host", default=os.getenv("SERVE_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVE_PORT", "8080")))
+    parser.add_argument("--workers", type=int, default=1, help="model workers (each loads its own models)")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0, help="batch collection window")
+    parser.add_argument("--max-queue", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-call deadline in seconds")
+    parser.add_argument("--runtime", default=os.getenv("INFERENCE_RUNTIME", "torch"), choices=["torch", "onnx"])
+    parser.add_argument("--classifier-backend", default="pipeline", choices=["pipeline", "cached", "centroid"])
+    parser.add_argument("--redaction-tier", default="ner", choices=["regex", "gazetteer", "ner"])
+    parser.add_argument("--result-cache", default=os.getenv("RESULT_CACHE_PATH"),
+                        help="SQLite path for the persistent result cache (off by default)")
+    args = parser.parse_args()
+
+    server = build_server(args)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    main()
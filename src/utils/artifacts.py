@@ -0,0 +1,111 @@
+# src/utils/artifacts.py
+import argparse
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+PROCESSED_DIR = os.path.join("data", "processed")
+
+# Free-text columns are never dictionary-encoded
+TEXT_COLUMNS = ("clean_text", "sanitized_text")
+
+
+def artifact_paths(name: str, processed_dir: str = PROCESSED_DIR) -> Dict[str, str]:
+    return {
+        "parquet": os.path.join(processed_dir, f"{name}.parquet"),
+        "csv": os.path.join(processed_dir, f"{name}.csv"),
+    }
+
+
+def optimize_dtypes(df: pd.DataFrame, category_threshold: float = 0.5) -> pd.DataFrame:
+    """
+    Typed copy for columnar storage: low-cardinality strings become categories
+    and integers are downcast. Floats are left untouched so KPIs don't drift.
+    """
+    out = df.copy()
+    for col in out.columns:
+        series = out[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            out[col] = pd.to_numeric(series, downcast="integer")
+        elif series.dtype == object and col not in TEXT_COLUMNS and len(series):
+            if series.nunique(dropna=True) / len(series) <= category_threshold:
+                out[col] = series.astype("category")
+    return out
+
+
+def write_artifact(df: pd.DataFrame, name: str, processed_dir: str = PROCESSED_DIR,
+                   csv: bool = True) -> Dict[str, str]:
+    """
+    Writes a typed, zstd-compressed Parquet file and (for backward
+    compatibility with the notebooks and older dashboards) the CSV export.
+    """
+    os.makedirs(processed_dir, exist_ok=True)
+    paths = artifact_paths(name, processed_dir)
+    optimize_dtypes(df).to_parquet(paths["parquet"], engine="pyarrow", compression="zstd", index=False)
+    if csv:
+        df.to_csv(paths["csv"], index=False)
+    else:
+        paths.pop("csv")
+    return paths
+
+
+def upsert_artifact(df: pd.DataFrame, name: str, key: str, processed_dir: str = PROCESSED_DIR,
+                    csv: bool = True) -> Dict[str, str]:
+    """
+    Replaces the rows whose key appears in df and appends the rest. Creates the
+    artifact if it does not exist yet; an existing artifact must carry the key column.
+    """
+    df = df.drop_duplicates(subset=key, keep="last")
+    paths = artifact_paths(name, processed_dir)
+    if os.path.exists(paths["parquet"]) or os.path.exists(paths["csv"]):
+        existing = read_artifact(name, processed_dir=processed_dir)
+        if key not in existing.columns:
+            raise ValueError(f"Artifact '{name}' has no '{key}' column; rebuild it before upserting")
+        df = pd.concat([existing[~existing[key].isin(df[key])], df], ignore_index=True)
+    return write_artifact(df, name, processed_dir, csv=csv)
+
+
+def artifact_columns(name: str, processed_dir: str = PROCESSED_DIR) -> List[str]:
+    """Column names of an artifact without loading any rows."""
+    paths = artifact_paths(name, processed_dir)
+    if os.path.exists(paths["parquet"]):
+        import pyarrow.parquet as pq
+        return pq.read_schema(paths["parquet"]).names
+    return pd.read_csv(paths["csv"], nrows=0).columns.tolist()
+
+
+def read_artifact(name: str, columns: Optional[List[str]] = None,
+                  processed_dir: str = PROCESSED_DIR) -> pd.DataFrame:
+    """
+    Loads an artifact, preferring Parquet and falling back to CSV.
+    columns: projection; names missing from the artifact are ignored, so callers
+    can ask for optional columns (e.g. 'resolved') without checking first.
+    """
+    paths = artifact_paths(name, processed_dir)
+    if columns is not None:
+        available = set(artifact_columns(name, processed_dir))
+        columns = [c for c in columns if c in available]
+    if os.path.exists(paths["parquet"]):
+        return pd.read_parquet(paths["parquet"], columns=columns, engine="pyarrow")
+    if os.path.exists(paths["csv"]):
+        return pd.read_csv(paths["csv"], usecols=columns)
+    raise FileNotFoundError(f"No artifact '{name}' in {processed_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert CSV artifacts in data/processed to Parquet")
+    parser.add_argument("names", nargs="*", default=["analytics_base", "clustered_data"])
+    parser.add_argument("--processed-dir", default=PROCESSED_DIR)
+    args = parser.parse_args()
+
+    for name in args.names:
+        df = pd.read_csv(artifact_paths(name, args.processed_dir)["csv"])
+        paths = write_artifact(df, name, args.processed_dir, csv=False)
+        print(f"{name}: {len(df)} rows -> {paths['parquet']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# src/utils/batching.py
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Padded tokens (rows x longest row) allowed per forward pass
+DEFAULT_MAX_TOKENS = 8192
+
+# Word pieces + punctuation: a tokenizer-free proxy for subword counts
+_TOKEN_PROXY = re.compile(r"\w+|[^\w\s]")
+
+
+def token_lengths(texts: Sequence[str], tokenizer=None, max_length: Optional[int] = None) -> np.ndarray:
+    """
+    Token count per text with the model's (fast) tokenizer, or the regex proxy
+    when there is none; clipped to max_length, where the model truncates.
+    """
+    if not len(texts):
+        return np.zeros(0, dtype=np.int64)
+    if tokenizer is not None:
+        lengths = np.fromiter((len(ids) for ids in tokenizer(list(texts), truncation=False)["input_ids"]),
+                              dtype=np.int64, count=len(texts))
+    else:
+        lengths = np.fromiter((len(_TOKEN_PROXY.findall(t)) + 2 for t in texts), dtype=np.int64, count=len(texts))
+    return np.minimum(lengths, max_length) if max_length else lengths
+
+
+def fixed_batches(n: int, batch_size: int) -> List[np.ndarray]:
+    """Input-order batches of batch_size rows (what the pipelines do on their own)."""
+    return [np.arange(start, min(start + batch_size, n)) for start in range(0, n, batch_size)]
+
+
+def token_budget_batches(lengths: np.ndarray, max_tokens: int = DEFAULT_MAX_TOKENS,
+                         max_batch_size: Optional[int] = None) -> List[np.ndarray]:
+    """
+    Indices sorted longest-first and cut greedily so that rows x longest row
+    stays within max_tokens (a single over-long text still gets its own batch).
+    Neighbouring rows have similar lengths, so little of each batch is padding.
+    """
+    lengths = np.asarray(lengths)
+    order = np.argsort(-lengths, kind="stable")
+    batches, start = [], 0
+    while start < len(order):
+        # Sorted descending: the first row of a batch is its longest
+        rows = max(1, int(max_tokens // max(int(lengths[order[start]]), 1)))
+        if max_batch_size:
+            rows = min(rows, max_batch_size)
+        batches.append(order[start:start + rows])
+        start += rows
+    return batches
+
+
+def padding_stats(lengths: np.ndarray, batches: List[np.ndarray]) -> Dict:
+    """Real vs padded tokens when each batch is padded to its longest row."""
+    lengths = np.asarray(lengths)
+    real = int(lengths.sum())
+    padded = int(sum(len(b) * int(lengths[b].max()) for b in batches if len(b)))
+    return {"batches": len(batches), "real_tokens": real, "padded_tokens": padded,
+            "padding_tokens": padded - real, "padding_ratio": round(1 - real / padded, 4) if padded else 0.0}
+
+
+class LengthBucketScheduler:
+    """
+    Length-aware batching for a transformer stage (NER, embeddings, zero-shot).
+
+    map(fn, items, lengths) runs fn over token-budget batches of similar-length
+    items and returns fn's per-item outputs in the original order. With
+    max_tokens=None it falls back to input-order batches of max_batch_size, the
+    baseline the padding report compares against. Running totals of real and
+    padded tokens are kept for report().
+    """
+
+    def __init__(self, max_tokens: Optional[int] = DEFAULT_MAX_TOKENS, max_batch_size: Optional[int] = None):
+        """max_tokens: padded-token budget per batch (None = fixed-count batches); max_batch_size: row cap."""
+        self.max_tokens = max_tokens
+        self.max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self.items = 0
+        self.batches = 0
+        self.real_tokens = 0
+        self.padded_tokens = 0
+        self.baseline_padded_tokens = 0
+
+    def plan(self, lengths: np.ndarray, max_batch_size: Optional[int] = None) -> List[np.ndarray]:
+        max_batch_size = max_batch_size or self.max_batch_size
+        if self.max_tokens is None:
+            return fixed_batches(len(lengths), max_batch_size or len(lengths) or 1)
+        return token_budget_batches(lengths, self.max_tokens, max_batch_size)
+
+    def map(self, fn: Callable[[List], List], items: Sequence, lengths: np.ndarray,
+            max_batch_size: Optional[int] = None) -> List:
+        """fn(batch_items) -> one output per item; outputs come back in input order."""
+        batches = self.plan(lengths, max_batch_size)
+        outputs = [None] * len(items)
+        for batch in batches:
+            for i, output in zip(batch, fn([items[i] for i in batch])):
+                outputs[i] = output
+        self._record(lengths, batches, max_batch_size or self.max_batch_size)
+        return outputs
+
+    def _record(self, lengths: np.ndarray, batches: List[np.ndarray], baseline_batch_size: Optional[int]):
+        stats = padding_stats(lengths, batches)
+        baseline = padding_stats(lengths, fixed_batches(len(lengths), baseline_batch_size or len(lengths) or 1))
+        with self._lock:
+            self.items += len(lengths)
+            self.batches += stats["batches"]
+            self.real_tokens += stats["real_tokens"]
+            self.padded_tokens += stats["padded_tokens"]
+            self.baseline_padded_tokens += baseline["padded_tokens"]
+
+    def report(self) -> Dict:
+        """Padding so far, and versus input-order batches of the same row cap."""
+        with self._lock:
+            padding = self.padded_tokens - self.real_tokens
+            baseline_padding = self.baseline_padded_tokens - self.real_tokens
+            return {
+                "items": self.items,
+                "batches": self.batches,
+                "real_tokens": self.real_tokens,
+                "padding_tokens": padding,
+                "padding_ratio": round(padding / self.padded_tokens, 4) if self.padded_tokens else 0.0,
+                "baseline_padding_tokens": baseline_padding,
+                "padding_reduction": round(1 - padding / baseline_padding, 4) if baseline_padding else 0.0,
+            }
@@ -0,0 +1,40 @@
+# src/utils/dashboard.py
+import os
+from typing import Tuple
+
+import pandas as pd
+
+from src.pipeline.scorecard import SCORECARD_FILE
+from src.utils.artifacts import PROCESSED_DIR, read_artifact
+
+# Columns the dashboard pages need; transcript text is loaded separately on demand
+DASHBOARD_COLUMNS = [
+    'cluster_id', 'x_coord', 'y_coord', 'csat_score', 'talk_ratio', 'duration_sec',
+    'turns_count', 'resolved', 'escalated', 'churned', 'issue_category', 'customer_persona',
+]
+
+
+def load_dashboard_data(processed_dir: str = PROCESSED_DIR) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (calls, scorecard) as the dashboard pages expect them. app.py caches this
+    with st.cache_data; it is a plain function so it can be benchmarked.
+    """
+    df = read_artifact('clustered_data', columns=DASHBOARD_COLUMNS, processed_dir=processed_dir)
+    sc = pd.read_csv(os.path.join(processed_dir, SCORECARD_FILE))
+    if 'cluster_id' not in sc.columns:
+        sc = sc.reset_index().rename(columns={'index': 'cluster_id'})
+    sc['cluster_id'] = sc['cluster_id'].astype(int)
+    df['cluster_id'] = df['cluster_id'].astype(int)
+    mapping = dict(zip(sc['cluster_id'], sc['archetype_name']))
+    df['archetype_name'] = df['cluster_id'].map(mapping).fillna("Unclassified / Noise")
+    if 'avg_duration' not in sc.columns and 'duration_sec' in sc.columns:
+        sc['avg_duration'] = sc['duration_sec']
+    if 'escalation_rate' not in sc.columns and 'escalated' in sc.columns:
+        sc['escalation_rate'] = sc['escalated']
+    # Scorecards from FrictionScorecard carry resolution_rate; older CSVs need a regroup
+    if 'resolution_rate' not in sc.columns and 'resolved' in df.columns:
+        resolution_map = df.groupby('archetype_name')['resolved'].mean().to_dict()
+        sc['resolution_rate'] = sc['archetype_name'].map(resolution_map)
+    if 'call_cost' not in sc.columns and 'avg_duration' in sc.columns:
+        sc['call_cost'] = (sc['avg_duration'] / 60 * 6.5).round(2)
+    return df, sc
@@ -0,0 +1,29 @@
+# src/utils/helpers.py
+import sys
+
+
+def get_rss_mb(field: str = "VmRSS") -> float:
+    """
+    Resident set size of this process in MB (0.0 if unavailable): current with
+    field="VmRSS", peak with field="VmHWM" (/proc/self/status fields).
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    # No procfs (macOS): fall back to peak RSS, reported in bytes on macOS and KB elsewhere
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def model_size_mb(module) -> float:
+    """Parameter + buffer footprint of a torch module in MB."""
+    tensors = list(module.parameters()) + list(module.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors) / (1024 * 1024)
@@ -0,0 +1,127 @@
+# src/utils/instrumentation.py
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.utils.helpers import get_rss_mb
+
+# Shared no-op context: a disabled stage() costs one attribute check
+_DISABLED = nullcontext()
+
+LOGGER_NAME = "callsense.inference"
+_log_files_lock = threading.Lock()
+
+
+def _file_logger(log_path: str) -> logging.Logger:
+    """
+    Child of LOGGER_NAME that writes to log_path. Its FileHandler is attached
+    once, however many engines share the path. Records still propagate to
+    LOGGER_NAME's handlers.
+    """
+    path = os.path.abspath(log_path)
+    logger = logging.getLogger(f"{LOGGER_NAME}.file.{re.sub(r'[^A-Za-z0-9]+', '_', path)}")
+    with _log_files_lock:
+        if not logger.handlers:
+            handler = logging.FileHandler(path)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+    return logger
+
+
+class StageTimer:
+    """Rolling window of one stage's latencies plus running item / token totals."""
+
+    def __init__(self, window: int):
+        self.durations_ms = deque(maxlen=window)
+        self.calls = 0
+        self.items = 0
+        self.tokens = 0
+        self.total_ms = 0.0
+
+    def record(self, ms: float, items: int, tokens: int):
+        self.durations_ms.append(ms)
+        self.calls += 1
+        self.items += items
+        self.tokens += tokens
+        self.total_ms += ms
+
+    def summary(self) -> Dict:
+        window = np.fromiter(self.durations_ms, dtype=float)
+        p50, p95, p99 = np.percentile(window, [50, 95, 99]) if len(window) else (0.0, 0.0, 0.0)
+        return {
+            "calls": self.calls,
+            "items": self.items,
+            "tokens": self.tokens,
+            "mean_batch": round(self.items / self.calls, 1) if self.calls else 0.0,
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "total_ms": round(self.total_ms, 1),
+        }
+
+
+class Instrumentation:
+    """
+    Per-stage timers for the inference pipeline.
+
+    Wrap a stage in `with instr.stage("ner", items=len(batch), tokens=n):`.
+    Durations feed rolling p50/p95/p99 windows; each record() call also emits a
+    JSON line on the "callsense.inference" logger; with log_path, through a
+    child logger that writes only this instance's file.
+    When disabled, stage() returns a shared no-op context manager.
+    """
+
+    def __init__(self, enabled: bool = False, window: int = 1000, log_path: Optional[str] = None):
+        """window: latencies kept per stage for the percentiles."""
+        self.enabled = enabled
+        self.window = window
+        self._stages: Dict[str, StageTimer] = {}
+        self._lock = threading.Lock()
+        self.logger = _file_logger(log_path) if log_path else logging.getLogger(LOGGER_NAME)
+
+    def stage(self, name: str, items: int = 0, tokens: int = 0):
+        if not self.enabled:
+            return _DISABLED
+        return self._timed(name, items, tokens)
+
+    @contextmanager
+    def _timed(self, name: str, items: int, tokens: int):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000, items, tokens)
+
+    def record(self, name: str, ms: float, items: int = 0, tokens: int = 0):
+        with self._lock:
+            timer = self._stages.get(name)
+            if timer is None:
+                timer = self._stages[name] = StageTimer(self.window)
+            timer.record(ms, items, tokens)
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(json.dumps({"ts": round(time.time(), 3), "stage": name, "ms": round(ms, 3),
+                                         "items": items, "tokens": tokens, "rss_mb": round(get_rss_mb(), 1)}))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stages = {name: timer.summary() for name, timer in self._stages.items()}
+        return {
+            "enabled": self.enabled,
+            "stages": stages,
+            "rss_mb": round(get_rss_mb(), 1),
+            "peak_rss_mb": round(get_rss_mb("VmHWM"), 1),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
@@ -0,0 +1,45 @@
+import zlib
+
+from src.models.inference import CallAnalyticsEngine
+from src.preprocessing.cleaner import TextSanitizer
+
+
+class TextHashClassifier:
+    """Stand-in for the zero-shot model: scores depend only on each text, whatever batch it lands in."""
+
+    def __call__(self, texts, labels, batch_size=None):
+        results = []
+        for text in texts:
+            raw = [(zlib.crc32(f"{label}|{text}".encode()) % 97) + 1 for label in labels]
+            ranked = sorted(zip(labels, raw), key=lambda pair: -pair[1])
+            results.append({"labels": [l for l, _ in ranked], "scores": [r / sum(raw) for _, r in ranked]})
+        return results
+
+
+CALLS = [
+    "Hi, this is Sarah. I was charged twice, ACC-12345, email me at sarah@mail.com",
+    "",
+    "   ",
+    {"transcript": "I want to cancel my subscription now", "talk_ratio": 1.6, "duration": 900},
+    "Hi, this is Sarah. I was charged twice, ACC-12345, email me at sarah@mail.com",
+    {"transcript": "My router keeps dropping the connection " * 40, "talk_ratio": 0.2},
+    "",
+    "I want to cancel my subscription now",
+]
+
+
+def _engine():
+    engine = CallAnalyticsEngine(redaction_tier="regex")
+    engine._components.update(sanitizer=TextSanitizer(tier="regex"), classifier=TextHashClassifier())
+    return engine
+
+
+def test_analyze_calls_matches_analyze_call_per_transcript():
+    engine = _engine()
+    expected = [engine.analyze_call(c) if isinstance(c, str) else engine.analyze_call(
+        c["transcript"], c.get("talk_ratio", 0.5), c.get("duration", 300)) for c in CALLS]
+
+    for batch_size in (1, 3, 32):
+        assert list(_engine().analyze_calls(CALLS, batch_size=batch_size)) == expected
+    assert list(engine.analyze_calls([])) == []
+    assert expected[0] == expected[4] and expected[1] == expected[6]
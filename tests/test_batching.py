@@ -0,0 +1,37 @@
+import numpy as np
+
+from src.utils.batching import LengthBucketScheduler, padding_stats, token_budget_batches, token_lengths
+
+
+def test_token_budget_batches_cover_every_item_within_budget():
+    lengths = np.array([5, 40, 12, 40, 7, 90, 3, 12, 600])
+    batches = token_budget_batches(lengths, max_tokens=100, max_batch_size=4)
+
+    assert sorted(np.concatenate(batches).tolist()) == list(range(len(lengths)))
+    assert [lengths[b].tolist() for b in batches][0] == [600]  # over budget alone: own batch
+    for batch in batches[1:]:
+        assert len(batch) <= 4 and len(batch) * lengths[batch].max() <= 100
+
+
+def test_scheduler_restores_input_order_and_reports_padding_saved():
+    texts = ["short", "a much longer text with many more words in it than the rest", "mid length text here",
+             "tiny", "another fairly long one, with punctuation and words", "x"]
+    lengths = token_lengths(texts)
+    seen = []
+
+    def upper(batch):
+        seen.append(batch)
+        return [t.upper() for t in batch]
+
+    bucketed = LengthBucketScheduler(max_tokens=40, max_batch_size=2)
+    assert bucketed.map(upper, texts, lengths) == [t.upper() for t in texts]
+    assert seen[0] == [texts[1], texts[4]]  # longest first, bucketed together
+
+    fixed = LengthBucketScheduler(max_tokens=None, max_batch_size=2)
+    fixed.map(upper, texts, lengths)
+    report, baseline = bucketed.report(), fixed.report()
+    assert report["real_tokens"] == baseline["real_tokens"] == int(lengths.sum())
+    assert report["padding_tokens"] < baseline["padding_tokens"]
+    assert report["baseline_padding_tokens"] == baseline["padding_tokens"]
+    assert baseline["padding_reduction"] == 0.0
+    assert padding_stats(lengths, [np.arange(len(texts))])["padded_tokens"] == len(texts) * lengths.max()
@@ -0,0 +1,62 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+from src.models.centroid import ARCHETYPE_LABELS, CentroidIntentClassifier
+from src.models.inference import CANDIDATE_LABELS, CallAnalyticsEngine
+from src.preprocessing.cleaner import TextSanitizer
+
+
+class BagOfWordsEngine:
+    """Deterministic stand-in for MPNet: hashed bag of words, records encode batch sizes."""
+
+    def __init__(self, dim=64):
+        self.dim = dim
+        self.batch_sizes = []
+
+    def generate_embeddings(self, texts, batch_size=32, verbose=True):
+        self.batch_sizes.append(batch_size)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                out[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1.0
+        return out
+
+
+def _archetype_classifier(vector_engine):
+    names = list(ARCHETYPE_LABELS) + ["Unclassified / Noise", None]
+    texts = ["router error reboot", "invoice charged twice", "cancel my subscription",
+             "password hacked locked", "hold music", "static"]
+    return CentroidIntentClassifier.from_archetypes(vector_engine, vector_engine.generate_embeddings(texts),
+                                                    names, CANDIDATE_LABELS)
+
+
+def test_engine_classifies_against_archetype_centroids(tmp_path):
+    vector_engine = BagOfWordsEngine()
+    path = str(tmp_path / "intent_centroids.npz")
+    _archetype_classifier(vector_engine).save(path)
+
+    engine = CallAnalyticsEngine(classifier_backend="centroid", centroid_path=path, redaction_tier="regex")
+    engine._components.update(sanitizer=TextSanitizer(tier="regex"), vector_engine=vector_engine)
+    results = list(engine.analyze_calls(["my router shows an error after reboot", "the invoice charged me twice"],
+                                        batch_size=4))
+
+    assert [r["intent"] for r in results] == ["Technical Support & Error Troubleshooting",
+                                              "Billing, Payment, and Invoice Disputes"]
+    assert vector_engine.batch_sizes[-1] == 4  # one embedding per call, not one per label
+
+
+def test_centroids_missing_candidate_labels_are_rejected_at_load(tmp_path):
+    vector_engine = BagOfWordsEngine()
+    path = str(tmp_path / "intent_centroids.npz")
+    CentroidIntentClassifier(vector_engine, ["Technical Troubleshooting"], np.ones((1, 64))).save(path)
+
+    engine = CallAnalyticsEngine(classifier_backend="centroid", centroid_path=path, redaction_tier="regex")
+    engine._components.update(vector_engine=vector_engine)
+    with pytest.raises(ValueError, match="no centroid"):
+        engine.classifier
+
+    with pytest.raises(ValueError, match="not candidates"):
+        CentroidIntentClassifier.from_archetypes(vector_engine, np.ones((1, 64)), ["Billing & Payment Disputes"],
+                                                 ["Technical Support & Error Troubleshooting"])
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+
+from src.features.embedding_cache import EmbeddingCache
+
+
+def _vectors(n, start=0, dim=4):
+    return np.arange(start * dim, (start + n) * dim, dtype=np.float32).reshape(n, dim)
+
+
+def test_flush_appends_only_new_vectors_and_survives_a_torn_write(tmp_path):
+    cache = EmbeddingCache("test-model", str(tmp_path))
+    texts = [f"call {i}" for i in range(5)]
+    cache.add([cache.key(t) for t in texts[:3]], _vectors(3))
+    cache.flush()
+    size = os.path.getsize(cache.vectors_path)
+
+    # Known keys are not re-staged; only the two new rows reach the file
+    cache.add([cache.key(t) for t in texts], np.vstack([_vectors(3), _vectors(2, start=3)]))
+    cache.flush()
+    assert os.path.getsize(cache.vectors_path) == size + 2 * 4 * 4
+
+    # A flush interrupted after its vectors but before its keys leaves no visible row
+    with open(cache.vectors_path, "ab") as f:
+        f.write(_vectors(1, start=99).tobytes()[:10])
+
+    reopened = EmbeddingCache("test-model", str(tmp_path))
+    assert len(reopened) == 5
+    found = reopened.lookup([reopened.key(t.upper() + "  ") for t in texts])
+    np.testing.assert_array_equal(np.vstack(list(found.values())), _vectors(5))
+
+    reopened.add([reopened.key("call 5")], _vectors(1, start=5))
+    reopened.flush()
+    assert len(EmbeddingCache("test-model", str(tmp_path)).lookup([cache.key(t) for t in texts + ["call 5"]])) == 6
+
+
+def test_torn_first_flush_reopens_empty(tmp_path):
+    cache = EmbeddingCache("test-model", str(tmp_path))
+    # First flush interrupted before its keys: vectors on disk, no keys file and no meta
+    with open(cache.vectors_path, "wb") as f:
+        f.write(_vectors(2).tobytes())
+
+    reopened = EmbeddingCache("test-model", str(tmp_path))
+    assert len(reopened) == 0
+    reopened.add([reopened.key("call 0")], _vectors(1, start=7))
+    reopened.flush()
+    assert os.path.getsize(cache.vectors_path) == 4 * 4
+
+    # meta present but the keys file lost: the store loads with zero rows
+    os.remove(cache.keys_path)
+    assert len(EmbeddingCache("test-model", str(tmp_path))) == 0
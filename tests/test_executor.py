@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from src.models.executor import ExecutorSaturated, InferenceExecutor
+from src.utils.instrumentation import Instrumentation
+
+
+class RecordingEngine:
+    """Stand-in for CallAnalyticsEngine that records batch sizes and can be held at a gate."""
+
+    def __init__(self):
+        self.batches = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def analyze_calls(self, calls, batch_size=32):
+        self.gate.wait()
+        self.batches.append(len(calls))
+        return iter([{"clean_text": c["transcript"], "duration": c["duration"]} for c in calls])
+
+    def stats(self):
+        return self.instrumentation.stats()
+
+
+def test_concurrent_requests_share_a_micro_batch():
+    engine = RecordingEngine()
+    engine.gate.clear()
+    executor = InferenceExecutor(engine, max_batch_size=8, max_wait_ms=50)
+    try:
+        # The worker holds the first request at the gate while the rest queue up
+        first = executor.submit("call 0", duration=0)
+        time.sleep(0.1)
+        futures = [executor.submit(f"call {i}", duration=i) for i in range(1, 6)]
+        engine.gate.set()
+
+        assert first.result(timeout=5)["clean_text"] == "call 0"
+        assert [f.result(timeout=5)["duration"] for f in futures] == [1, 2, 3, 4, 5]
+        assert engine.batches == [1, 5]
+        assert executor.stats()["completed"] == 6
+    finally:
+        executor.shutdown()
+
+
+def test_full_queue_pushes_back_and_expired_requests_skip_the_models():
+    engine = RecordingEngine()
+    engine.gate.clear()
+    executor = InferenceExecutor(engine, max_queue=2, max_batch_size=1, max_wait_ms=0)
+    try:
+        executor.submit("running")
+        time.sleep(0.1)  # taken by the worker, waiting at the gate
+        expiring = executor.submit("expiring", timeout=0.01)
+        executor.submit("queued")
+        with pytest.raises(ExecutorSaturated):
+            executor.submit("rejected")
+
+        time.sleep(0.05)
+        engine.gate.set()
+        with pytest.raises(TimeoutError):
+            expiring.result(timeout=5)
+    finally:
+        executor.shutdown()
+
+    stats = executor.stats()
+    assert (stats["rejected"], stats["timed_out"], stats["completed"]) == (1, 1, 2)
+    assert engine.batches == [1, 1]
+
+
+def test_tasks_share_the_queue_and_only_instrumented_requests_are_timed():
+    engine = RecordingEngine()
+    engine.instrumentation = Instrumentation()
+    executor = InferenceExecutor(engine, max_queue=4, max_batch_size=4, max_wait_ms=0)
+    try:
+        def timed_search(e):
+            with e.instrumentation.stage("search"):
+                return ["neighbour"]
+
+        assert executor.run(timed_search) == ["neighbour"]
+        assert executor.run(timed_search, instrument=True) == ["neighbour"]
+        assert executor.analyze_call("call", instrument=True)["clean_text"] == "call"
+        with pytest.raises(ValueError):
+            executor.run(lambda e: int("not a number"))
+    finally:
+        executor.shutdown()
+
+    assert engine.instrumentation.stats()["stages"]["search"]["calls"] == 1
+    assert engine.instrumentation.enabled is False
+    assert len(executor.engine_stats()) == 1
+    stats = executor.stats()
+    assert (stats["completed"], stats["failed"]) == (3, 1)
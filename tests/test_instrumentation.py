@@ -0,0 +1,25 @@
+import json
+
+from src.utils.instrumentation import Instrumentation
+
+
+def _stages(path):
+    with open(path) as f:
+        return [json.loads(line)["stage"] for line in f]
+
+
+def test_each_stats_log_gets_only_its_own_engines_records(tmp_path):
+    first_log, second_log = str(tmp_path / "first.jsonl"), str(tmp_path / "second.jsonl")
+    first = Instrumentation(enabled=True, log_path=first_log)
+    same_file = Instrumentation(enabled=True, log_path=first_log)
+    second = Instrumentation(enabled=True, log_path=second_log)
+
+    first.record("ner", 1.0)
+    same_file.record("render", 1.0)
+    second.record("intent_classification", 1.0)
+    for handler in first.logger.handlers + second.logger.handlers:
+        handler.flush()
+
+    assert len(first.logger.handlers) == 1 and same_file.logger is first.logger
+    assert _stages(first_log) == ["ner", "render"]  # one line each, no duplicate handlers
+    assert _stages(second_log) == ["intent_classification"]
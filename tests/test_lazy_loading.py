@@ -0,0 +1,46 @@
+import pytest
+
+from src.models.inference import CallAnalyticsEngine
+from src.preprocessing.cleaner import TextSanitizer
+
+
+class UniformClassifier:
+    """Deterministic stand-in for the zero-shot model."""
+
+    def __call__(self, texts, labels, batch_size=None):
+        return [{"labels": list(labels), "scores": [1.0 / len(labels)] * len(labels)} for _ in texts]
+
+
+def _recording_engine(**kwargs):
+    """Engine whose stage loads are recorded and return stand-ins instead of downloading models."""
+    engine = CallAnalyticsEngine(redaction_tier="regex", **kwargs)
+    stand_ins = {"sanitizer": TextSanitizer(tier="regex"), "vector_engine": object(),
+                 "classifier": UniformClassifier(), "similarity_index": object()}
+    engine.loads = []
+    engine._load_component = lambda name: engine.loads.append(name) or stand_ins[name]
+    return engine
+
+
+def test_analyze_call_loads_only_the_stages_it_needs():
+    engine = _recording_engine()
+    assert not any(engine.loaded_components().values())
+
+    engine.analyze_call("I want to cancel my subscription", talk_ratio=0.5, duration=100)
+    engine.analyze_call("Billing question", talk_ratio=0.5, duration=100)
+
+    assert engine.loads == ["sanitizer", "classifier"]
+    assert engine.loaded_components() == {"sanitizer": True, "vector_engine": False,
+                                          "classifier": True, "similarity_index": False}
+
+
+def test_warm_up_loads_the_requested_stages_and_rejects_unknown_names():
+    engine = _recording_engine()
+    engine.warm_up(stages=("vector_engine",), background=True).join()
+    assert engine.loads == ["vector_engine"]
+
+    engine.warm_up(stages=("vector_engine", "classifier"), background=False)
+    assert engine.loads == ["vector_engine", "classifier"]
+
+    with pytest.raises(ValueError, match="embedder"):
+        engine.warm_up(stages=("sanitizer", "embedder"))
+    assert "sanitizer" not in engine.loads
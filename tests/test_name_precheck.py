@@ -0,0 +1,41 @@
+import re
+from types import SimpleNamespace
+
+from src.preprocessing.cleaner import TextSanitizer
+
+SENTENCE_INITIAL = [
+    "Hello. John here, calling about my bill.",
+    "Hi! Maria speaking.",
+    "Thanks. Priya again, the modem still drops.",
+    "Okay? Will you check ACC-123 for me.",
+]
+NO_NAMES = ["Thank you. How can I help?", "Okay. Let me check that for you today.", "", "refund please"]
+
+
+class CapitalizedNER:
+    """Stand-in for the NER pipeline: every capitalized word is a PER entity."""
+
+    tokenizer = None
+    model = SimpleNamespace(config=SimpleNamespace(max_position_embeddings=512))
+
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, texts, batch_size=None):
+        self.seen.extend(texts)
+        return [[{"entity_group": "PER", "start": m.start(), "end": m.end()}
+                 for m in re.finditer(r"\b[A-Z][a-z]+\b", t)] for t in texts]
+
+
+def test_sentence_initial_names_reach_ner_and_are_redacted():
+    sanitizer = TextSanitizer(tier="ner", windowed_ner=False)
+    sanitizer._ner_pipeline = CapitalizedNER()
+
+    assert all(sanitizer.has_name_candidates(t) for t in SENTENCE_INITIAL)
+    assert not any(sanitizer.has_name_candidates(t) for t in NO_NAMES)
+
+    redacted = sanitizer.batch_redact(SENTENCE_INITIAL + NO_NAMES)
+    assert len(sanitizer._ner_pipeline.seen) == len(SENTENCE_INITIAL)
+    assert sanitizer.ner_skipped == len(NO_NAMES)
+    for text, name in zip(redacted, ["John", "Maria", "Priya", "Will"]):
+        assert name not in text and "[PERSON]" in text
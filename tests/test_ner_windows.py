@@ -0,0 +1,31 @@
+import re
+
+from src.preprocessing.cleaner import merge_spans, token_windows
+
+
+def _word_offsets(text):
+    """Whitespace words split into 3-char pieces, standing in for word-piece offsets."""
+    return [(m.start() + i, min(m.start() + i + 3, m.end()))
+            for m in re.finditer(r"\S+", text) for i in range(0, len(m.group()), 3)]
+
+
+def test_token_windows_overlap_on_word_boundaries_and_cover_the_text():
+    text = " ".join(f"turn{i} agent Bartholomew Henderson said ok." for i in range(40))
+    offsets = _word_offsets(text)
+    windows = token_windows(text, offsets, window_tokens=20, overlap=6)
+
+    assert windows[0][0] == 0 and windows[-1][1] == len(text)
+    assert token_windows("short text", _word_offsets("short text"), 20, 6) == [(0, 10, 4)]
+    for (start, end, n), (next_start, next_end, _) in zip(windows, windows[1:]):
+        assert n <= 20
+        assert next_start < end  # consecutive windows overlap
+        assert start < next_start
+        assert text[next_start - 1] == " " and (end == len(text) or text[end] == " ")
+    # A name straddling one window's edge appears whole in some window
+    for match in re.finditer("Bartholomew Henderson", text):
+        assert any(s <= match.start() and match.end() <= e for s, e, _ in windows)
+
+
+def test_merge_spans_unions_overlapping_duplicates_from_window_overlap():
+    assert merge_spans([(30, 40), (0, 5), (32, 45), (45, 50), (10, 12)]) == [(0, 5), (10, 12), (30, 50)]
+    assert merge_spans([]) == []
@@ -0,0 +1,58 @@
+import pytest
+import torch
+
+pytest.importorskip("onnxruntime")
+from tokenizers import Tokenizer, models, pre_tokenizers, processors
+from transformers import (BartConfig, BartForSequenceClassification, BertConfig, BertForTokenClassification,
+                          PreTrainedTokenizerFast)
+
+from src.models.onnx_runtime import load_classifier
+
+WORDS = "[PAD] [CLS] [SEP] [UNK] this is a sample call transcript about billing refund cancel my account".split()
+TEXTS = ["this is a sample call", "refund my account billing", "cancel"]
+
+
+def _tokenizer(bos: str, eos: str, input_names):
+    """Word-level tokenizer over WORDS, so the test needs no downloaded vocabulary."""
+    tokenizer = Tokenizer(models.WordLevel({w: i for i, w in enumerate(WORDS)}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(single=f"{bos} $A {eos}",
+                                                             special_tokens=[(bos, 1), (eos, 2)])
+    return PreTrainedTokenizerFast(tokenizer_object=tokenizer, pad_token="[PAD]", unk_token="[UNK]",
+                                   bos_token=bos, eos_token=eos, model_input_names=input_names)
+
+
+def _tiny_bart():
+    config = BartConfig(vocab_size=len(WORDS), d_model=16, encoder_layers=1, decoder_layers=1,
+                        encoder_attention_heads=2, decoder_attention_heads=2, encoder_ffn_dim=32,
+                        decoder_ffn_dim=32, max_position_embeddings=64, num_labels=3, pad_token_id=0,
+                        bos_token_id=1, eos_token_id=2, decoder_start_token_id=2)
+    return BartForSequenceClassification(config), _tokenizer("[CLS]", "[SEP]", ["input_ids", "attention_mask"])
+
+
+def _tiny_bert_ner():
+    config = BertConfig(vocab_size=len(WORDS), hidden_size=16, num_hidden_layers=1, num_attention_heads=2,
+                        intermediate_size=32, max_position_embeddings=64, num_labels=5)
+    return BertForTokenClassification(config), _tokenizer("[CLS]", "[SEP]",
+                                                          ["input_ids", "token_type_ids", "attention_mask"])
+
+
+@pytest.mark.parametrize("build, task", [(_tiny_bart, "sequence-classification"),
+                                         (_tiny_bert_ner, "token-classification")])
+def test_quantized_onnx_export_matches_torch_logits(tmp_path, build, task):
+    torch.manual_seed(0)
+    model, tokenizer = build()
+    model_dir = str(tmp_path / "model")
+    model.save_pretrained(model_dir)
+    tokenizer.save_pretrained(model_dir)
+
+    onnx_model, onnx_tokenizer, runtime = load_classifier(model_dir, task, runtime="onnx",
+                                                          onnx_dir=str(tmp_path / "onnx"))
+    assert runtime == "onnx"  # no silent fallback to torch
+
+    inputs = onnx_tokenizer(TEXTS, return_tensors="pt", padding=True)
+    with torch.inference_mode():
+        expected = model.eval()(**inputs).logits
+    actual = onnx_model(**inputs).logits
+    assert actual.shape == expected.shape
+    assert torch.allclose(actual, expected, atol=1e-2), (actual - expected).abs().max()
@@ -0,0 +1,216 @@
+import json
+import random
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+pgserver = pytest.importorskip("pgserver")
+
+from src.database import db_connector
+from src.database.bulk_loader import CopyBulkLoader
+from src.database.data_generator import StochasticCallCenterSimulator
+from src.features.extraction import ANALYTICS_COLUMNS, CallLogExtractor
+from src.pipeline.incremental_etl import IncrementalETL
+
+
+@pytest.fixture(scope="module")
+def postgres(tmp_path_factory):
+    """Throwaway local PostgreSQL with the call_logs schema, wired through the DB_* env vars."""
+    server = pgserver.get_server(str(tmp_path_factory.mktemp("pg")), cleanup_mode="stop")
+    socket_dir = parse_qs(urlparse(server.get_uri()).query)["host"][0]
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DB_HOST", socket_dir)
+        mp.setenv("DB_NAME", "call_center_test")
+        mp.setenv("DB_USER", "postgres")
+        mp.setenv("DB_PASSWORD", "")
+        mp.setenv("DB_PORT", "5432")
+        StochasticCallCenterSimulator().create_database_and_schema()
+        yield {"host": socket_dir, "database": "call_center_test", "user": "postgres", "port": "5432"}
+        db_connector.close_pools()
+
+
+def _count(params):
+    conn = psycopg2.connect(**params)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*), COUNT(DISTINCT call_id) FROM call_logs;")
+        return cursor.fetchone()
+    finally:
+        conn.close()
+
+
+def test_copy_seed_streams_in_chunks(postgres):
+    random.seed(0)
+    report = StochasticCallCenterSimulator().seed_stochastic_data(num_records=2500, chunk_size=1000)
+
+    assert report["rows"] == 2500
+    assert report["chunks"] == 3
+    assert report["rows_per_sec"] > 0
+    rows, distinct = _count(postgres)
+    assert rows == distinct
+    assert rows > 2400  # call_ids are 8 random hex chars; rare collisions upsert
+
+
+def test_copy_loader_upserts_and_roundtrips_values(postgres):
+    transcript = [{"speaker": "Customer", "text": 'Bill says "$40", why?\nPlease fix, thanks'}]
+    base = ("CALL_UPSERT1", "AGENT_100", "CUST_5000", "2026-01-01 10:00:00+00", 300,
+            json.dumps(transcript), 3, "billing", "loyal", 0.9, None, 5, 7, 0.71, 1, True, False, False)
+    in_chunk_last = base[:6] + (4,) + base[7:10] + ("",) + base[11:]
+    other = ("CALL_UPSERT2",) + base[1:6] + (1,) + base[7:]
+    other_later = ("CALL_UPSERT2",) + base[1:6] + (5,) + base[7:10] + (r"\N",) + base[11:]
+
+    conn = psycopg2.connect(**postgres)
+    try:
+        # UPSERT1 repeats within a chunk, UPSERT2 in a later chunk: the last row wins either way
+        CopyBulkLoader(conn, chunk_size=3).load([base, in_chunk_last, other, other_later], verbose=False)
+        cursor = conn.cursor()
+        cursor.execute("SELECT call_id, csat_score, transcript_json, clean_text, resolved FROM call_logs "
+                       "WHERE call_id IN ('CALL_UPSERT1', 'CALL_UPSERT2') ORDER BY call_id;")
+        (_, csat, stored_transcript, clean_text, resolved), (_, other_csat, _, other_text, _) = cursor.fetchall()
+    finally:
+        conn.close()
+
+    assert (csat, other_csat) == (4, 5)
+    assert stored_transcript == transcript
+    assert clean_text == ""  # empty strings stay empty, only None loads as NULL
+    assert other_text == r"\N"
+    assert resolved is True
+
+
+def test_vectorized_seed_loads_through_copy(postgres):
+    before, _ = _count(postgres)
+    report = StochasticCallCenterSimulator().seed_stochastic_data(
+        num_records=3000, chunk_size=1000, vectorized=True, seed=0)
+
+    assert report["rows"] == 3000
+    rows, distinct = _count(postgres)
+    assert rows == distinct
+    assert rows - before == 3000  # ids are unique within a run, so nothing collapses in the merge
+
+
+def test_pool_reuses_connections_and_scopes_transactions(postgres):
+    with db_connector.connection() as first:
+        pass
+    with db_connector.connection() as second:
+        assert second is first
+
+    with pytest.raises(psycopg2.errors.UndefinedTable):
+        with db_connector.transaction() as cursor:
+            cursor.execute("UPDATE call_logs SET csat_score = 1;")
+            cursor.execute("SELECT * FROM missing_table;")
+    assert db_connector.read_frame("SELECT COUNT(*) AS n FROM call_logs WHERE csat_score = 1 "
+                                   "AND call_id = 'CALL_UPSERT1';")["n"].item() == 0
+
+    # Stopping a server-side scan early hands back a clean connection
+    frames = db_connector.stream_frames("SELECT call_id FROM call_logs ORDER BY call_id", chunk_size=100)
+    assert len(next(frames)) == 100
+    frames.close()
+    with db_connector.connection() as conn:
+        assert conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+
+def test_pool_replaces_connections_the_server_dropped(postgres):
+    with db_connector.connection() as conn:
+        pid = conn.get_backend_pid()
+    admin = psycopg2.connect(**postgres)
+    try:
+        admin.cursor().execute("SELECT pg_terminate_backend(%s);", (pid,))
+        admin.commit()
+    finally:
+        admin.close()
+
+    # The idle connection still reports open on the client; checkout must notice it is dead
+    with db_connector.connection() as conn:
+        assert conn.get_backend_pid() != pid
+        assert conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    assert db_connector.read_frame("SELECT 1 AS ok;")["ok"].item() == 1
+
+
+def test_extractor_streams_chunks_into_analytics_base(postgres, tmp_path):
+    conn = psycopg2.connect(**postgres)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM call_logs;")
+        total = cursor.fetchone()[0]
+        report = CallLogExtractor(conn, chunk_size=1000).extract(processed_dir=str(tmp_path))
+        cursor.execute("SELECT call_id, turns_count FROM call_logs WHERE clean_text IS NOT NULL;")
+        stored_turns = dict(cursor.fetchall())
+    finally:
+        conn.close()
+
+    import pyarrow.parquet as pq
+    parquet = pq.ParquetFile(report["paths"]["parquet"])
+    base = parquet.read().to_pandas()
+    assert report["rows"] == total == len(base)
+    assert report["chunks"] == parquet.num_row_groups == -(-total // 1000)
+    assert list(base.columns) == ANALYTICS_COLUMNS
+    assert base["call_id"].is_unique
+    # Rows seeded with transcript text carry the simulator's own turn counts
+    turns = base.set_index("call_id")["turns_count"]
+    assert all(turns[call_id] == n for call_id, n in stored_turns.items())
+
+
+class HashingVectorEngine:
+    """Offline stand-in for MPNet: bag-of-words hashing, enough structure for HDBSCAN."""
+
+    def generate_embeddings(self, texts, batch_size=32, verbose=True):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        vectors = HashingVectorizer(n_features=64, alternate_sign=False).transform(texts).toarray()
+        return vectors.astype(np.float32) + 1e-3
+
+
+def test_incremental_etl_processes_only_changed_calls(postgres, tmp_path, monkeypatch):
+    import hdbscan
+    from sklearn.decomposition import PCA
+
+    from src.models.archetypes import ArchetypeModel, IncrementalArchetypeService
+    from src.preprocessing.cleaner import TextSanitizer
+    from src.utils.artifacts import read_artifact, write_artifact
+
+    monkeypatch.setenv("DB_NAME", "call_center_etl")
+    simulator = StochasticCallCenterSimulator()
+    simulator.create_database_and_schema()
+    random.seed(1)
+    simulator.seed_stochastic_data(num_records=1200)
+    params = dict(postgres, database="call_center_etl")
+
+    # Baseline store as notebooks 01-02 would leave it
+    processed, model_path, embeddings_path = tmp_path / "processed", tmp_path / "m.joblib", tmp_path / "e.npy"
+    service = IncrementalArchetypeService(str(model_path), str(processed), str(embeddings_path),
+                                          vector_engine=HashingVectorEngine(), sanitizer=TextSanitizer(tier="regex"))
+    conn = psycopg2.connect(**params)
+    try:
+        CallLogExtractor(conn).extract(processed_dir=str(processed))
+        base = read_artifact("analytics_base", processed_dir=str(processed))
+        embeddings = service._embed(base)
+        # PCA in place of UMAP: numba's worker threads hang pgserver's pg_ctl stop at exit
+        reducer = PCA(n_components=5, random_state=42).fit(embeddings)
+        clusterer = hdbscan.HDBSCAN(min_cluster_size=50, prediction_data=True).fit(reducer.transform(embeddings))
+        model = ArchetypeModel(reducer, clusterer, embeddings, drift_threshold=1.0)
+        write_artifact(base.join(model.fitted_assignments()), "clustered_data", str(processed))
+        np.save(embeddings_path, embeddings)
+        model.save(str(model_path))
+
+        etl = IncrementalETL(conn, processed_dir=str(processed), overlap_seconds=0, archetype_service=service)
+        etl.initialize()
+        assert etl.run()["rows"] == 0
+
+        # 200 new calls plus 30 re-delivered ones with a changed CSAT
+        simulator.seed_stochastic_data(num_records=200)
+        cursor = conn.cursor()
+        cursor.execute("UPDATE call_logs SET csat_score = 1, updated_at = NOW() "
+                       "WHERE call_id IN (SELECT call_id FROM call_logs ORDER BY created_at LIMIT 30);")
+        cursor.execute("SELECT COUNT(*) FROM call_logs;")
+        total = cursor.fetchone()[0]
+        conn.commit()
+        report = etl.run()
+    finally:
+        conn.close()
+
+    clustered = read_artifact("clustered_data", processed_dir=str(processed))
+    assert report["updated"] == 30 and report["rows"] == report["added"] + 30
+    assert len(clustered) == total == len(np.load(embeddings_path))
+    assert len(read_artifact("analytics_base", processed_dir=str(processed))) == total
+    assert clustered["call_id"].is_unique
@@ -0,0 +1,59 @@
+from src.models.inference import CallAnalyticsEngine
+from src.models.result_cache import ResultCache
+from src.preprocessing.cleaner import TextSanitizer
+
+
+class CountingClassifier:
+    """Deterministic stand-in for the zero-shot model that counts scored texts."""
+
+    def __init__(self):
+        self.seen = 0
+
+    def __call__(self, texts, labels, batch_size=None):
+        self.seen += len(texts)
+        return [{"labels": list(labels), "scores": [1.0 / len(labels)] * len(labels)} for _ in texts]
+
+
+def test_lru_eviction_and_ttl():
+    cache = ResultCache(max_entries=2, ttl_seconds=None)
+    for key in ("a", "b", "c"):
+        cache.put(key, {"v": key})
+    assert cache.get("a") is None and cache.get("c") == {"v": "c"}
+    assert cache.stats()["evictions"] == 1
+
+    expiring = ResultCache(ttl_seconds=-1)
+    expiring.put("a", {"v": 1})
+    assert expiring.get("a") is None and expiring.stats()["expirations"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    ResultCache(disk_path=path).put("k", {"clean_text": "hi", "labels": ["x"], "scores": [1.0]})
+    reopened = ResultCache(disk_path=path)
+    assert reopened.get("k")["labels"] == ["x"]
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_engine_reuses_cached_intent_but_rescores_risk():
+    engine = CallAnalyticsEngine(redaction_tier="regex", result_cache=ResultCache())
+    classifier = CountingClassifier()
+    engine._components.update(sanitizer=TextSanitizer(tier="regex"), classifier=classifier)
+
+    first = engine.analyze_call("I want to cancel my account", talk_ratio=0.5, duration=100)
+    second = engine.analyze_call("  I want to   cancel my account ", talk_ratio=2.0, duration=900)
+
+    assert classifier.seen == 1
+    assert second["intent"] == first["intent"]
+    assert (first["risk_score"], second["risk_score"]) == (0, 60)
+    assert engine.stats()["result_cache"]["hits"] == 1
+
+
+def test_a_lowercase_hit_never_hides_pii_from_a_capitalized_transcript():
+    engine = CallAnalyticsEngine(redaction_tier="gazetteer", result_cache=ResultCache())
+    engine._components.update(sanitizer=TextSanitizer(tier="gazetteer"), classifier=CountingClassifier())
+
+    engine.analyze_call("customer: this is maria garcia calling, acc-42")
+    capitalized = engine.analyze_call("Customer: this is Maria Garcia calling, ACC-42")
+
+    assert capitalized["clean_text"] == "customer: this is [person] calling, [account_id]"
+    assert engine.stats()["result_cache"]["hits"] == 0
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from src.pipeline.scorecard import FrictionScorecard
+
+
+def _calls(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "archetype_name": rng.choice(["Billing", "Cancellation", "Technical"], n),
+        "duration_sec": rng.integers(60, 1200, n),
+        "talk_ratio": rng.uniform(0.5, 2.0, n),
+        "escalated": rng.random(n) < 0.3,
+        "csat_score": rng.integers(1, 6, n),
+        "resolved": rng.random(n) < 0.4,
+    })
+
+
+def test_merged_partials_match_full_groupby():
+    calls = _calls(1000, seed=0)
+    parts = [FrictionScorecard().update(calls.iloc[i:i + 300]) for i in range(0, len(calls), 300)]
+    scorecard = FrictionScorecard.combine(parts).to_scorecard()
+
+    expected = calls.groupby("archetype_name").agg(
+        Call_Volume=("duration_sec", "size"), duration_sec=("duration_sec", "mean"),
+        escalated=("escalated", "mean"), csat_score=("csat_score", "mean"), resolution_rate=("resolved", "mean"))
+    expected["call_cost"] = calls.groupby("archetype_name")["duration_sec"].sum() / 60 * 1.50
+    expected["Friction_Index"] = (expected["escalated"] * (6 - expected["csat_score"])).round(2)
+
+    pd.testing.assert_frame_equal(scorecard[expected.columns].sort_index(), expected.sort_index(),
+                                  check_dtype=False)
+    assert scorecard["Friction_Index"].is_monotonic_decreasing
+
+
+def test_update_maps_cluster_ids_and_persists(tmp_path):
+    calls = _calls(200, seed=1).drop(columns="archetype_name").assign(cluster_id=[0, 1, -1, 7] * 50)
+    names = {0: "Billing", 1: "Cancellation", -1: "Unclassified / Noise"}
+    aggregator = FrictionScorecard().update(calls.iloc[:100], names).update(calls.iloc[100:], names)
+
+    assert aggregator.to_scorecard()["Call_Volume"].sum() == 150  # unmapped cluster 7 is dropped
+    aggregator.save(str(tmp_path))
+    assert (tmp_path / "executive_friction_scorecard.csv").exists()
+    pd.testing.assert_frame_equal(FrictionScorecard.load(str(tmp_path)).to_scorecard(), aggregator.to_scorecard())
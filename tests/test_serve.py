@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+from src.models.executor import InferenceExecutor
+from src.serve import InferenceServer
+
+
+class EchoEngine:
+    """Stand-in for CallAnalyticsEngine: echoes the transcript and records batch sizes."""
+
+    def __init__(self):
+        self.batches = []
+
+    def analyze_calls(self, calls, batch_size=32):
+        self.batches.append(len(calls))
+        return iter([{"clean_text": c["transcript"], "risk_score": c["duration"]} for c in calls])
+
+    def loaded_components(self):
+        return {"sanitizer": True, "classifier": True}
+
+    def stats(self):
+        return {"stages": {}}
+
+
+async def _request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n"
+                 f"Connection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    status_line = await reader.readline()
+    response = await reader.read()
+    writer.close()
+    return int(status_line.split()[1]), json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+def test_concurrent_requests_are_batched_and_errors_map_to_status_codes():
+    engine = EchoEngine()
+    executor = InferenceExecutor(engine, max_batch_size=16, max_wait_ms=200)
+    server = InferenceServer(executor, timeout_s=5)
+
+    async def scenario():
+        tcp = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = tcp.sockets[0].getsockname()[1]
+        async with tcp:
+            single = [_request(port, "POST", "/analyze", {"transcript": f"call {i}", "duration": i}) for i in range(4)]
+            batch = _request(port, "POST", "/analyze_batch", {"calls": ["a", {"transcript": "b", "duration": 7}]})
+            responses = await asyncio.gather(*single, batch)
+            errors = [await _request(port, "POST", "/analyze", {"text": "no transcript"}),
+                      await _request(port, "GET", "/analyze"),
+                      await _request(port, "GET", "/nowhere")]
+            metrics = await _request(port, "GET", "/metrics")
+        return responses, errors, metrics
+
+    try:
+        responses, errors, (_, metrics) = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert [status for status, _ in responses] == [200] * 5
+    assert [body["risk_score"] for _, body in responses[:4]] == [0, 1, 2, 3]
+    assert [r["clean_text"] for r in responses[4][1]["results"]] == ["a", "b"]
+    assert sum(engine.batches) == 6 and len(engine.batches) < 6
+    assert [status for status, _ in errors] == [400, 405, 404]
+    assert metrics["endpoints"]["/analyze"]["requests"] == 6  # including the 400 and 405
+    assert metrics["errors"] == {"400": 1, "404": 1, "405": 1}
+    assert metrics["executor"]["completed"] == 6
+
+
+def test_batch_larger_than_the_queue_is_413_not_retryable_503():
+    engine = EchoEngine()
+    executor = InferenceExecutor(engine, max_queue=8, max_batch_size=4, max_wait_ms=1)
+    server = InferenceServer(executor, timeout_s=5)
+
+    async def scenario():
+        tcp = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = tcp.sockets[0].getsockname()[1]
+        async with tcp:
+            too_big = await _request(port, "POST", "/analyze_batch", {"calls": [f"c{i}" for i in range(9)]})
+            fits = await _request(port, "POST", "/analyze_batch", {"calls": [f"c{i}" for i in range(8)]})
+        return too_big, fits
+
+    try:
+        (too_big_status, too_big_body), (fits_status, fits_body) = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert too_big_status == 413 and "at most 8 calls" in too_big_body["error"]
+    assert fits_status == 200 and len(fits_body["results"]) == 8
+    assert executor.stats()["rejected"] == 0
+    assert executor.stats()["completed"] == 8
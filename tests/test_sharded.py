@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer
+from sentence_transformers import models as st_models
+from tokenizers import Tokenizer, models, pre_tokenizers, processors
+from transformers import BertConfig, BertModel, PreTrainedTokenizerFast
+
+from src.features.embedding_cache import EmbeddingCache
+from src.features.embeddings import VectorEngine
+from src.pipeline.sharded import ShardedPipeline
+from src.preprocessing.cleaner import TextSanitizer
+
+WORDS = "[PAD] [CLS] [SEP] [UNK] i want a refund for my bill please cancel account the router is down".split()
+TEXTS = [f"Customer {i}: I want a refund for ACC-{1000 + i}, mail me at user{i}@example.com"
+         if i % 2 else f"Customer {i}: the router is down, please cancel my account" for i in range(10)]
+
+
+def _tiny_encoder(path):
+    """Word-level tokenizer + 1-layer BERT as a sentence-transformers model, so workers load it offline."""
+    torch.manual_seed(0)
+    tokenizer = Tokenizer(models.WordLevel({w: i for i, w in enumerate(WORDS)}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(single="[CLS] $A [SEP]",
+                                                             special_tokens=[("[CLS]", 1), ("[SEP]", 2)])
+    bert_dir = os.path.join(path, "bert")
+    BertModel(BertConfig(vocab_size=len(WORDS), hidden_size=16, num_hidden_layers=1, num_attention_heads=2,
+                         intermediate_size=32, max_position_embeddings=64)).save_pretrained(bert_dir)
+    PreTrainedTokenizerFast(tokenizer_object=tokenizer, pad_token="[PAD]", unk_token="[UNK]",
+                            cls_token="[CLS]", sep_token="[SEP]").save_pretrained(bert_dir)
+    transformer = st_models.Transformer(bert_dir, max_seq_length=32)
+    SentenceTransformer(modules=[transformer, st_models.Pooling(16)]).save(path)
+    return path
+
+
+def _store_bytes(cache):
+    paths = (cache.vectors_path, cache.keys_path, cache.meta_path)
+    return [open(p, "rb").read() for p in paths]
+
+
+def test_sharded_run_matches_single_process_and_workers_only_read_the_cache(tmp_path):
+    model_dir = _tiny_encoder(str(tmp_path / "encoder"))
+    cache_dir = str(tmp_path / "cache")
+
+    # Single-process reference: the same sanitize -> embed notebook 02 runs
+    sanitized = TextSanitizer(tier="regex").sanitize(TEXTS, batch_size=4)
+    expected = VectorEngine(model_dir).generate_embeddings(sanitized, batch_size=4, verbose=False)
+
+    seed = EmbeddingCache(model_dir, cache_dir)
+    seed.add([seed.key(t) for t in sanitized[:4]], expected[:4])
+    seed.flush()
+    before = _store_bytes(seed)
+
+    pipeline = ShardedPipeline(out_dir=str(tmp_path / "shards"), num_workers=2, torch_threads=1, shard_size=3,
+                               batch_size=4, redaction_tier="regex", model_name=model_dir, cache_dir=cache_dir)
+    reports = pipeline.process(TEXTS)
+    assert [r["shard_id"] for r in reports] == [0, 1, 2, 3]
+    assert sum(r["cache_hits"] for r in reports) == 4 and sum(r["cache_misses"] for r in reports) == 6
+    assert _store_bytes(seed) == before  # workers never write the shared store
+
+    actual_texts, actual = pipeline.run(TEXTS)
+    assert actual_texts == sanitized
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+    # Only the parent adds the misses, once, after all shards are done
+    assert len(EmbeddingCache(model_dir, cache_dir)) == len(TEXTS)
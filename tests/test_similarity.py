@@ -0,0 +1,33 @@
+import os
+
+import numpy as np
+
+from src.models.inference import CallAnalyticsEngine
+
+
+def _replace(path, vectors):
+    """Writes the embeddings the way the archetype service does: a temp file swapped in with os.replace."""
+    tmp_path = path + ".tmp.npy"
+    np.save(tmp_path, vectors.astype(np.float32))
+    os.replace(tmp_path, path)
+
+
+def test_similarity_index_reloads_when_the_embeddings_file_is_replaced(tmp_path):
+    path = str(tmp_path / "transcript_embeddings.npy")
+    vectors = np.eye(4, 8)
+    _replace(path, vectors)
+    engine = CallAnalyticsEngine(embeddings_path=path, similarity_index_dir=str(tmp_path / "no_index"))
+
+    first = engine.similarity_index
+    assert len(first) == 4
+    assert engine.similarity_index is first  # unchanged file: no reload
+
+    # An appended call and a replaced row, as add_calls writes them
+    updated = np.vstack([vectors, np.eye(8)[[0]] + 0.01])
+    updated[1] = np.eye(8)[5]
+    _replace(path, updated)
+
+    assert len(engine.similarity_index) == 5
+    assert engine.similar_to_call(0, k=1)[0]["row"] == 4
+    assert engine.similar_to_call(4, k=1)[0]["row"] == 0
+    np.testing.assert_allclose(engine.similarity_index.vector(1), np.eye(8)[5])
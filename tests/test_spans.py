@@ -0,0 +1,74 @@
+import re
+
+from src.models.inference import CallAnalyticsEngine
+from src.models.result_cache import ResultCache
+from src.preprocessing.cleaner import TextSanitizer
+from src.preprocessing.spans import render, resolve_spans, view_to_source
+
+TEXTS = [
+    "  Hi, this is Sarah Connor.  Email me at sarah.c@mail.com   or quote ACC-12345 ",
+    "ACC-1@mail.com lives at 12 Main Street\n\n thanks, John",
+    "Grace  Hopper moved to 221 baker st\tlast week",
+    "nothing to redact here",
+    "",
+]
+
+
+class UniformClassifier:
+    """Stand-in for the zero-shot model."""
+
+    def __call__(self, texts, labels, batch_size=None):
+        return [{"labels": list(labels), "scores": [1.0 / len(labels)] * len(labels)} for _ in texts]
+
+
+def _sequential(text):
+    """The former redaction: one re.sub per pattern over the previous pass's output."""
+    text = re.sub(r"\S+@\S+", "[EMAIL]", text)
+    text = re.sub(r"ACC-\d+", "[ACCOUNT_ID]", text)
+    text = re.sub(r"\d{1,5}\s\w+\s(way|street|st|ave|avenue|road|rd|lane|ln|drive|dr|court|ct|square|sq|"
+                  r"boulevard|blvd)", "[ADDRESS]", text, flags=re.IGNORECASE)
+    return text
+
+
+def test_single_pass_matches_sequential_redaction_and_maps_offsets():
+    sanitizer = TextSanitizer(tier="regex")
+    assert sanitizer.batch_redact(TEXTS) == [_sequential(t) for t in TEXTS]
+    assert sanitizer.sanitize(TEXTS) == sanitizer.clean_batch([_sequential(t) for t in TEXTS])
+
+    for text, result in zip(TEXTS, sanitizer.redact(TEXTS, with_offsets=True)):
+        output, offsets = result["text"], result["offset_map"]
+        assert len(offsets) == len(text) + 1 and offsets[-1] == len(output)
+        for start, end, label in result["spans"]:
+            assert output[offsets[start]:].startswith(f"[{label.lower()}]")
+            assert offsets[end - 1] == offsets[start]
+        kept = [i for i, c in enumerate(text) if not c.isspace()
+                and not any(s <= i < e for s, e, _ in result["spans"])]
+        assert all(output[offsets[i]] == text[i].lower() for i in kept)
+
+
+def test_overlaps_take_the_longest_spans_label_and_view_spans_map_back():
+    assert resolve_spans([(0, 14, "EMAIL"), (0, 5, "ACCOUNT_ID"), (20, 30, "PERSON"), (25, 40, "ADDRESS"),
+                          (50, 90, "PERSON"), (60, 70, "EMAIL"), (90, 95, "EMAIL")]) == \
+        [(0, 14, "EMAIL"), (20, 40, "ADDRESS"), (50, 90, "PERSON"), (90, 95, "EMAIL")]
+
+    text = "mail a@b.co then Ann Lee at 9 oak st"
+    replaced = [(5, 11, "EMAIL"), (28, 36, "ADDRESS")]
+    view, _ = render(text, replaced)
+    assert view == "mail [EMAIL] then Ann Lee at [ADDRESS]"
+    ann = view.index("Ann Lee")
+    assert view_to_source([(ann, ann + 7), (5, 9)], replaced) == [(17, 24), (5, 11)]
+
+
+def test_engine_reports_redactions_in_each_transcripts_own_offsets():
+    engine = CallAnalyticsEngine(redaction_tier="regex", result_cache=ResultCache())
+    engine._components.update(sanitizer=TextSanitizer(tier="regex"), classifier=UniformClassifier())
+
+    first_text = "Refund ACC-42 please, mail bob@x.io"
+    second_text = "  Refund   ACC-42 please,  mail bob@x.io  "  # same cache key, different offsets
+    first = engine.analyze_call(first_text)
+    second = engine.analyze_call(second_text)
+
+    assert engine.stats()["result_cache"]["hits"] == 1
+    assert [first_text[r["start"]:r["end"]] for r in first["redactions"]] == ["ACC-42", "bob@x.io"]
+    assert [second_text[r["start"]:r["end"]] for r in second["redactions"]] == ["ACC-42", "bob@x.io"]
+    assert [r["label"] for r in second["redactions"]] == ["ACCOUNT_ID", "EMAIL"]
@@ -0,0 +1,23 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from src.database.data_generator import StochasticCallCenterSimulator
+from src.database.vectorized_simulator import VectorizedCallSimulator
+
+
+def test_vectorized_marginals_match_the_scalar_simulator():
+    scalar = StochasticCallCenterSimulator(rng=random.Random(42))
+    calls = pd.DataFrame([scalar.generate_call() for _ in range(5000)])
+    batch = VectorizedCallSimulator(seed=42).generate_batch(50_000)
+
+    # ~5 standard errors of the 5000-call sample, so only a real drift in the model fails
+    for column in ("resolved", "escalated", "churned"):
+        assert abs(calls[column].mean() - batch[column].mean()) < 0.03, column
+    assert abs(calls["csat"].mean() - batch["csat_score"].mean()) < 0.1
+
+    scalar_mix = calls["issue_category"].value_counts(normalize=True)
+    vector_mix = batch["issue_category"].astype(str).value_counts(normalize=True)
+    assert set(scalar_mix.index) == set(vector_mix.index)
+    np.testing.assert_allclose(vector_mix[scalar_mix.index], scalar_mix, atol=0.03)